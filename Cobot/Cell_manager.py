@@ -0,0 +1,282 @@
+# -------------------------
+# 📌 라이브러리 불러오기
+# -------------------------
+
+import os  # 경로 처리용
+import sys  # 모듈 경로 추가
+import argparse  # 명령행 옵션
+import json  # 셀 설정 파일
+import threading  # 카메라별 프레임 공급 스레드 / 자동 실행 스레드
+import time  # 처리 속도 계산
+from concurrent.futures import ThreadPoolExecutor  # 모든 카메라가 함께 쓰는 인식 작업 풀
+
+# 📂 OpenCV 폴더의 공용 비전 모듈을 불러올 수 있도록 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "OpenCV"))
+from Frame_capture import open_source  # 카메라 번호 / 영상 파일 / 이미지 폴더 → 프레임 소스
+from Pickup_perception import PickupPerception  # ArUco ROI + 색상 객체 검출 + 추적 (Qt 비의존)
+from Perception_pool import PerceptionPool  # 인식 작업 프로세스 풀 (공유 메모리 프레임 전달)
+from Pick_place_controller import HSV_RANGES, PickPlaceController  # 셀마다 따로 두는 로봇 명령 큐 + 동작
+from Color_profile import load_colors  # 셀별 색상 프로파일 (없으면 기본 HSV 표)
+from Simulated_robot import SimulatedMyCobot320  # 로봇 없이 실행하기 위한 MyCobot320 시뮬레이터
+from Metrics import FileExporter, PrometheusServer, metrics  # 단계별 지연 측정 / 내보내기
+
+
+# -------------------------
+# 📌 여러 셀(카메라 + 로봇) 한 프로세스 실행
+# -------------------------
+# 셀마다 Fruit_PickPlace_Auto.py (Qt 앱 + OpenCV 창) 를 하나씩 띄우는 대신,
+# 설정 파일의 N 개 셀을 화면 없이 한 프로세스에서 실행한다.
+# - 인식: 모든 카메라가 작업 풀 하나(perception_workers 개 스레드)를 함께 사용
+#   (OpenCV 연산은 GIL 을 풀고 실행되므로 스레드 여러 개로 여러 코어를 사용)
+#   perception_processes 를 주면 스레드 대신 작업 프로세스 풀(공유 메모리 프레임 전달)에서 검출
+# - 로봇: 셀마다 PickPlaceController 를 따로 만들어 명령 큐 / 시리얼 스레드 / 동작 실행기가 분리됨
+#   → 한 셀의 로봇이 느려지거나 멈춰도 다른 셀의 명령은 기다리지 않음
+#
+#   python Cell_manager.py cells.json
+#   python Cell_manager.py cells.json --metrics-port 9100
+#
+# 설정 파일 예시는 cells.example.json 참고. 상대 경로(보정 파일, 영상 파일)는 설정 파일 기준.
+
+# 셀 설정 기본값 (설정 파일의 각 셀 항목에 없는 값)
+CELL_DEFAULTS = {
+    "camera": 0,              # 카메라 번호 또는 영상 파일 / 이미지 폴더
+    "loop": False,            # 영상 파일 / 이미지 폴더 반복 재생
+    "robot_port": "COM11",
+    "baudrate": 115200,
+    "sim": False,             # True 면 실제 로봇 대신 MyCobot320 시뮬레이터
+    "calibration": None,      # 좌표 보정 파일 (없으면 ROI 비례식 변환)
+    "color_profile": None,    # 색상 프로파일 파일 (없으면 기본 HSV 표, 조명이 다른 셀마다 따로 보정)
+    "scale": 2,               # 색상 검출 처리 배율
+    "detect_interval": 2,     # 검출 주기 (사이 프레임은 추적기가 위치 예측)
+    "refresh_interval": 30,   # ROI 안이 그대로면 검출 생략, 그래도 N 프레임마다 한 번은 검출 (0 = 매번 검출)
+    "min_area": 200,
+    "color_to_place": None,   # 색상 → 플레이스 위치 (없으면 제어기 기본값)
+    "auto": True,             # 자동 분류를 반복 실행할지 여부
+    "auto_interval": 5.0,     # 자동 분류가 끝난 뒤 다시 시작하기까지 대기 (초)
+}
+
+
+# 설정 파일 읽기 → {"perception_workers": N, "perception_processes": M, "cells": [셀 설정, ...]}
+def load_config(path):
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value):
+        if isinstance(value, str) and not value.isdigit() and not os.path.isabs(value):
+            return os.path.join(base, value)
+        return value
+
+    cells = []
+    for i, entry in enumerate(config.get("cells", [])):
+        cell = dict(CELL_DEFAULTS, name=f"cell-{i + 1}")
+        cell.update(entry)
+        cell["camera"] = resolve(cell["camera"])
+        cell["calibration"] = resolve(cell["calibration"])
+        cell["color_profile"] = resolve(cell["color_profile"])
+        cells.append(cell)
+    if not cells:
+        raise ValueError(f"설정 파일에 셀이 없습니다: {path}")
+    if len({c["name"] for c in cells}) != len(cells):
+        raise ValueError("셀 이름이 중복되었습니다")
+
+    return {"perception_workers": config.get("perception_workers") or os.cpu_count() or 1,
+            "perception_processes": config.get("perception_processes", 0), "cells": cells}
+
+
+# -------------------------
+# 📌 셀 하나: 프레임 소스 + 인식 파이프라인 + 로봇 제어기
+# -------------------------
+class Cell:
+    # pool: 검출을 맡길 PerceptionPool (없으면 관리자의 인식 스레드 풀에서 검출)
+    def __init__(self, config, mycobot=None, pool=None):
+        self.config = config
+        self.name = config["name"]
+
+        # 🎥 프레임 소스 (카메라는 백그라운드 스레드가 최신 프레임 유지)
+        self.cap = open_source(config["camera"], realtime=True, loop=config["loop"])
+        if not self.cap.isOpened():
+            raise Exception(f"❌ [{self.name}] 카메라를 열 수 없습니다: {config['camera']}")
+
+        # 🤖 로봇 (pymycobot 은 실제 로봇 셀이 있을 때만 필요)
+        if mycobot is None:
+            if config["sim"]:
+                mycobot = SimulatedMyCobot320()
+            else:
+                from pymycobot.mycobot320 import MyCobot320
+                mycobot = MyCobot320(config["robot_port"], config["baudrate"])
+        self.controller = PickPlaceController(mycobot, config["calibration"], name=self.name,
+                                              color_to_place=config["color_to_place"],
+                                              hsv_ranges=load_colors(HSV_RANGES, config["color_profile"]))
+
+        # 🔍 셀마다 따로 두는 인식 파이프라인 (ROI 추적기·객체 추적기 상태는 카메라별)
+        self.pipeline = PickupPerception(self.controller.hsv_ranges, min_area=config["min_area"],
+                                         scale=config["scale"], detect_interval=config["detect_interval"],
+                                         pool=pool, refresh_interval=config["refresh_interval"])
+        self.controller.request_refresh = self.pipeline.request_refresh
+
+        self.frames = 0            # 처리한 프레임 수
+        self.errors = 0            # 인식 중 예외 수
+        self.auto_errors = 0       # 자동 분류(로봇 동작·인식 대기) 중 예외 수
+        self.source_ended = False  # 카메라가 끊기거나 영상이 끝나 인식을 멈춤
+        self.last_result = None
+
+    # 프레임 한 장 인식 → 제어기에 결과 저장 (인식 작업 풀의 스레드에서 실행)
+    def perceive(self, frame, index, timestamp):
+        return self.store(self.pipeline.process(frame, timestamp), index, timestamp)
+
+    # 프로세스 풀: 프레임을 넣고, 검출이 끝난 프레임 결과를 순서대로 저장 (프레임 공급 스레드에서 실행)
+    def perceive_pipelined(self, frame, index, timestamp):
+        for (done_index, captured), result in self.pipeline.push(frame, timestamp, (index, timestamp)):
+            self.store(result, done_index, captured)
+
+    def store(self, result, index, timestamp):
+        result["index"] = index
+        result["timestamp"] = timestamp
+        self.controller.store_detection(result)
+        self.last_result = result
+        self.frames += 1
+        return result
+
+    def close(self):
+        stats = self.controller.shutdown()
+        self.cap.release()
+        return stats
+
+
+# -------------------------
+# 📌 셀 관리자
+# -------------------------
+# 카메라마다 프레임 공급 스레드가 최신 프레임을 공용 작업 풀에 넣는다.
+# 셀마다 한 번에 한 프레임만 처리 (추적기 상태가 프레임 순서에 의존)
+# → 처리가 끝나면 그동안 쌓인 프레임은 건너뛰고 가장 최근 프레임을 다시 넣음.
+# 작업 풀 스레드 수보다 카메라가 많으면 셀들이 차례로 풀을 나눠 씀.
+# 프로세스 풀을 쓰는 셀은 공급 스레드가 직접 풀에 넣고 작업 프로세스 수만큼 프레임을 겹쳐 처리.
+class CellManager:
+    def __init__(self, cells, workers):
+        self.cells = cells
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="perception")
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        for cell in self.cells:
+            self.threads.append(threading.Thread(target=self._feed, args=(cell,), daemon=True))
+            if cell.config["auto"]:
+                self.threads.append(threading.Thread(target=self._auto, args=(cell,), daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    # 📸 카메라 → 공용 인식 풀
+    def _feed(self, cell):
+        while not self.stop_event.is_set():
+            ret, frame, index, timestamp = cell.cap.read_with_info(timeout=0.5)
+            if not ret:
+                # 캡처가 끝났으면 read 가 기다리지 않고 바로 실패하므로 이 셀의 인식을 멈춤
+                # (아직 캡처 중이면 위에서 0.5초 기다린 뒤라 그대로 다시 읽음)
+                if not cell.cap.running:
+                    if not self.stop_event.is_set():
+                        cell.source_ended = True
+                        cell.errors += 1
+                        metrics.count("vision.source_ended")
+                        print(f"[{cell.name}] ❌ 카메라 연결 끊김 또는 영상 끝 → 인식 중지")
+                    break
+                continue
+            try:
+                if cell.pipeline.pool is not None:
+                    cell.perceive_pipelined(frame, index, timestamp)
+                else:
+                    self.pool.submit(cell.perceive, frame, index, timestamp).result()
+            except Exception as e:
+                if self.stop_event.is_set():
+                    break  # 종료 중 (작업 풀이 닫힘)
+                cell.errors += 1
+                print(f"[{cell.name}] 인식 오류: {e!r}")
+
+    # 🤖 자동 분류 반복 (ROI 가 비면 auto_interval 초 뒤 다시 확인, 프레임 소스가 끝나면 중지)
+    def _auto(self, cell):
+        controller = cell.controller
+        while not self.stop_event.is_set() and not cell.source_ended:
+            try:
+                controller.run_robot_task(controller.auto_run).result()
+            except Exception as e:
+                if self.stop_event.is_set():
+                    break  # 종료 중 (실행기가 닫힘)
+                cell.auto_errors += 1
+                metrics.count("cycle.auto_error")
+                print(f"[{cell.name}] 자동 분류 오류: {e!r}")
+            self.stop_event.wait(cell.config["auto_interval"])
+
+    # 셀별 처리 현황 한 줄씩
+    def report(self, elapsed):
+        for cell in self.cells:
+            result = cell.last_result or {}
+            roi = "ROI" if result.get("roi") is not None else "ROI 없음"
+            if cell.source_ended:
+                roi += " (소스 끝, 인식 중지)"
+            print(f"[{cell.name}] {cell.frames / max(elapsed, 1e-6):.1f} fps, {roi}, "
+                  f"추적 {len(result.get('tracks', []))}개, 대기 명령 {cell.controller.robot.pending()}개, "
+                  f"인식 오류 {cell.errors}회, 자동 분류 오류 {cell.auto_errors}회")
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.pool.shutdown(wait=True)
+        for cell in self.cells:
+            for name, st in cell.close().items():
+                print(f"[{cell.name}] [로봇 명령] {name}: {st['count']}회, 평균 실행 {st['exec_avg']:.2f}s, "
+                      f"최대 {st['exec_max']:.2f}s, 평균 대기 {st['wait_avg']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 셀(카메라 + 로봇)을 한 프로세스에서 실행")
+    parser.add_argument("config", help="셀 설정 파일 (JSON)")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="셀별 현황 출력 간격 (초)")
+    parser.add_argument("--duration", type=float, default=0.0, help="실행 시간 (초, 0 = Ctrl+C 까지)")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="Prometheus 텍스트 엔드포인트 포트 (0 = 사용 안 함)")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="Prometheus 엔드포인트 주소 (기본: 이 PC 에서만 접속, 0.0.0.0 = 모든 네트워크)")
+    parser.add_argument("--metrics-file", default=None,
+                        help="단계별 측정값을 주기적으로 추가할 파일 (.csv 또는 .jsonl)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+
+    # 📊 측정값은 모든 셀을 합산 (METRICS=1 환경 변수로도 켤 수 있음)
+    exporters = []
+    if args.metrics_port or args.metrics_file:
+        metrics.enable({"cell": "manager"})
+    if args.metrics_port:
+        exporters.append(PrometheusServer(metrics, args.metrics_port, args.metrics_host))
+    if args.metrics_file:
+        exporters.append(FileExporter(metrics, args.metrics_file))
+
+    processes = config["perception_processes"]
+    pool = PerceptionPool(processes) if processes > 0 else None
+    cells = [Cell(c, pool=pool) for c in config["cells"]]
+    manager = CellManager(cells, config["perception_workers"])
+    if pool is not None:
+        print(f"셀 {len(cells)}개 시작 (인식 작업 프로세스 {processes}개)")
+    else:
+        print(f"셀 {len(cells)}개 시작 (인식 작업 스레드 {config['perception_workers']}개)")
+    manager.start()
+
+    started = time.monotonic()
+    try:
+        while not args.duration or time.monotonic() - started < args.duration:
+            time.sleep(min(args.report_interval, args.duration or args.report_interval))
+            manager.report(time.monotonic() - started)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop()
+        if pool is not None:
+            pool.close()
+        for exporter in exporters:
+            exporter.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# -------------------------
+# 📌 라이브러리 불러오기
+# -------------------------
+
+import json  # 보정 결과 저장/불러오기
+import os  # 파일 경로 확인
+
+import cv2  # OpenCV - 호모그래피 계산 및 좌표 변환
+import numpy as np  # NumPy - 행렬 계산
+
+
+# -------------------------
+# 📌 픽셀 → 로봇 좌표 보정 모델
+# -------------------------
+# 손으로 맞춘 4분면 보정 계수 대신, 실제 대응점(픽셀 ↔ 로봇 mm)으로 호모그래피를 계산한다.
+# - 대응점: 로봇 끝을 객체 위에 맞춘 "터치 포인트" (+ 로봇 좌표를 알고 있는 ArUco 마커 중심)
+# - 보정 당시 ArUco 마커의 픽셀 위치(기준 마커)를 함께 저장해 두고,
+#   카메라가 밀려서 마커 위치가 바뀌면 "현재 마커 → 기준 마커" 변환을 먼저 적용
+#   → 카메라가 조금 움직여도 다시 보정할 필요 없음
+# - 렌즈 왜곡 계수(camera_matrix, dist_coeffs)가 있으면 픽셀 좌표를 먼저 왜곡 보정
+# - 여러 객체 좌표를 NumPy 배열 하나로 한 번에 변환
+class PixelToRobotCalibration:
+    def __init__(self, path=None):
+        self.path = path
+        self.homography = None        # 기준 픽셀 → 로봇 (3x3)
+        self.ref_markers = {}         # 보정 당시 마커 ID → 픽셀 중심 [x, y]
+        self.marker_robot_xy = {}     # 로봇 좌표를 알고 있는 마커 ID → [x, y] (mm)
+        self.samples = []             # 터치 포인트 [([px, py], [rx, ry]), ...] (기준 픽셀 좌표)
+        self.camera_matrix = None     # 카메라 내부 행렬 (3x3, 선택)
+        self.dist_coeffs = None       # 렌즈 왜곡 계수 (선택)
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @property
+    def ready(self):
+        return self.homography is not None
+
+    # ------------------------------------------------------------
+    # 📌 대응점 수집 / 호모그래피 계산
+    # ------------------------------------------------------------
+    # 터치 포인트 추가 (pixel: 현재 프레임 픽셀 좌표, robot_xy: 로봇 좌표 mm)
+    def add_sample(self, pixel, robot_xy, markers=None):
+        # 첫 터치 포인트를 찍을 때의 마커 위치를 기준 마커로 저장
+        if markers and not self.ref_markers:
+            self.ref_markers = {int(i): np.asarray(c, dtype=np.float64).tolist() for i, c in markers.items()}
+
+        # 현재 마커 위치가 기준과 다르면 기준 픽셀 좌표로 바꿔서 저장
+        ref_pixel = self._to_reference(np.array([pixel], dtype=np.float64), markers)[0]
+        self.samples.append((ref_pixel.tolist(), [float(robot_xy[0]), float(robot_xy[1])]))
+
+    # 모인 대응점으로 호모그래피 계산 (최소 4점 필요) → 성공 여부
+    def fit(self, markers=None):
+        # 처음 계산할 때의 마커 위치를 기준 마커로 저장
+        if markers and not self.ref_markers:
+            self.ref_markers = {int(i): np.asarray(c, dtype=np.float64).tolist() for i, c in markers.items()}
+
+        pixel_pts = [p for p, _ in self.samples]
+        robot_pts = [r for _, r in self.samples]
+
+        # 로봇 좌표를 알고 있는 마커 중심도 대응점으로 사용
+        for marker_id, robot_xy in self.marker_robot_xy.items():
+            if marker_id in self.ref_markers:
+                pixel_pts.append(self.ref_markers[marker_id])
+                robot_pts.append(robot_xy)
+
+        if len(pixel_pts) < 4:
+            return False
+
+        src = self._undistort(np.array(pixel_pts, dtype=np.float64))
+        dst = np.array(robot_pts, dtype=np.float64)
+        method = cv2.RANSAC if len(src) > 4 else 0  # 점이 많으면 잘못 찍은 점 제거
+        H, _ = cv2.findHomography(src, dst, method, 3.0)
+        if H is None:
+            return False
+
+        self.homography = H
+        return True
+
+    # ------------------------------------------------------------
+    # 📌 좌표 변환 (여러 점을 한 번에)
+    # ------------------------------------------------------------
+    # pixels: (N, 2) 픽셀 좌표, markers: 현재 프레임 마커 ID → 중심 (카메라 이동 보정용)
+    # 반환: (N, 2) 로봇 좌표 (mm)
+    def transform(self, pixels, markers=None):
+        if not self.ready:
+            raise RuntimeError("보정 데이터가 없습니다. 먼저 fit() 을 실행하세요.")
+
+        pts = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+        if len(pts) == 0:
+            return np.empty((0, 2))
+
+        ref = self._to_reference(pts, markers)
+        ref = self._undistort(ref)
+        return cv2.perspectiveTransform(ref.reshape(-1, 1, 2), self.homography).reshape(-1, 2)
+
+    # 현재 마커 위치 → 보정 당시 마커 위치로 픽셀 좌표 변환
+    def _to_reference(self, pts, markers):
+        if not markers or not self.ref_markers:
+            return pts
+
+        common = [i for i in markers if int(i) in self.ref_markers]
+        if len(common) < 2:
+            return pts
+
+        cur = np.array([markers[i] for i in common], dtype=np.float64)
+        ref = np.array([self.ref_markers[int(i)] for i in common], dtype=np.float64)
+        if np.abs(cur - ref).max() < 0.5:
+            return pts  # 카메라가 움직이지 않았으면 그대로
+
+        if len(common) >= 4:
+            M, _ = cv2.findHomography(cur, ref, 0)
+            if M is not None:
+                return cv2.perspectiveTransform(pts.reshape(-1, 1, 2), M).reshape(-1, 2)
+
+        # 마커가 2~3개뿐이면 회전 + 이동 + 배율(닮음 변환)로 보정
+        A, _ = cv2.estimateAffinePartial2D(cur, ref)
+        if A is None:
+            return pts
+        return pts @ A[:, :2].T + A[:, 2]
+
+    # 렌즈 왜곡 보정 (보정 계수가 있을 때만)
+    def _undistort(self, pts):
+        if self.camera_matrix is None or self.dist_coeffs is None:
+            return pts
+        return cv2.undistortPoints(pts.reshape(-1, 1, 2), self.camera_matrix, self.dist_coeffs,
+                                   P=self.camera_matrix).reshape(-1, 2)
+
+    # ------------------------------------------------------------
+    # 📌 저장 / 불러오기 (JSON)
+    # ------------------------------------------------------------
+    def save(self, path=None):
+        path = path or self.path
+        data = {
+            "homography": None if self.homography is None else self.homography.tolist(),
+            "ref_markers": {str(i): c for i, c in self.ref_markers.items()},
+            "marker_robot_xy": {str(i): xy for i, xy in self.marker_robot_xy.items()},
+            "samples": self.samples,
+            "camera_matrix": None if self.camera_matrix is None else self.camera_matrix.tolist(),
+            "dist_coeffs": None if self.dist_coeffs is None else self.dist_coeffs.tolist(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def load(self, path=None):
+        path = path or self.path
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        H = data.get("homography")
+        self.homography = None if H is None else np.array(H, dtype=np.float64)
+        self.ref_markers = {int(i): c for i, c in data.get("ref_markers", {}).items()}
+        self.marker_robot_xy = {int(i): xy for i, xy in data.get("marker_robot_xy", {}).items()}
+        self.samples = [tuple(s) for s in data.get("samples", [])]
+        K = data.get("camera_matrix")
+        D = data.get("dist_coeffs")
+        self.camera_matrix = None if K is None else np.array(K, dtype=np.float64)
+        self.dist_coeffs = None if D is None else np.array(D, dtype=np.float64)
+
+        # 호모그래피가 저장되지 않았지만 대응점이 충분하면 바로 계산
+        if self.homography is None:
+            self.fit()
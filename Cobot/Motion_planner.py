@@ -0,0 +1,86 @@
+# 🚀 구간별 속도 (%) — 빈 공간 이동은 빠르게, 물체 가까이에서는 느리게
+SEGMENT_SPEEDS = {
+    "transit": 80,   # 작업대 위 안전 높이에서 객체 위로 이동
+    "descend": 60,   # 객체 위 → 집기 직전 높이
+    "grasp": 30,     # 집기 직전 높이 → 집기 높이 (정밀)
+    "retreat": 50,   # 물체를 잡고 들어 올리기
+    "place": 60,     # 플레이스 위치로 조인트 이동
+}
+
+# 📦 플레이스 위치 이름 → move_coords_to_angles 번호
+PLACE_INDEX = {"A": 1, "B": 2, "C": 3, "D": 4}
+
+
+# -------------------------
+# 📌 경로 점 하나
+# -------------------------
+# kind: "coords"(좌표 이동), "angles"(조인트 이동), "open"/"close"(그리퍼), "check"(집기 확인)
+# blend > 0 이면 멈출 때까지 기다리지 않고 목표에서 blend(mm 또는 도) 안에 들어오면 다음 구간 명령을 보냄
+class Waypoint:
+    def __init__(self, stage, kind, target=None, speed=None, blend=0.0, timeout=10.0):
+        self.stage = stage      # 사이클 단계 이름 (지연 측정용: move_above / pickup / place)
+        self.kind = kind
+        self.target = target
+        self.speed = speed
+        self.blend = blend
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"Waypoint({self.stage}, {self.kind}, {self.target}, speed={self.speed}, blend={self.blend})"
+
+
+# -------------------------
+# 📌 픽앤플레이스 경로 계획기
+# -------------------------
+# 접근 → 하강 → 집기 → 후퇴 → 플레이스 를 경로 점 하나의 목록으로 만든다.
+# - 객체 위 안전 높이(hover_z)는 멈추지 않고 지나감 (blend) → 곧바로 하강
+# - 하강은 집기 직전 높이(approach_height)까지 빠르게, 마지막 구간만 느리게
+# - 집은 뒤에는 hover_z 까지 되돌아가지 않고 retreat_height 만 들어 올린 뒤 플레이스 조인트 이동으로 이어감
+# - 그리퍼가 이미 열려 있으면 (직전 플레이스) 열기 명령 생략, 닫혀 있으면 이동 중에 열기 (이동과 겹침)
+# - 위치(A~D)별 플레이스 경로 점은 처음에 한 번만 만들어 둠
+class TrajectoryPlanner:
+    def __init__(self, place_angles, hover_z=280.0, descend=110.0, min_z=100.0, approach_height=30.0,
+                 retreat_height=60.0, orientation=(180.0, 0.0, 0.0), speeds=None, blend_radius=15.0,
+                 place_blend=5.0):
+        self.hover_z = hover_z                 # 작업대 위 이동 높이 (mm)
+        self.descend = descend                 # 객체 위에서 내려가는 거리 (mm)
+        self.min_z = min_z                     # 집기 높이 하한 (mm)
+        self.approach_height = approach_height  # 느리게 내려가는 마지막 구간 길이 (mm)
+        self.retreat_height = retreat_height   # 집은 뒤 들어 올리는 높이 (mm)
+        self.orientation = list(orientation)   # 끝점 자세 (rx, ry, rz)
+        self.speeds = dict(SEGMENT_SPEEDS, **(speeds or {}))
+        self.blend_radius = blend_radius       # 객체 위 통과 블렌딩 반경 (mm)
+        self.place_blend = place_blend         # 집기 직전 높이 / 후퇴 → 다음 구간 전환 반경 (mm)
+
+        # 📦 위치별 플레이스 경로 점 (조인트 이동 → 그리퍼 열기)
+        self.place_plans = {}
+        for target, index in PLACE_INDEX.items():
+            if index in place_angles:
+                self.place_plans[target] = [
+                    Waypoint("place", "angles", list(place_angles[index]), self.speeds["place"],
+                             timeout=15.0),
+                    Waypoint("place", "open"),
+                ]
+
+    def pose(self, robot_xy, z):
+        return [float(robot_xy[0]), float(robot_xy[1]), z] + self.orientation
+
+    # robot_xy(mm) 객체를 집어 target 위치에 놓는 경로 점 목록
+    # gripper_open: 현재 그리퍼가 열려 있는지 (모르면 None → 열기 명령 보냄)
+    def plan(self, robot_xy, target, gripper_open=None):
+        hover = self.pose(robot_xy, self.hover_z)
+        grasp = self.pose(robot_xy, max(self.hover_z - self.descend, self.min_z))
+        approach = self.pose(robot_xy, min(grasp[2] + self.approach_height, self.hover_z))
+        lift = self.pose(robot_xy, min(grasp[2] + self.retreat_height, self.hover_z))
+
+        plan = [Waypoint("move_above", "coords", hover, self.speeds["transit"], blend=self.blend_radius)]
+        if not gripper_open:
+            plan.append(Waypoint("move_above", "open"))  # 이동과 겹쳐서 실행
+        plan += [
+            Waypoint("pickup", "coords", approach, self.speeds["descend"], blend=self.place_blend),
+            Waypoint("pickup", "coords", grasp, self.speeds["grasp"]),
+            Waypoint("pickup", "close"),
+            Waypoint("pickup", "check"),
+            Waypoint("pickup", "coords", lift, self.speeds["retreat"], blend=self.place_blend),
+        ]
+        return plan + self.place_plans[target]
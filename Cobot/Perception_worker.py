@@ -0,0 +1,61 @@
+# -------------------------
+# 📌 라이브러리 불러오기
+# -------------------------
+
+from PyQt5.QtCore import QThread, pyqtSignal  # 작업 스레드 및 스레드 간 신호 전달용
+
+from Pickup_perception import PickupPerception  # ArUco ROI + 색상 객체 검출 파이프라인 (Qt 비의존)
+
+
+# -------------------------
+# 📌 인식(비전) 전용 작업 스레드
+# -------------------------
+# GUI 스레드의 QTimer(100ms) 대신 별도 스레드가 카메라 프레임이 들어오는 대로 처리하고,
+# 결과(ROI, 객체 목록)를 신호로 GUI 에 전달한다.
+# → 로봇 동작(time.sleep) 중에도 인식이 멈추지 않고, 인식 속도가 카메라 fps 를 따라감
+# pool(PerceptionPool)을 주면 검출은 작업 프로세스들이 프레임을 겹쳐 처리하고, 이 스레드는 순서대로 추적·전달만 함
+class PerceptionWorker(QThread):
+    # (원본 프레임, 인식 결과 dict) 전달
+    detection_ready = pyqtSignal(object, object)
+    # 카메라가 끊기거나 영상이 끝나 인식을 멈췄을 때 상태 문구 전달
+    source_ended = pyqtSignal(str)
+
+    def __init__(self, cap, hsv_ranges, min_area=200, margin=30, full_search_interval=30, scale=1,
+                 detect_interval=1, pool=None, refresh_interval=0, parent=None):
+        super().__init__(parent)
+        self.cap = cap                    # ThreadedCapture (최신 프레임 제공)
+        self.running = True
+
+        # 🔍 ArUco ROI 추적 + 색상 세그멘테이션 파이프라인
+        self.pipeline = PickupPerception(hsv_ranges, min_area=min_area, margin=margin,
+                                         full_search_interval=full_search_interval, scale=scale,
+                                         detect_interval=detect_interval, pool=pool,
+                                         refresh_interval=refresh_interval)
+
+    def run(self):
+        while self.running:
+            # 📸 캡처 스레드가 받아 둔 최신 프레임 (새 프레임이 올 때까지 대기)
+            ret, frame, index, timestamp = self.cap.read_with_info(timeout=0.5)
+            if not ret:
+                # 캡처가 끝났으면 read 가 기다리지 않고 바로 실패하므로 GUI 에 알리고 종료
+                # (아직 캡처 중이면 위에서 0.5초 기다린 뒤라 그대로 다시 읽음)
+                if not self.cap.running:
+                    if self.running:
+                        self.source_ended.emit("❌ 카메라 연결 끊김 또는 영상 끝 (인식 중지)")
+                    break
+                continue
+
+            # 검출이 끝난 프레임부터 넣은 순서대로 전달 (풀이 없으면 이번 프레임 바로)
+            tag = (frame, index, timestamp)
+            for (done_frame, done_index, captured), result in self.pipeline.push(frame, timestamp, tag):
+                result["index"] = done_index
+                result["timestamp"] = captured
+                self.detection_ready.emit(done_frame, result)
+
+    # 프레임 한 장 처리 (ROI + 색상 객체 검출 + 추적은 PickupPerception 이 담당)
+    def process(self, frame, timestamp=None):
+        return self.pipeline.process(frame, timestamp)
+
+    def stop(self):
+        self.running = False
+        self.wait()
@@ -0,0 +1,252 @@
+# -------------------------
+# 📌 라이브러리 불러오기
+# -------------------------
+
+import os  # 경로 처리용
+import sys  # 모듈 경로 추가
+import argparse  # 시뮬레이션 옵션
+import json  # 결과 저장
+import math  # 거리 계산
+import random  # 객체 배치
+import threading  # 가상 인식 스레드
+import time  # 시간 측정
+
+import numpy as np  # 통계 계산
+
+# 📂 OpenCV 폴더의 공용 모듈(Metrics 등)을 불러올 수 있도록 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "OpenCV"))
+from Pick_place_controller import PickPlaceController  # GUI 와 같은 제어기 그대로 사용
+from Coordinate_calibration import PixelToRobotCalibration
+from Simulated_robot import MotionTimeModel, SimulatedMyCobot320
+from Metrics import metrics  # 사이클 단계별 시간 (auto_run 안의 스팬)
+
+
+# -------------------------
+# 📌 픽앤플레이스 부하 시험
+# -------------------------
+# 로봇·카메라 없이 PickPlaceController.auto_run 을 수천 번 돌려 사이클 시간 분포와
+# 명령별 시간 비중을 잰다. 로봇은 SimulatedMyCobot320, 인식은 가상 작업대 상태로 대신한다.
+#
+#   python Pick_cycle_sim.py --runs 2000 --objects 4 --time-scale 0.02
+#   python Pick_cycle_sim.py --runs 500 --drop-rate 0.01 --grip-miss-rate 0.05 --json sim.json
+#   python Pick_cycle_sim.py --runs 500 --legacy-motion   → 경로 계획 없이 버튼 동작 순서 (비교용)
+#
+# 시간은 time_scale 로 나눠 실제 로봇 기준 초로 환산한다.
+# 제어기 안의 명령 제한 시간(timeout)은 배율이 적용되지 않으므로
+# 실패 주입 시 제한 시간 초과 구간은 실제보다 길게 나타난다.
+
+
+# -------------------------
+# 📌 가상 작업대
+# -------------------------
+# 로봇 좌표(mm) 위에 색상 객체를 흩어 놓고, 그리퍼를 닫은 위치 근처의 객체를 집어 간 것으로 처리한다.
+# 픽셀 좌표 = 로봇 좌표(mm) 로 두고 단위 호모그래피 보정을 쓰므로 좌표 변환 오차는 없다.
+class SimulatedTable:
+    def __init__(self, colors, area=((180.0, 320.0), (-100.0, 100.0)), grip_radius=15.0, seed=None):
+        self.colors = colors
+        self.area = area
+        self.grip_radius = grip_radius
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.objects = []  # [(색상, (x, y)), ...]
+
+    def reset(self, count):
+        (x_min, x_max), (y_min, y_max) = self.area
+        with self.lock:
+            self.objects = []
+            while len(self.objects) < count:
+                xy = (self.rng.uniform(x_min, x_max), self.rng.uniform(y_min, y_max))
+                # 서로 겹치지 않게 배치
+                if all(math.dist(xy, o) > self.grip_radius * 3 for _, o in self.objects):
+                    self.objects.append((self.rng.choice(self.colors), xy))
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.objects)
+
+    # 그리퍼를 닫은 로봇 좌표 근처에 객체가 있으면 집어 감
+    def grip(self, coords):
+        with self.lock:
+            for obj in self.objects:
+                if math.dist(obj[1], coords[:2]) <= self.grip_radius:
+                    self.objects.remove(obj)
+                    return True
+        return False
+
+
+# -------------------------
+# 📌 가상 인식 스레드 (카메라 + PerceptionWorker 대신)
+# -------------------------
+# frame_interval 마다 작업대 상태를 "캡처"하고, latency 뒤에 인식 결과로 넣어 준다.
+# refresh_interval: PickupPerception 의 ChangeGate 처럼 작업대가 그대로면 검출 없이 직전 결과를 재사용
+# (detected=False, unchanged=True), 그래도 N 프레임마다 한 번은 검출 (0 = 매번 검출)
+class SimulatedPerception(threading.Thread):
+    def __init__(self, controller, table, frame_interval=1 / 30, latency=0.03, refresh_interval=0):
+        super().__init__(daemon=True)
+        self.controller = controller
+        self.table = table
+        self.frame_interval = frame_interval
+        self.latency = latency
+        self.refresh_interval = refresh_interval
+        self.reference = None            # 마지막으로 검출한 작업대 상태
+        self.unchanged = 0
+        self.refresh_requested = False
+        self.running = True
+        controller.request_refresh = self.request_refresh
+
+    def request_refresh(self):
+        self.refresh_requested = True
+
+    # ChangeGate.changed 와 같은 규칙: 새로 검출할지 (검출하면 기준 상태를 바꿈)
+    def changed(self, objects):
+        if self.refresh_requested:
+            self.refresh_requested = False
+            self.reference = None
+        if (self.refresh_interval > 0 and self.reference == objects
+                and self.unchanged + 1 < self.refresh_interval):
+            self.unchanged += 1
+            return False
+        self.reference = objects
+        self.unchanged = 0
+        return True
+
+    def run(self):
+        while self.running:
+            captured = time.monotonic()
+            objects = self.table.snapshot()
+            result = {"roi": (0, 0, 1, 1), "marker_pts": None, "theta": 0.0, "markers": {},
+                      "timestamp": captured}
+            if self.changed(objects):
+                time.sleep(self.latency)
+                result.update(objects=objects, detected=True)
+            else:
+                result.update(objects=self.reference, detected=False, unchanged=True)
+            self.controller.store_detection(result)
+            time.sleep(max(0.0, captured + self.frame_interval - time.monotonic()))
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+
+def percentiles(values):
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "mean": 0.0}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "mean": float(np.mean(values))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시뮬레이션 로봇으로 auto_run 반복 실행 → 사이클 시간 분포 측정")
+    parser.add_argument("--runs", type=int, default=100, help="auto_run 반복 횟수")
+    parser.add_argument("--objects", type=int, default=4, help="매 회 작업대에 놓을 객체 수")
+    parser.add_argument("--time-scale", type=float, default=0.05,
+                        help="로봇 동작·지연 시간 배율 (0.05 = 20배 빠르게)")
+    parser.add_argument("--latency", type=float, default=0.008, help="시리얼 왕복 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.004, help="시리얼 지연 흔들림 (초)")
+    parser.add_argument("--joint-speed", type=float, default=120.0, help="속도 100 관절 속도 (deg/s)")
+    parser.add_argument("--linear-speed", type=float, default=200.0, help="속도 100 직선 속도 (mm/s)")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="명령 누락 확률")
+    parser.add_argument("--read-error-rate", type=float, default=0.0, help="상태 조회 오류 확률")
+    parser.add_argument("--grip-miss-rate", type=float, default=0.0, help="집기 실패 확률")
+    parser.add_argument("--refresh-interval", type=int, default=30,
+                        help="작업대가 그대로면 검출 생략, 그래도 N 프레임마다 한 번은 검출 (0 = 매번 검출)")
+    parser.add_argument("--legacy-motion", action="store_true",
+                        help="경로 계획기 대신 객체 위 → 픽업 → 플레이스 버튼 동작을 차례로 실행")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+    scale = args.time_scale
+
+    metrics.enable({"cell": "sim"})
+
+    table = SimulatedTable(["yellow", "red", "green", "pupple"], seed=args.seed)
+    robot = SimulatedMyCobot320(
+        motion_model=MotionTimeModel(joint_speed=args.joint_speed, linear_speed=args.linear_speed),
+        latency=args.latency, jitter=args.jitter, drop_rate=args.drop_rate,
+        read_error_rate=args.read_error_rate, grip_miss_rate=args.grip_miss_rate,
+        time_scale=scale, grip_check=table.grip, seed=args.seed)
+
+    # 상태 문구는 출력하지 않음 (수천 회 반복)
+    controller = PickPlaceController(robot, status=lambda text: None, name="sim",
+                                     planned_motion=not args.legacy_motion)
+    # 픽셀 = 로봇 좌표(mm) 로 보는 단위 보정 (저장된 보정 파일은 사용하지 않음)
+    controller.calibration = PixelToRobotCalibration()
+    controller.calibration.homography = np.eye(3)
+    # 완료 확인 간격도 시간 배율에 맞춤 (인식 결과는 알림으로 받으므로 확인 간격 없음)
+    controller.motion.poll_min *= scale
+    controller.motion.poll_max *= scale
+
+    perception = SimulatedPerception(controller, table, frame_interval=scale / 30, latency=0.03 * scale,
+                                     refresh_interval=args.refresh_interval)
+    perception.start()
+
+    run_times, pick_times, left_over = [], [], 0
+    for run in range(args.runs):
+        table.reset(args.objects)
+        started = time.monotonic()
+        controller.auto_run()
+        elapsed = (time.monotonic() - started) / scale  # 실제 로봇 시간으로 환산
+
+        remaining = len(table.snapshot())
+        picked = args.objects - remaining
+        left_over += remaining
+        run_times.append(elapsed)
+        if picked:
+            pick_times.append(elapsed / picked)
+
+        if (run + 1) % max(1, args.runs // 10) == 0:
+            print(f"  {run + 1}/{args.runs} 회 완료 (이번 회 {elapsed:.1f}s, {picked}개)")
+
+    perception.stop()
+    stats = controller.shutdown()
+
+    # -------------------------
+    # 📌 결과 출력 (시간은 모두 실제 로봇 기준 초)
+    # -------------------------
+    total = sum(run_times)
+    report = {
+        "runs": args.runs,
+        "objects_per_run": args.objects,
+        "objects_left": left_over,
+        "run_time": percentiles(run_times),
+        "pick_time": percentiles(pick_times),
+        "commands": {name: {"count": st["count"],
+                            "exec_total": st["exec_total"] / scale,
+                            "exec_avg": st["exec_avg"] / scale,
+                            "exec_max": st["exec_max"] / scale,
+                            "wait_avg": st["wait_avg"] / scale}
+                     for name, st in stats.items()},
+        "robot": robot.stats(),
+        # 사이클 단계별 평균 (auto_run 스팬, 실제 로봇 기준 초)
+        "stages": {name: {"count": h["count"], "avg": h["sum"] / h["count"] / scale, "max": h["max"] / scale}
+                   for name, h in metrics.snapshot()["histograms"].items()
+                   if name.startswith("cycle.") and h["count"]},
+    }
+
+    mode = "버튼 동작 순서" if args.legacy_motion else "경로 계획"
+    print(f"\nauto_run {args.runs}회 ({mode}), 회당 객체 {args.objects}개, 남은 객체 합계 {left_over}개")
+    for key in ("run_time", "pick_time"):
+        p = report[key]
+        print(f"  {key:<10} p50 {p['p50']:.2f}s  p90 {p['p90']:.2f}s  p99 {p['p99']:.2f}s  평균 {p['mean']:.2f}s")
+
+    # 어디서 시간이 쓰이는지: 명령별 실행 시간 합계 / 전체 시간
+    print(f"\n  {'명령':<16}{'횟수':>8}{'평균 s':>10}{'최대 s':>10}{'비율':>8}")
+    busy = 0.0
+    for name, st in sorted(report["commands"].items(), key=lambda kv: -kv[1]["exec_total"]):
+        busy += st["exec_total"]
+        print(f"  {name:<16}{st['count']:>8}{st['exec_avg']:>10.2f}{st['exec_max']:>10.2f}"
+              f"{st['exec_total'] / total:>8.1%}")
+    print(f"  {'(로봇 대기 외)':<16}{'':>8}{'':>10}{'':>10}{max(0.0, total - busy) / total:>8.1%}")
+    print(f"\n  {'사이클 단계':<24}{'횟수':>8}{'평균 s':>10}{'최대 s':>10}")
+    for name, st in report["stages"].items():
+        print(f"  {name:<24}{st['count']:>8}{st['avg']:>10.2f}{st['max']:>10.2f}")
+    print(f"\n  주입된 실패: {report['robot']['injected']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+# -------------------------
+# 📌 라이브러리 불러오기
+# -------------------------
+
+import os  # 경로 처리용
+import math  # 삼각함수 및 수학 계산용
+import time  # 시간 지연 및 시간 측정용
+import threading  # 새 인식 결과 알림 (자동 모드 대기)
+import numpy as np  # NumPy - 행렬 및 수치 계산용
+from concurrent.futures import Future, ThreadPoolExecutor  # 로봇 동작 시퀀스 전용 실행기 / 명령 완료 결과
+
+from Robot_motion import MotionMonitor  # 로봇 이동/그리퍼 완료 감지
+from Robot_command_queue import RobotCommandQueue  # 로봇 명령 FIFO (시리얼 전용 스레드)
+from Coordinate_calibration import PixelToRobotCalibration  # 픽셀 → 로봇 좌표 호모그래피 보정
+from Motion_planner import PLACE_INDEX, TrajectoryPlanner  # 접근·하강·후퇴·플레이스 경로 계획
+from Metrics import metrics  # 단계별 지연 측정
+
+# 🎨 HSV 범위별 색상 목록 정의 (각 물체 색에 따라 조절 가능, 앞쪽 색상이 우선)
+HSV_RANGES = [
+    ("red",    (0, 100, 100),    (10, 255, 255)),
+    ("orange", (11, 100, 100),   (20, 255, 255)),
+    ("yellow", (15, 80, 80),     (40, 255, 255)),
+    ("green",  (45, 100, 100),   (75, 255, 255)),
+    ("sky",    (76, 100, 100),   (95, 255, 255)),
+    ("blue",   (100, 100, 100),  (130, 255, 255)),
+    ("pupple", (131, 100, 100),  (160, 255, 255)),
+    ("pink",   (161, 100, 100),  (170, 255, 255)),
+    ("brown",  (10, 150, 20),    (20, 200, 200)),
+    ("black",  (0, 0, 0),        (180, 255, 50))
+]
+
+# 🎨 색상별 플레이스 위치 (자동 분류 대상)
+COLOR_TO_PLACE = {"yellow": "A", "red": "B", "green": "C", "pupple": "D"}
+
+
+# -------------------------
+# 📌 픽앤플레이스 제어기 (Qt 비의존)
+# -------------------------
+# 로봇 한 대의 명령 큐 / 좌표 보정 / 인식 결과 상태 / 수동·자동 동작을 담당한다.
+# - MyCobotPickupApp(GUI 한 셀)과 CellManager(여러 셀, 화면 없음)가 같은 제어기를 사용
+# - 인식 결과는 store_detection() 으로 넣고, 동작은 run_robot_task() 로 전용 실행기에서 실행
+# - 상태 문구 / 플레이스 위치 선택은 콜백으로 알림 (GUI 에서는 Qt 신호의 emit 을 넘김)
+class PickPlaceController:
+    # mycobot: MyCobot320 또는 SimulatedMyCobot320, calibration_path: 좌표 보정 파일
+    # status(문구), place_selected(위치): 알림 콜백 (없으면 상태 문구는 name 과 함께 출력)
+    # planned_motion: 자동 모드에서 경로 계획기 사용 (False 면 객체 위 → 픽업 → 플레이스 버튼 동작을 차례로 실행)
+    def __init__(self, mycobot, calibration_path=None, status=None, place_selected=None, name="cell",
+                 color_to_place=None, hsv_ranges=None, planned_motion=True):
+        self.name = name
+        self.status = status or (lambda text: print(f"[{self.name}] {text}"))
+        self.place_selected = place_selected or (lambda target: None)
+        # 다음 프레임을 변화 감지 없이 검출하도록 요청 (인식 파이프라인이 있으면 그 request_refresh 로 바꿔 연결)
+        self.request_refresh = lambda: None
+
+        # 🤖 로봇 제어 객체와 이 로봇 전용 명령 큐 (셀마다 따로 → 한 셀의 지연이 다른 셀을 막지 않음)
+        self.mycobot = mycobot
+        # ⏱️ 고정 sleep 대신 로봇 상태로 이동·그리퍼 완료를 확인하는 감지기
+        self.motion = MotionMonitor(self.mycobot, gripper_id=14)
+        # 📨 모든 로봇 명령은 이 큐를 통해 순서대로 실행 (시리얼 접근은 큐 스레드 하나만 사용)
+        self.robot = RobotCommandQueue(self.mycobot, self.motion)
+        # 🤖 로봇 동작 전용 실행기 (동작은 한 번에 하나씩)
+        self.robot_executor = ThreadPoolExecutor(max_workers=1)
+
+        # 📌 인식 및 좌표 관련 변수 초기화
+        self.roi_coords = None           # ROI 영역 (x1, y1, x2, y2)
+        self.roi_marker_pts = None       # ROI 마커 중심 좌표 2개 (회전각 계산용)
+        self.roi_theta = None            # ROI 회전각 (ArUco 추적기가 계산해 둔 값)
+        self.roi_markers = {}            # 현재 프레임 마커 ID → 중심 좌표
+
+        # 📐 픽셀 → 로봇 좌표 보정 모델 (파일이 없으면 기존 ROI 비례식으로 변환)
+        self.calibration_path = calibration_path
+        self.calibration = PixelToRobotCalibration(calibration_path)
+        self.latest_coords = None        # 실시간 객체 중심 좌표
+        self.locked_coords = None        # 이동 시점에 고정된 객체 중심 좌표
+        self.move_coords = None          # 마지막 객체 위 이동 좌표 (픽업 높이 계산용)
+        self.detected_color_name = None  # 대상 객체 색상
+        self.update_enabled = True       # 객체 중심 좌표를 실시간 업데이트할지 여부
+        self.latest_objects = []         # ROI 안에서 검출된 모든 객체 [(색상, (cx, cy)), ...]
+        self.latest_objects_time = 0.0   # latest_objects 를 만든 프레임의 캡처 시각
+        self.latest_tracks = []          # 추적 중인 객체 [(트랙 ID, 색상, (x, y), 신뢰도), ...]
+        self.target_track_id = None      # 수동 동작 대상 트랙 (사라질 때까지 같은 객체 유지)
+        # 🔔 새 인식 결과 알림: store_detection 이 객체 목록을 바꾸면 wait_for_objects 를 바로 깨움 (주기 확인 없음)
+        self.detection_cond = threading.Condition()
+        self.closed = False              # shutdown 후에는 대기 중인 자동 모드도 바로 종료
+
+        self.color_to_place = dict(color_to_place or COLOR_TO_PLACE)
+        self.hsv_ranges = list(hsv_ranges or HSV_RANGES)
+
+        # 📌 각 위치(A~D)로 이동하기 위한 조인트 각도 사전 정의
+        self.move_coords_to_angles = {
+            4: [-65.15, 8.17, -75.56, -8, 93.86, -10],       # D 위치 (예: 가장 왼쪽)
+            3: [-26, -33.92, -30.75, 0.66, 90.08, -155],     # C 위치
+            1: [54.58, -42.89, -11.16, -12.3, 90.61, -80],   # A 위치
+            2: [103.18, 9.75, -75.32, -11.16, 90.76, -30],   # B 위치
+        }
+
+        # 🛤️ 자동 모드 경로 계획기 (위치별 플레이스 경로 점은 여기서 미리 계산)
+        self.planner = TrajectoryPlanner(self.move_coords_to_angles) if planned_motion else None
+        # 마지막으로 예약한 명령 기준 로봇 상태 (중복 홈 이동 / 그리퍼 열기 생략용)
+        self.gripper_opened = None       # 그리퍼가 열려 있는지 (모르면 None)
+        self.arm_parked = False          # 팔이 카메라 시야 밖(홈 / 플레이스 위치)에 있는지
+
+    # ------------------------------------------------------------
+    # 📌 로봇 동작을 전용 실행기에서 실행 (GUI·인식 스레드에서 time.sleep 하지 않도록)
+    # ------------------------------------------------------------
+    def run_robot_task(self, func, *args):
+        future = self.robot_executor.submit(self._run_sequence, func, *args)
+        future.add_done_callback(self._on_robot_task_done)
+        return future
+
+    # 동작 함수는 명령을 큐에 예약만 하고 마지막 명령의 Future 를 반환 → 여기서 완료까지 대기
+    def _run_sequence(self, func, *args):
+        result = func(*args)
+        if isinstance(result, Future):
+            return result.result()
+        return result
+
+    def _on_robot_task_done(self, future):
+        error = future.exception()
+        if error is not None:
+            print(f"[로봇 작업 오류] {error!r}")
+            self.status(f"❌ 로봇 작업 오류: {error}")
+
+    # ------------------------------------------------------------
+    # 📌 1. 홈 위치 이동 버튼 동작: 그리퍼 닫고, 초기 자세로 이동
+    # ------------------------------------------------------------
+    def go_home_position(self):
+        # 그리퍼 닫기 (정지 상태 확인, 반응이 없을 때만 재전송)
+        self.robot.gripper_close()
+
+        home_angles = [0.0, 45.0, -90.0, -45.0, 90.0, -90.0]  # 표준 초기 각도
+        done = self.robot.send_angles(home_angles, 30, wait=False)
+        self.gripper_opened, self.arm_parked = False, True
+        self.status("✅ 홈 위치로 이동 완료")
+        return done
+
+    # ------------------------------------------------------------
+    # 📌 2. 객체 위로 이동 버튼 동작
+    # ------------------------------------------------------------
+    def move_above_object(self, pixel=None):
+        # pixel: 이동할 객체 중심 (없으면 실시간 인식된 좌표를 고정해서 사용)
+        if pixel is not None:
+            self.locked_coords = pixel
+            self.update_enabled = False
+        elif self.latest_coords:
+            self.locked_coords = self.latest_coords  # 현재 좌표를 고정
+            self.update_enabled = False  # 실시간 업데이트 일시 중단
+
+        if self.locked_coords and self.roi_coords:
+            robot_xy = self.pixel_to_robot(*self.locked_coords)
+            if robot_xy is None:
+                self.status("❌ ROI 회전각 계산 실패")
+                self.update_enabled = True
+                return None
+            robot_x, robot_y = robot_xy
+
+            target_coords = [robot_x, robot_y, 280.0, 180.0, 0.0, 0.0]  # Z고정
+            self.move_coords = target_coords  # 다음 이동에 사용
+            # 이동(도착 확인까지) → 그리퍼 열기 순으로 큐에 예약
+            self.robot.send_coords(target_coords, 30, 0, timeout=10)
+
+            print(f"[좌표 전송] X={robot_x:.1f}, Y={robot_y:.1f}, Z=280")
+            self.status(f"🤖 ROI 회전보정 이동: X={robot_x:.1f}, Y={robot_y:.1f}")
+
+            self.update_enabled = True
+            self.gripper_opened, self.arm_parked = True, False
+            return self.robot.gripper_open()
+        else:
+            self.status("❌ ROI 또는 객체 중심 좌표 없음")
+            return None
+
+    # ------------------------------------------------------------
+    # 📌 픽셀 좌표 → 로봇 좌표(mm) 변환 (ROI 회전 보정 + 4분면 보정)
+    # ------------------------------------------------------------
+    def pixel_to_robot(self, x, y):
+        # 보정 모델이 있으면 호모그래피로 변환
+        if self.calibration.ready:
+            robot_x, robot_y = self.calibration.transform([(x, y)], self.roi_markers)[0]
+            return float(robot_x), float(robot_y)
+
+        # 보정 모델이 없으면 기존 방식 (ROI 비례식 + 4분면 보정)
+        if not self.roi_coords or self.roi_theta is None:
+            return None
+
+        x1, y1, x2, y2 = self.roi_coords
+        roi_center_x = (x1 + x2) // 2
+        roi_center_y = (y1 + y2) // 2
+        roi_width = x2 - x1
+        roi_height = y2 - y1
+
+        # ArUco 마커 2개를 기준으로 추적기가 계산해 둔 회전 각도(theta)
+        theta = self.roi_theta
+
+        # ROI 중심 기준 객체의 상대 위치 (픽셀)
+        dx_pixel = x - roi_center_x
+        dy_pixel = y - roi_center_y
+
+        # 회전 보정: 회전된 ROI 기준으로 좌표 변환
+        dx_rot = dx_pixel * math.cos(theta) - dy_pixel * math.sin(theta)
+        dy_rot = -dx_pixel * math.sin(theta) - dy_pixel * math.cos(theta)
+
+        # 4분면 보정: 방향별 감도 차이 보정
+        if x >= roi_center_x and y <= roi_center_y:
+            dx_rot *= -0.1
+            dy_rot *= 0.8
+        elif x < roi_center_x and y <= roi_center_y:
+            dx_rot *= 0.8
+            dy_rot *= -1.5
+        elif x < roi_center_x and y > roi_center_y:
+            dx_rot *= -1.5
+            dy_rot *= 0.5
+        elif x >= roi_center_x and y > roi_center_y:
+            dx_rot *= 0.8
+            dy_rot *= 1.5
+
+        # 픽셀 → mm 변환 (ROI 크기 기준으로 비례식 적용)
+        scale_x = 200.0 / roi_width
+        scale_y = 200.0 / roi_height
+        dx_mm = dx_rot * scale_x
+        dy_mm = dy_rot * scale_y
+
+        # 로봇 이동 위치 계산
+        robot_x = 250.0 + dx_mm  # 기준점 250mm 기준
+        robot_y = 0.0 + dy_mm
+        return robot_x, robot_y
+
+    # 여러 픽셀 좌표를 한 번에 로봇 좌표로 변환 → (N, 2) 배열 (변환 불가 시 None)
+    def pixels_to_robot(self, pixels):
+        if self.calibration.ready:
+            return self.calibration.transform(pixels, self.roi_markers)
+        converted = [self.pixel_to_robot(x, y) for x, y in pixels]
+        if any(c is None for c in converted):
+            return None
+        return np.array(converted, dtype=np.float64).reshape(-1, 2)
+
+    # ------------------------------------------------------------
+    # 📌 좌표 보정점 추가: 현재 객체 중심(픽셀) ↔ 현재 로봇 끝 위치(mm)
+    # ------------------------------------------------------------
+    def add_calibration_sample(self):
+        if not self.latest_coords:
+            self.status("❌ 보정점 추가 실패: 객체 중심 좌표 없음")
+            return
+
+        coords = self.robot.call("get_coords").result()
+        if not coords:
+            self.status("❌ 보정점 추가 실패: 로봇 좌표를 읽을 수 없음")
+            return
+
+        self.calibration.add_sample(self.latest_coords, coords[:2], self.roi_markers)
+        count = len(self.calibration.samples)
+
+        # 4점 이상 모이면 호모그래피 계산 후 저장
+        if self.calibration.fit():
+            self.calibration.save(self.calibration_path)
+            self.status(f"📐 보정 완료 ({count}점) → {os.path.basename(self.calibration_path)} 저장")
+        else:
+            self.calibration.save(self.calibration_path)
+            self.status(f"📐 보정점 {count}개 저장 (4개 이상 필요)")
+
+    # ------------------------------------------------------------
+    # 📌 3. 픽업 버튼 동작: Z축 낮추고 그리퍼로 물체 잡기
+    # ------------------------------------------------------------
+    def pickup_object(self):
+        pickup_coords = self.move_coords.copy()
+        pickup_coords[2] = max(pickup_coords[2] - 110, 100)  # 너무 낮아지지 않도록 최소값 제한
+        self.robot.send_coords(pickup_coords, 40, 0, timeout=10)
+
+        # 그리퍼 닫기 후 정지 상태 확인 (물체를 못 잡았으면 알림)
+        self.robot.gripper_close()
+        self.robot.gripper_holding().add_done_callback(self._check_holding)
+        self.gripper_opened, self.arm_parked = False, False
+
+        return self.robot.send_coords(self.move_coords, 40, 0, wait=False)  # 다시 원래 높이로 복귀
+
+    def _check_holding(self, future):
+        if not future.cancelled() and future.exception() is None and future.result() is False:
+            metrics.count("cycle.grip_miss")
+            self.status("⚠️ 그리퍼에 물체가 감지되지 않음")
+
+    # ------------------------------------------------------------
+    # 📌 4. 플레이스 버튼 동작: 드롭다운 위치로 이동 후 놓기
+    # ------------------------------------------------------------
+    def place_object(self, target):
+        # target: 선택된 위치 A/B/C/D (GUI 스레드에서 콤보박스 값을 읽어 전달)
+        target_angles = self.move_coords_to_angles[PLACE_INDEX[target]]
+        # 고정 6초 대기 대신 조인트 각도 도착 확인
+        arrived = self.robot.send_angles(target_angles, 40, timeout=15)
+        opened = self.robot.gripper_open()  # 그리퍼 열기
+        self.gripper_opened, self.arm_parked = True, True
+        self._watch_place(target, arrived, opened)
+        return opened
+
+    # 플레이스 도착 실패 / 배치 완료 알림
+    def _watch_place(self, target, arrived, opened):
+        def on_arrived(future):
+            if not future.cancelled() and future.exception() is None and not future.result():
+                metrics.count("cycle.arrival_timeout")
+                self.status(f"⚠️ {target} 위치 도착 확인 실패 (제한 시간 초과)")
+
+        def on_opened(future):
+            if not future.cancelled() and future.exception() is None:
+                self.status(f"📦 {target} 위치로 배치 완료")
+
+        arrived.add_done_callback(on_arrived)
+        opened.add_done_callback(on_opened)
+
+    # ------------------------------------------------------------
+    # 📌 계획된 경로로 한 번에 픽앤플레이스 (자동 모드)
+    # ------------------------------------------------------------
+    # 객체 위 통과 → 하강 → 집기 → 들어 올리기 → 플레이스 를 명령 큐에 한꺼번에 예약
+    # blend 구간은 도착(정지)을 기다리지 않고 목표 근처에서 다음 구간 명령을 보냄
+    # → 단계 이름(move_above / pickup / place)별 마지막 명령의 Future
+    def pick_and_place(self, robot_xy, target):
+        plan = self.planner.plan(robot_xy, target, self.gripper_opened)
+        self.move_coords = plan[0].target
+        stages = {}
+        arrived = None
+        pending = None  # 블렌딩 중인 이동 (다음 이동을 보내기 전에 근처 도착 확인)
+        for waypoint in plan:
+            if waypoint.kind in ("coords", "angles"):
+                if pending is not None:
+                    stages[pending.stage] = self.robot.wait_near(
+                        pending.target, pending.kind, pending.blend, pending.timeout)
+                if waypoint.kind == "coords":
+                    future = self.robot.send_coords(waypoint.target, waypoint.speed, 0,
+                                                    wait=not waypoint.blend, timeout=waypoint.timeout)
+                else:
+                    future = self.robot.send_angles(waypoint.target, waypoint.speed,
+                                                    wait=not waypoint.blend, timeout=waypoint.timeout)
+                    arrived = future
+                pending = waypoint if waypoint.blend else None
+            elif waypoint.kind == "open":
+                future = self.robot.gripper_open()
+            elif waypoint.kind == "close":
+                future = self.robot.gripper_close()
+            else:
+                future = self.robot.gripper_holding()
+                future.add_done_callback(self._check_holding)
+            stages[waypoint.stage] = future
+        self.gripper_opened, self.arm_parked = True, True
+
+        print(f"[경로 전송] X={robot_xy[0]:.1f}, Y={robot_xy[1]:.1f} → {target} ({len(plan)}개 구간)")
+        self._watch_place(target, arrived, stages["place"])
+        return stages
+
+    # ------------------------------------------------------------
+    # 📌 인식 결과 저장: GUI / 셀 관리자의 인식 작업 / 부하 시험이 결과를 이 함수로 넣음
+    # ------------------------------------------------------------
+    def store_detection(self, result):
+        if result["roi"] is None:
+            return
+
+        self.roi_coords = result["roi"]                # ROI 영역 저장
+        self.roi_marker_pts = result["marker_pts"]     # 나중에 회전 각도 계산에 사용
+        self.roi_theta = result["theta"]               # 캐시된 ROI 회전각
+        self.roi_markers = result["markers"]           # 마커 ID → 중심 (카메라 이동 보정용)
+
+        # ROI 안의 모든 객체 목록 저장 (자동 모드에서 픽업 순서 계획에 사용) → 기다리는 자동 모드에 알림
+        # 검출한 프레임과 장면이 그대로라 직전 검출을 재사용한 프레임(unchanged)은 새 인식 결과로 침
+        # (예측만 한 프레임은 제외). 플레이스 직후에는 request_refresh 로 다시 검출하게 하므로
+        # 재사용 결과도 픽업 뒤의 검출에서 나온 목록임
+        if result.get("detected", True) or result.get("unchanged"):
+            with self.detection_cond:
+                self.latest_objects = result["objects"]
+                self.latest_objects_time = result["timestamp"]
+                self.detection_cond.notify_all()
+        self.latest_tracks = result.get("tracks", [])
+
+        # 대상 트랙의 평활화된 위치를 수동 동작 좌표로 사용 (실시간 업데이트가 가능할 때만)
+        target = self.select_target_track(self.latest_tracks)
+        if target is not None and self.update_enabled:
+            _, color_name, (x, y), _ = target
+            self.detected_color_name = color_name  # <- 객체의 색상 이름 저장
+            self.latest_coords = (int(round(x)), int(round(y)))
+
+    # 대상 트랙 고르기: 이미 정한 트랙이 살아 있으면 유지, 없으면 신뢰도가 가장 높은 트랙
+    def select_target_track(self, tracks):
+        for track in tracks:
+            if track[0] == self.target_track_id:
+                return track
+        if not tracks:
+            self.target_track_id = None
+            return None
+        best = max(tracks, key=lambda t: (t[3], -t[0]))
+        self.target_track_id = best[0]
+        return best
+
+    # ------------------------------------------------------------
+    # 📌 시작~끝 자동화: ROI 가 빌 때까지 연속 분류 (픽업 사이에 홈 복귀 없음)
+    # ------------------------------------------------------------
+    def auto_run(self, max_attempts=3):
+        # 1. 홈위치 이동 (처음 한 번만, 경로 계획 모드에서는 팔이 이미 시야 밖이면 생략)
+        if self.planner is None or not self.arm_parked:
+            with metrics.span("cycle.go_home"):
+                self.go_home_position().result()
+
+        picked = 0
+        attempts = {}         # 같은 자리 객체 재시도 횟수 (집기 실패 시 무한 반복 방지)
+        last_xy = None        # 직전 픽업 위치 (로봇 좌표, mm)
+        self.request_refresh()
+        since = time.monotonic()  # 이 시각 이후에 찍힌 프레임의 인식 결과만 사용
+
+        while True:
+            self.status("🔄 객체 인식 대기 중...")
+
+            # 2. 로봇이 비켜난 뒤의 새 프레임에서 ROI 안의 모든 객체 목록 받기
+            with metrics.span("cycle.wait_for_objects"):
+                objects = self.wait_for_objects(since, timeout=10)
+            if objects is None:
+                self.status("❌ 객체 인식 실패 (10초 내)")
+                return
+
+            # 분류 대상 색상만 골라서 후보 목록 작성
+            targets = []
+            for color, pixel in objects:
+                if color not in self.color_to_place:
+                    continue
+                key = (color, pixel[0] // 20, pixel[1] // 20)
+                if attempts.get(key, 0) < max_attempts:
+                    targets.append((color, pixel, key))
+
+            # 후보 객체 좌표를 한 번에 로봇 좌표로 변환
+            candidates = []
+            if targets:
+                robot_xys = self.pixels_to_robot([pixel for _, pixel, _ in targets])
+                if robot_xys is not None:
+                    candidates = [(color, pixel, tuple(xy), key)
+                                  for (color, pixel, key), xy in zip(targets, robot_xys)]
+
+            if not candidates:
+                self.status(f"🎉 자동 작업 완료 ({picked}개 분류)")
+                return
+
+            # 3. 이동 거리가 가장 짧아지는 순서로 정렬 → 첫 번째 객체부터 처리
+            order = self.plan_pick_order(candidates, last_xy or (250.0, 0.0))
+            color, pixel, robot_xy, key = order[0]
+            attempts[key] = attempts.get(key, 0) + 1
+            target = self.color_to_place[color]
+            self.status(
+                f"✅ {color} 객체로 이동 중... (남은 후보 {len(order)}개, 플레이스 {target})")
+
+            # 4. 객체 위로 이동 → 픽업 → 플레이스 (명령만 예약하고 마지막 완료까지 대기)
+            self.detected_color_name = color
+            started = time.perf_counter()
+            if self.planner is not None:
+                self.place_selected(target)  # GUI 가 있으면 콤보박스에도 선택 위치 표시
+                stages = self.pick_and_place(robot_xy, target)
+                moved, lifted, placed = stages["move_above"], stages["pickup"], stages["place"]
+            else:
+                moved = self.move_above_object(pixel)
+                if moved is None:
+                    return
+                lifted = self.pickup_object()
+                self.place_selected(target)
+                placed = self.place_object(target)
+            # 단계별 시간 = 각 단계 마지막 명령이 끝난 시각의 차이
+            metrics.observe_chain([("cycle.move_above", moved), ("cycle.pickup", lifted),
+                                   ("cycle.place", placed)], started)
+            placed.result()
+            metrics.observe("cycle.pick", time.perf_counter() - started)
+            metrics.count("cycle.picked")
+
+            picked += 1
+            last_xy = robot_xy
+            # 플레이스가 끝난 장면을 다시 검출하게 함 (이전 검출을 재사용한 결과로 대기가 끝나지 않도록)
+            self.request_refresh()
+            since = time.monotonic()
+
+    # 탐욕적 최근접 이웃 순서: 현재 위치에서 가장 가까운 객체부터 차례로 방문
+    @staticmethod
+    def plan_pick_order(candidates, start_xy):
+        remaining = list(candidates)
+        order = []
+        cx, cy = start_xy
+        while remaining:
+            nearest = min(remaining, key=lambda c: math.hypot(c[2][0] - cx, c[2][1] - cy))
+            remaining.remove(nearest)
+            order.append(nearest)
+            cx, cy = nearest[2]
+        return order
+
+    # since 이후 캡처된 프레임의 인식 결과가 나올 때까지 대기 → 객체 목록 (시간 초과 / 종료 시 None)
+    # store_detection 의 알림으로 깨어나므로 결과가 들어온 즉시 반환 (로봇 작업 스레드에서 실행, UI·인식은 멈추지 않음)
+    def wait_for_objects(self, since, timeout=10):
+        with self.detection_cond:
+            ready = self.detection_cond.wait_for(
+                lambda: self.closed or (self.roi_coords is not None and self.latest_objects_time > since), timeout)
+            if not ready or self.closed:
+                return None
+            return list(self.latest_objects)
+
+    # 📴 로봇 작업 실행기 종료 + 대기 중인 로봇 명령 취소 → 명령별 지연 통계 반환
+    def shutdown(self):
+        with self.detection_cond:
+            self.closed = True
+            self.detection_cond.notify_all()
+        self.robot_executor.shutdown(wait=False)
+        self.robot.shutdown(cancel=True, wait=False)
+        return self.robot.latency_stats()
@@ -0,0 +1,150 @@
+# -------------------------
+# 📌 라이브러리 불러오기
+# -------------------------
+
+import queue  # 스레드 안전 FIFO 큐
+import threading  # 명령 실행 전용 스레드
+import time  # 지연 시간 측정용
+from concurrent.futures import Future  # 명령 완료 결과 전달용
+
+from Robot_motion import MotionMonitor  # 로봇 이동/그리퍼 완료 감지
+from Metrics import metrics  # 단계별 지연 측정 (명령별 대기/실행 시간)
+
+
+# -------------------------
+# 📌 로봇 명령 큐 (전용 스레드)
+# -------------------------
+# MyCobot320 시리얼 연결은 이 큐의 전용 스레드 하나만 사용한다.
+# - 이동/그리퍼 명령을 FIFO 로 쌓아 두고 순서대로 실행
+# - 명령마다 Future 를 돌려주므로, 호출한 쪽은 기다리지 않고 다음 자세를 계산·예약할 수 있음
+# - 아직 시작하지 않은 명령은 Future.cancel() 또는 cancel_pending() 으로 취소
+# - 명령별 대기 시간(큐에서 기다린 시간)과 실행 시간을 집계
+class RobotCommandQueue:
+    def __init__(self, mycobot, motion=None):
+        self.mycobot = mycobot
+        self.motion = motion or MotionMonitor(mycobot)
+
+        self.commands = queue.Queue()
+        self.serial_lock = threading.Lock()  # 큐 밖에서 직접 시리얼을 써야 할 때도 이 잠금 사용
+        self.stats_lock = threading.Lock()
+        self.latency = {}  # 명령 이름 → {"count", "exec_total", "exec_max", "exec_last", "wait_total"}
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # 전용 스레드: 큐에서 명령을 하나씩 꺼내 실행
+    def _run(self):
+        while True:
+            item = self.commands.get()
+            if item is None:
+                break  # 종료 신호
+            future, name, func, args, queued_at = item
+
+            # 취소된 명령은 건너뜀
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.monotonic()
+            try:
+                with self.serial_lock:
+                    result = func(*args)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finished = time.monotonic()
+            self._record(name, started - queued_at, finished - started)
+
+    def _record(self, name, wait_s, exec_s):
+        metrics.observe(f"robot.{name}", exec_s)
+        metrics.observe(f"robot.{name}.wait", wait_s)
+        with self.stats_lock:
+            entry = self.latency.setdefault(
+                name, {"count": 0, "exec_total": 0.0, "exec_max": 0.0, "exec_last": 0.0, "wait_total": 0.0})
+            entry["count"] += 1
+            entry["exec_total"] += exec_s
+            entry["exec_max"] = max(entry["exec_max"], exec_s)
+            entry["exec_last"] = exec_s
+            entry["wait_total"] += wait_s
+
+    # 임의의 함수를 명령으로 예약 → Future 반환
+    def submit(self, name, func, *args):
+        future = Future()
+        self.commands.put((future, name, func, args, time.monotonic()))
+        return future
+
+    # ------------------------------------------------------------
+    # 📌 자주 쓰는 명령
+    # ------------------------------------------------------------
+    # MyCobot320 메서드를 이름으로 예약 (예: call("get_coords"))
+    def call(self, method, *args):
+        return self.submit(method, getattr(self.mycobot, method), *args)
+
+    # 조인트 각도 이동 (wait=True 면 도착까지 확인한 뒤 완료, 결과: 도착 여부)
+    def send_angles(self, angles, speed, wait=True, timeout=15.0):
+        def job():
+            self.mycobot.send_angles(angles, speed)
+            if wait:
+                return self.motion.wait_until_arrival(angles, mode="angles", timeout=timeout)
+            return True
+        return self.submit("send_angles", job)
+
+    # 좌표 이동 (wait=True 면 도착까지 확인한 뒤 완료, 결과: 도착 여부)
+    def send_coords(self, coords, speed, mode=0, wait=True, tol=5.0, timeout=15.0):
+        def job():
+            self.mycobot.send_coords(coords, speed, mode)
+            if wait:
+                return self.motion.wait_until_arrival(coords, mode="coords", tol=tol, timeout=timeout)
+            return True
+        return self.submit("send_coords", job)
+
+    # 앞서 보낸 이동의 목표 근처에 들어올 때까지 대기 (결과: 도착 여부, 블렌딩용)
+    def wait_near(self, target, mode="coords", radius=15.0, timeout=15.0):
+        return self.submit("wait_near", self.motion.wait_until_near, target, mode, radius, timeout)
+
+    def gripper_open(self, timeout=3.0):
+        return self.submit("gripper_open", self.motion.gripper_open, timeout)
+
+    def gripper_close(self, timeout=3.0):
+        return self.submit("gripper_close", self.motion.gripper_close, timeout)
+
+    def gripper_holding(self):
+        return self.submit("gripper_holding", self.motion.gripper_holding)
+
+    # ------------------------------------------------------------
+    # 📌 취소 / 통계 / 종료
+    # ------------------------------------------------------------
+    # 아직 시작하지 않은 명령을 모두 취소 (실행 중인 명령은 끝까지 수행)
+    def cancel_pending(self):
+        cancelled = 0
+        while True:
+            try:
+                item = self.commands.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.commands.put(None)  # 종료 신호는 되돌려 놓음
+                break
+            if item[0].cancel():
+                cancelled += 1
+        return cancelled
+
+    def pending(self):
+        return self.commands.qsize()
+
+    # 명령별 지연 시간 통계 (초 단위, 평균 포함)
+    def latency_stats(self):
+        with self.stats_lock:
+            stats = {}
+            for name, entry in self.latency.items():
+                stats[name] = dict(entry)
+                stats[name]["exec_avg"] = entry["exec_total"] / entry["count"]
+                stats[name]["wait_avg"] = entry["wait_total"] / entry["count"]
+            return stats
+
+    def shutdown(self, cancel=True, wait=True):
+        if cancel:
+            self.cancel_pending()
+        self.commands.put(None)
+        if wait:
+            self.thread.join()
@@ -0,0 +1,124 @@
+# -------------------------
+# 📌 라이브러리 불러오기
+# -------------------------
+
+import math  # 목표까지 거리 계산용
+import time  # 시간 지연 및 시간 측정용
+
+
+# -------------------------
+# 📌 로봇 동작 완료 감지기
+# -------------------------
+# 고정 시간 sleep / get_coords 반복 조회 대신 로봇이 알려 주는 상태로 완료를 판단한다.
+# - 이동: is_in_position() → (지원 안 되면) get_coords()/get_angles() 허용 오차 비교
+# - 그리퍼: get_pro_gripper_status() 로 "정지" 상태가 될 때까지 확인, 반응 없을 때만 재전송
+# - 조회 간격은 짧게 시작해서 점점 늘림 (적응형 폴링 + 백오프) → 빨리 끝나는 동작은 빨리 감지
+# - 명령마다 제한 시간(timeout) 지정
+class MotionMonitor:
+    # get_pro_gripper_status() 반환값 (0: 동작 중, 1: 정지·물체 없음, 2: 정지·물체 잡음, 3: 물체 떨어짐)
+    GRIPPER_MOVING = 0
+    GRIPPER_HOLDING = 2
+
+    def __init__(self, mycobot, gripper_id=14, poll_min=0.02, poll_max=0.3, backoff=1.5):
+        self.mycobot = mycobot
+        self.gripper_id = gripper_id   # 프로 그리퍼 ID (기본 14)
+        self.poll_min = poll_min       # 첫 조회 간격 (초)
+        self.poll_max = poll_max       # 최대 조회 간격 (초)
+        self.backoff = backoff         # 조회 간격 증가 배율
+
+    # 조건이 참이 될 때까지 적응형 간격으로 확인 (제한 시간 초과 시 False)
+    # poll_max: 최대 조회 간격 (없으면 기본값, 블렌딩처럼 늦게 알아채면 안 되는 경우 작게)
+    def poll(self, check, timeout, poll_max=None):
+        deadline = time.monotonic() + timeout
+        interval = self.poll_min
+        poll_max = poll_max or self.poll_max
+        while True:
+            if check():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, poll_max)
+
+    # ------------------------------------------------------------
+    # 📌 이동 완료 대기
+    # ------------------------------------------------------------
+    # mode="coords": target 은 [x, y, z, rx, ry, rz] / mode="angles": target 은 조인트 각도 6개
+    def wait_until_arrival(self, target, mode="coords", tol=5.0, timeout=15.0):
+        flag = 1 if mode == "coords" else 0  # is_in_position 의 데이터 종류 (0: 각도, 1: 좌표)
+        axes = 3 if mode == "coords" else len(target)  # 좌표는 위치(x, y, z)만 비교
+
+        def arrived():
+            state = self._call("is_in_position", target, flag)
+            if state == 1:
+                return True
+            if state == 0:
+                return False
+            # is_in_position 을 지원하지 않거나 오류(-1) → 현재 값과 목표 값을 직접 비교
+            now = self._call("get_coords" if mode == "coords" else "get_angles")
+            return bool(now) and all(abs(now[i] - target[i]) < tol for i in range(axes))
+
+        return self.poll(arrived, timeout)
+
+    # 목표 근처(radius 이내)에 들어올 때까지 대기 → 멈추기 전에 다음 구간 명령을 보내는 블렌딩용
+    # mode="coords": 끝점 거리(mm), mode="angles": 가장 많이 남은 관절 각도(도)
+    def wait_until_near(self, target, mode="coords", radius=15.0, timeout=15.0):
+        axes = 3 if mode == "coords" else len(target)
+
+        def near():
+            now = self._call("get_coords" if mode == "coords" else "get_angles")
+            if not isinstance(now, (list, tuple)) or len(now) < axes:
+                return False
+            if mode == "coords":
+                return math.dist(now[:3], target[:3]) <= radius
+            return max(abs(now[i] - target[i]) for i in range(axes)) <= radius
+
+        return self.poll(near, timeout, poll_max=self.poll_min * 2)
+
+    # 로봇이 멈출 때까지 대기 (is_moving 미지원 시 바로 True)
+    def wait_until_stopped(self, timeout=15.0):
+        return self.poll(lambda: self._call("is_moving") in (0, None), timeout)
+
+    # ------------------------------------------------------------
+    # 📌 그리퍼 열기/닫기 + 상태 확인
+    # ------------------------------------------------------------
+    def gripper_open(self, timeout=3.0, retries=1):
+        return self._gripper("set_pro_gripper_open", timeout, retries)
+
+    def gripper_close(self, timeout=3.0, retries=1):
+        return self._gripper("set_pro_gripper_close", timeout, retries)
+
+    def _gripper(self, command, timeout, retries):
+        for _ in range(retries + 1):
+            getattr(self.mycobot, command)(self.gripper_id)
+
+            if not hasattr(self.mycobot, "get_pro_gripper_status"):
+                # 상태 조회를 지원하지 않는 펌웨어: 제한 시간만큼 기다리고 완료로 간주
+                time.sleep(timeout)
+                return True
+
+            # 명령이 반영되어 그리퍼가 움직이기 시작할 시간을 잠깐 준 뒤 정지 여부 확인
+            time.sleep(self.poll_min)
+            if self.poll(self._gripper_settled, timeout):
+                return True
+            # 정해진 시간 안에 멈추지 않으면 명령을 한 번 더 보냄 (통신 누락 대비)
+        return False
+
+    def _gripper_settled(self):
+        status = self._call("get_pro_gripper_status", self.gripper_id)
+        return status is not None and status != -1 and status != self.GRIPPER_MOVING
+
+    # 그리퍼가 물체를 잡고 있는지 확인 (상태 조회 미지원 시 None)
+    def gripper_holding(self):
+        status = self._call("get_pro_gripper_status", self.gripper_id)
+        if status is None or status == -1:
+            return None
+        return status == self.GRIPPER_HOLDING
+
+    # 로봇 메서드 호출 (펌웨어/라이브러리 버전에 따라 없는 메서드는 None 반환)
+    def _call(self, name, *args):
+        func = getattr(self.mycobot, name, None)
+        if func is None:
+            return None
+        return func(*args)
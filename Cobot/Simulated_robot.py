@@ -0,0 +1,223 @@
+# -------------------------
+# 📌 라이브러리 불러오기
+# -------------------------
+
+import math  # 이동 거리 계산용
+import random  # 지연 흔들림 / 실패 주입용
+import threading  # 시리얼 한 줄 흉내 (동시에 한 명령만)
+import time  # 시간 지연 및 시간 측정용
+
+
+# -------------------------
+# 📌 동작 시간 모델
+# -------------------------
+# 속도 100 기준 관절 속도(deg/s)·직선 속도(mm/s)에서 명령 속도(%)만큼 느려진다고 보고,
+# 가감속 시간과 정착 시간을 더해 한 번의 이동 시간을 계산한다.
+class MotionTimeModel:
+    def __init__(self, joint_speed=120.0, linear_speed=200.0, accel_time=0.3, settle_time=0.1,
+                 gripper_time=0.6):
+        self.joint_speed = joint_speed     # 속도 100 일 때 관절 최대 속도 (deg/s)
+        self.linear_speed = linear_speed   # 속도 100 일 때 끝점 직선 속도 (mm/s)
+        self.accel_time = accel_time       # 가속 + 감속에 추가로 걸리는 시간 (초)
+        self.settle_time = settle_time     # 도착 후 진동이 멈출 때까지 (초)
+        self.gripper_time = gripper_time   # 그리퍼 열기/닫기 시간 (초)
+
+    # 조인트 이동: 가장 많이 움직이는 관절 기준
+    def angles_time(self, start, target, speed):
+        dist = max(abs(a - b) for a, b in zip(start, target))
+        if dist == 0:
+            return self.settle_time
+        return self.accel_time + dist / (self.joint_speed * max(speed, 1) / 100.0) + self.settle_time
+
+    # 좌표 이동: 끝점(x, y, z) 직선 거리 기준
+    def coords_time(self, start, target, speed):
+        dist = math.dist(start[:3], target[:3])
+        if dist == 0:
+            return self.settle_time
+        return self.accel_time + dist / (self.linear_speed * max(speed, 1) / 100.0) + self.settle_time
+
+
+# -------------------------
+# 📌 진행 중인 이동 (시작 값 → 목표 값 선형 보간)
+# -------------------------
+class _Motion:
+    def __init__(self, start, target, started, duration):
+        self.start = list(start)
+        self.target = list(target)
+        self.started = started
+        self.duration = duration
+
+    def value(self, now):
+        if self.duration <= 0:
+            return list(self.target)
+        k = min(1.0, (now - self.started) / self.duration)
+        return [s + (t - s) * k for s, t in zip(self.start, self.target)]
+
+    def done(self, now):
+        return now - self.started >= self.duration
+
+
+# -------------------------
+# 📌 MyCobot320 시뮬레이터
+# -------------------------
+# 로봇 없이 픽앤플레이스 제어기를 돌리기 위한 대역. MyCobot320 과 같은 이름의 메서드를 제공한다.
+# - 이동 시간: MotionTimeModel (time_scale 로 전체 시간을 줄여 빠르게 반복 실행 가능)
+# - 시리얼 지연: 명령마다 latency + 0~jitter 초 (한 번에 한 명령만 처리)
+# - 실패 주입: 명령 누락(drop_rate), 조회 오류(read_error_rate), 집기 실패(grip_miss_rate)
+# - grip_check(coords) 를 주면 그리퍼를 닫은 위치에 물체가 있는지 그 함수로 판단
+#
+# 기구학은 흉내 내지 않는다: send_angles 후에도 get_coords 는 마지막 좌표 명령 값을 유지한다.
+class SimulatedMyCobot320:
+    GRIPPER_MOVING = 0
+    GRIPPER_EMPTY = 1
+    GRIPPER_HOLDING = 2
+
+    HOME_ANGLES = [0.0, 45.0, -90.0, -45.0, 90.0, -90.0]
+    HOME_COORDS = [250.0, 0.0, 280.0, 180.0, 0.0, 0.0]
+
+    def __init__(self, port=None, baudrate=None, motion_model=None, latency=0.008, jitter=0.004,
+                 drop_rate=0.0, read_error_rate=0.0, grip_miss_rate=0.0, time_scale=1.0,
+                 grip_check=None, seed=None):
+        # port, baudrate 는 MyCobot320("COM11", 115200) 과 같은 모양으로 만들 수 있도록 받기만 함
+        self.model = motion_model or MotionTimeModel()
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.read_error_rate = read_error_rate
+        self.grip_miss_rate = grip_miss_rate
+        self.time_scale = time_scale
+        self.grip_check = grip_check
+        self.rng = random.Random(seed)
+
+        self.serial = threading.Lock()
+        self.angles = _Motion(self.HOME_ANGLES, self.HOME_ANGLES, 0.0, 0.0)
+        self.coords = _Motion(self.HOME_COORDS, self.HOME_COORDS, 0.0, 0.0)
+        self.gripper_until = 0.0                 # 그리퍼 동작이 끝나는 시각
+        self.gripper_result = self.GRIPPER_EMPTY  # 동작이 끝난 뒤 상태
+
+        # 📊 통계
+        self.calls = {}        # 메서드 이름 → 호출 횟수
+        self.injected = {"drop": 0, "read_error": 0, "grip_miss": 0}
+        self.motion_time = 0.0  # 명령한 이동·그리퍼 동작 시간 합계 (time_scale 적용 전, 초)
+
+    # ------------------------------------------------------------
+    # 📌 내부 도우미
+    # ------------------------------------------------------------
+    # 시리얼 왕복 한 번 (호출 횟수 집계 + 지연)
+    def _serial(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay * self.time_scale)
+        return time.monotonic()
+
+    def _dropped(self):
+        if self.drop_rate and self.rng.random() < self.drop_rate:
+            self.injected["drop"] += 1
+            return True
+        return False
+
+    def _read_error(self):
+        if self.read_error_rate and self.rng.random() < self.read_error_rate:
+            self.injected["read_error"] += 1
+            return True
+        return False
+
+    def _moving(self, now):
+        return not self.angles.done(now) or not self.coords.done(now)
+
+    # ------------------------------------------------------------
+    # 📌 이동 명령
+    # ------------------------------------------------------------
+    def send_angles(self, angles, speed):
+        with self.serial:
+            now = self._serial("send_angles")
+            if self._dropped():
+                return
+            start = self.angles.value(now)
+            duration = self.model.angles_time(start, angles, speed)
+            self.motion_time += duration
+            self.angles = _Motion(start, angles, now, duration * self.time_scale)
+
+    def send_coords(self, coords, speed, mode=0):
+        with self.serial:
+            now = self._serial("send_coords")
+            if self._dropped():
+                return
+            start = self.coords.value(now)
+            duration = self.model.coords_time(start, coords, speed)
+            self.motion_time += duration
+            self.coords = _Motion(start, coords, now, duration * self.time_scale)
+
+    def get_angles(self):
+        with self.serial:
+            now = self._serial("get_angles")
+            return None if self._read_error() else self.angles.value(now)
+
+    def get_coords(self):
+        with self.serial:
+            now = self._serial("get_coords")
+            return None if self._read_error() else self.coords.value(now)
+
+    # 목표 위치에 도착했는지 (1: 도착, 0: 아직, -1: 오류)
+    def is_in_position(self, data, flag):
+        with self.serial:
+            now = self._serial("is_in_position")
+            if self._read_error():
+                return -1
+            motion = self.coords if flag == 1 else self.angles
+            axes = 3 if flag == 1 else len(data)
+            current = motion.value(now)
+            return int(all(abs(current[i] - data[i]) < 1.0 for i in range(axes)))
+
+    def is_moving(self):
+        with self.serial:
+            now = self._serial("is_moving")
+            return -1 if self._read_error() else int(self._moving(now))
+
+    # ------------------------------------------------------------
+    # 📌 프로 그리퍼
+    # ------------------------------------------------------------
+    def set_pro_gripper_open(self, gripper_id=14):
+        with self.serial:
+            now = self._serial("set_pro_gripper_open")
+            if self._dropped():
+                return
+            self._start_gripper(now, self.GRIPPER_EMPTY)
+
+    def set_pro_gripper_close(self, gripper_id=14):
+        with self.serial:
+            now = self._serial("set_pro_gripper_close")
+            if self._dropped():
+                return
+
+            # 집기 실패 주입 → 아니면 닫은 위치에 물체가 있는지 (grip_check 가 없으면 항상 있다고 봄)
+            if self.grip_miss_rate and self.rng.random() < self.grip_miss_rate:
+                self.injected["grip_miss"] += 1
+                holding = False
+            else:
+                holding = self.grip_check(self.coords.value(now)) if self.grip_check else True
+            self._start_gripper(now, self.GRIPPER_HOLDING if holding else self.GRIPPER_EMPTY)
+
+    def _start_gripper(self, now, result):
+        self.motion_time += self.model.gripper_time
+        self.gripper_until = now + self.model.gripper_time * self.time_scale
+        self.gripper_result = result
+
+    # 0: 동작 중, 1: 정지·물체 없음, 2: 정지·물체 잡음
+    def get_pro_gripper_status(self, gripper_id=14):
+        with self.serial:
+            now = self._serial("get_pro_gripper_status")
+            if self._read_error():
+                return -1
+            return self.GRIPPER_MOVING if now < self.gripper_until else self.gripper_result
+
+    # ------------------------------------------------------------
+    # 📌 통계
+    # ------------------------------------------------------------
+    def stats(self):
+        return {
+            "calls": dict(self.calls),
+            "injected": dict(self.injected),
+            "motion_time": self.motion_time,
+        }
@@ -1,43 +1,79 @@
+import sys
+import time
 import cv2
-from ultralytics import YOLO  # Ultralytics YOLOv5su 라이브러리 불러오기
+from Yolo_detector import YoloLoader  # 백그라운드 모델 로드·워밍업 + 내보낸 모델 캐시 (ultralytics 는 로더 안에서 import)
+from Vision_runtime import VisionRuntime  # 헤드리스 실행 / 결과 출력 공통 환경
 
-# === 1. 사전학습된 YOLOv8 모델 로드 ===
-# coco 데이터셋으로 학습된 'yolov8n.pt' 모델 로드 (가장 가볍고 빠름)
-model = YOLO("yolov5su.pt")  # yolov8s.pt, yolov8m.pt 등 다른 모델도 가능
+# === 0. 실행 설정 ===
+CAMERA_INDEXES = [0]   # 사용할 카메라 번호 목록 (여러 대면 한 번의 forward 로 묶어서 추론)
+IMG_SIZE = 640         # 추론 입력 크기 (고정 크기 레터박스)
+INFER_STRIDE = 2       # N 프레임마다 한 번 추론, 사이 프레임은 박스 위치 예측
+
+# 실행 환경 (--headless: 창/그리기 없이 결과만 JSON Lines 로 출력)
+runtime = VisionRuntime("yolo")
+
+# === 1. 사전학습된 YOLOv8 모델 로드 (백그라운드) ===
+# coco 데이터셋으로 학습된 모델을 로더 스레드에서 불러와 워밍업까지 해 둠 → 그동안 카메라를 엶
+# 두 번째 실행부터는 model_cache/ 에 저장된 병합(fuse)된 TorchScript 모델을 바로 로드
+sources = runtime.sources or CAMERA_INDEXES
+loader = YoloLoader("yolov5su.pt", imgsz=IMG_SIZE, batch=len(sources),  # yolov8s.pt, yolov8m.pt 등 다른 모델도 가능
+                    stride=INFER_STRIDE)
 
 # === 2. 카메라 열기 ===
-cap = cv2.VideoCapture(0)  # 0번은 기본 내장 웹캠
+# 0번은 기본 내장 웹캠 (백그라운드 스레드가 최신 프레임 유지, --source 로 녹화 영상 재생 가능)
+camera_started = time.perf_counter()
+caps = {i: runtime.open_source(index=i) for i in range(len(sources))} if runtime.sources \
+    else {i: runtime.open_source(i) for i in CAMERA_INDEXES}
 
-if not cap.isOpened():  # 웹캠 연결 실패 시
-    print("카메라 열기 실패")
-    exit()
+for i, cap in caps.items():
+    if not cap.isOpened():  # 웹캠 연결 실패 시
+        print(f"카메라 {i} 열기 실패")
+        exit()
+camera_time = time.perf_counter() - camera_started
+
+# 모델 로드·워밍업이 아직 안 끝났으면 여기서 대기
+detector = loader.result()
+first_detection = True
 
 # === 3. 실시간 프레임 처리 루프 ===
-while True:
-    ret, frame = cap.read()  # 프레임 읽기 (ret: 성공 여부, frame: 이미지)
-    if not ret:
-        break  # 카메라가 프레임을 못 가져오면 종료
+running = True
+while running:
+    frames = {}
+    for i, cap in caps.items():
+        ret, frame = cap.read()  # 프레임 읽기 (ret: 성공 여부, frame: 이미지)
+        if not ret:
+            running = False  # 카메라가 프레임을 못 가져오면 종료
+            break
+        frames[i] = frame
+    if not running:
+        break
 
-    # === 4. YOLOv8 모델을 이용한 객체 인식 ===
-    results = model(frame, stream=True)  
-    # stream=True: 내부적으로 메모리를 절약하며 여러 결과를 반복(iterable)로 리턴
+    # === 4. YOLO 모델을 이용한 객체 인식 ===
+    # 추론할 차례인 카메라만 묶어서 한 번에 추론, 나머지는 직전 결과로 박스 위치 예측
+    results = detector.update_many(frames)
 
-    # === 5. 결과에서 탐지된 객체(boxes)들을 하나씩 처리 ===
-    for r in results:              # 결과 묶음 하나씩 반복 (이미지는 1장이므로 1번만 반복)
-        for box in r.boxes:        # 탐지된 객체 수만큼 반복
-            # box.xyxy[0]: (x1, y1, x2, y2) 좌표 가져오기 (float → int 변환)
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
+    # 첫 탐지까지 걸린 시간 보고 (import / 모델 로드 / 워밍업 / 카메라 열기 / 첫 탐지, 초)
+    if first_detection:
+        first_detection = False
+        report = loader.startup_report(camera=camera_time)
+        print(f"[YOLO] 시작 → 첫 탐지 {report}", file=sys.stderr)
+        runtime.emit({"startup": report})
 
-            # box.conf[0]: 객체 탐지 신뢰도 confidence (0.0 ~ 1.0)
-            conf = float(box.conf[0])
+    # === 5. 결과 배열(boxes, conf, cls)로 바운딩 박스 및 클래스 이름 표시 ===
+    for i, frame in frames.items():
+        det = results[i]
 
-            # box.cls[0]: 클래스 인덱스 (예: 0은 'person', 1은 'bicycle' 등)
-            cls = int(box.cls[0])
+        # 구조화된 결과 출력 (JSON Lines / 콜백)
+        runtime.emit({"camera": i, "predicted": det.predicted, "objects": [
+            {"label": detector.names[c], "conf": round(p, 3), "box": b}
+            for b, p, c in zip(det.boxes.round(1).tolist(), det.conf.tolist(), det.cls.tolist())
+        ]})
+        if not runtime.draw:
+            continue
 
-            # model.names[cls]: 실제 클래스 이름 가져오기
-            label = model.names[cls]
+        for (x1, y1, x2, y2), conf, cls in zip(det.boxes.astype(int).tolist(), det.conf.tolist(), det.cls.tolist()):
+            label = detector.names[cls]  # 클래스 번호 → 실제 클래스 이름
 
-            # === 6. 바운딩 박스 및 클래스 이름을 영상에 표시 ===
             # 사각형 그리기 (초록색, 두께 2)
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
 
@@ -45,13 +81,15 @@ while True:
             cv2.putText(frame, f"{label} {conf:.2f}", (x1, y1 - 10),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
 
-    # === 7. 결과 영상 출력 ===
-    cv2.imshow("YOLOv8 Detection", frame)  # 인식된 객체와 라벨이 그려진 프레임 표시
+        # === 6. 결과 영상 출력 ===
+        runtime.show(f"YOLOv8 Detection {i}", frame)  # 인식된 객체와 라벨이 그려진 프레임 표시
 
     # 'q' 키를 누르면 종료
-    if cv2.waitKey(1) & 0xFF == ord('q'):
+    if runtime.end_frame():
         break
 
-# === 8. 종료 처리 ===
-cap.release()             # 웹캠 해제
-cv2.destroyAllWindows()   # 모든 창 닫기
\ No newline at end of file
+# === 7. 종료 처리 ===
+for cap in caps.values():
+    cap.release()         # 웹캠 해제
+loader.close()            # 첫 실행이면 모델 캐시 저장이 끝날 때까지 대기
+runtime.close()           # 모든 창 닫기
\ No newline at end of file
@@ -0,0 +1,130 @@
+import math
+
+import cv2
+import numpy as np
+
+
+# === ArUco 마커 기반 ROI 추적기 ===
+# 작업대 마커는 거의 움직이지 않으므로 매 프레임 전체 화면을 검색할 필요가 없다.
+# - 딕셔너리 / 파라미터 / 검출기는 한 번만 만들어 재사용
+# - 평소에는 직전 마커 꼭짓점 주변의 작은 창(window)에서만 검색
+# - 일정 프레임마다(full_search_interval) 또는 마커를 놓쳤을 때만 전체 프레임 검색
+# - 마커 중심으로 만든 ROI 와 회전각(theta)을 캐시해서 제공
+class ArucoRoiTracker:
+    def __init__(self, dictionary=cv2.aruco.DICT_6X6_250, min_markers=2,
+                 full_search_interval=30, search_margin=40, roi_margin=30):
+        self.min_markers = min_markers                    # ROI 를 만들기 위한 최소 마커 수
+        self.full_search_interval = full_search_interval  # 전체 검색 주기 (프레임 수)
+        self.search_margin = search_margin                # 마커 주변 검색 창 여백 (픽셀)
+        self.roi_margin = roi_margin                      # ROI 여유 여백 (픽셀)
+
+        # 🔍 딕셔너리 / 파라미터 / 검출기를 한 번만 생성
+        self.aruco_dict = cv2.aruco.getPredefinedDictionary(dictionary)
+        self.aruco_params = cv2.aruco.DetectorParameters()
+        if hasattr(cv2.aruco, "ArucoDetector"):
+            self.detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.aruco_params)
+        else:
+            self.detector = None  # OpenCV 4.7 미만: 예전 함수형 API 사용
+
+        # 📌 캐시 (직전 검출 결과)
+        self.corners = None       # 마커별 꼭짓점 [(4, 2) 배열, ...] (전체 프레임 기준)
+        self.ids = None           # 마커 ID 배열
+        self.marker_pts = None    # 마커 중심 좌표 (x, y 순 정렬)
+        self.roi = None           # ROI 영역 (x1, y1, x2, y2)
+        self.theta = None         # ROI 회전각 (라디안, 첫 두 마커 중심 기준)
+
+        # 📊 통계
+        self.frames_since_full = 0
+        self.full_searches = 0
+        self.window_searches = 0
+
+    # 이미지(또는 잘라낸 일부)에서 마커 검출
+    def _detect(self, image):
+        if self.detector is not None:
+            corners, ids, _ = self.detector.detectMarkers(image)
+        else:
+            corners, ids, _ = cv2.aruco.detectMarkers(image, self.aruco_dict, parameters=self.aruco_params)
+        return corners, ids
+
+    # 직전 마커 위치 주변의 작은 창에서만 검색
+    def _detect_windows(self, frame):
+        frame_h, frame_w = frame.shape[:2]
+        found_corners, found_ids = [], []
+
+        for c in self.corners:
+            x1, y1 = np.floor(c.min(axis=0)).astype(int) - self.search_margin
+            x2, y2 = np.ceil(c.max(axis=0)).astype(int) + self.search_margin
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(frame_w, x2), min(frame_h, y2)
+            if x2 <= x1 or y2 <= y1:
+                continue
+
+            corners, ids = self._detect(frame[y1:y2, x1:x2])
+            if ids is None:
+                continue
+            for wc, wid in zip(corners, ids.ravel()):
+                # 창 기준 → 전체 프레임 기준으로 보정
+                found_corners.append(wc[0] + (x1, y1))
+                found_ids.append(wid)
+
+        self.window_searches += 1
+        return found_corners, found_ids
+
+    # 전체 프레임 검색
+    def _detect_full(self, frame):
+        corners, ids = self._detect(frame)
+        self.full_searches += 1
+        self.frames_since_full = 0
+        if ids is None:
+            return [], []
+        return [c[0] for c in corners], list(ids.ravel())
+
+    # 프레임 한 장 처리 → ROI 가 유효하면 True
+    def update(self, frame):
+        self.frames_since_full += 1
+
+        corners, ids = [], []
+        use_window = (self.corners is not None
+                      and self.frames_since_full < self.full_search_interval)
+        if use_window:
+            corners, ids = self._detect_windows(frame)
+
+        # 창 검색에서 마커를 놓쳤거나 전체 검색 주기가 되면 전체 프레임 검색
+        if len(ids) < max(self.min_markers, len(self.ids) if use_window else 0):
+            corners, ids = self._detect_full(frame)
+
+        if len(ids) < self.min_markers:
+            self.corners = self.ids = self.marker_pts = self.roi = self.theta = None
+            return False
+
+        # 같은 마커가 겹친 창에서 두 번 잡힌 경우 하나만 사용
+        unique = {}
+        for c, i in zip(corners, ids):
+            unique.setdefault(int(i), c)
+        self.ids = np.array(list(unique.keys()))
+        self.corners = list(unique.values())
+
+        self._update_roi(frame.shape[:2])
+        return True
+
+    # 마커 중심으로 ROI 와 회전각 계산
+    def _update_roi(self, frame_shape):
+        frame_h, frame_w = frame_shape
+
+        # 각 마커의 중심좌표를 계산한 후, x, y순으로 정렬
+        pts = sorted([c.mean(axis=0) for c in self.corners], key=lambda p: (p[0], p[1]))
+        self.marker_pts = pts
+
+        # 좌측 상단 마커와 우측 하단 마커 좌표로 ROI 범위 계산
+        x1, x2 = sorted([int(pts[0][0]), int(pts[-1][0])])
+        y1, y2 = sorted([int(pts[0][1]), int(pts[-1][1])])
+        self.roi = (max(0, x1 - self.roi_margin), max(0, y1 - self.roi_margin),
+                    min(frame_w, x2 + self.roi_margin), min(frame_h, y2 + self.roi_margin))
+
+        # ArUco 마커 2개를 기준으로 회전 각도(theta) 계산
+        self.theta = math.atan2(pts[1][1] - pts[0][1], pts[1][0] - pts[0][0])
+
+    # 다음 프레임에서 강제로 전체 검색 (카메라 이동 등)
+    def reset(self):
+        self.corners = self.ids = self.marker_pts = self.roi = self.theta = None
+        self.frames_since_full = 0
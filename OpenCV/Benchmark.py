@@ -0,0 +1,266 @@
+import argparse
+import json
+import multiprocessing
+import resource
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from Color_recognition_Fruit import colors  # 과일 색상 범위 표
+from Color_segmentation import ColorSegmenter
+from Frame_capture import FileSource
+from Pickup_perception import PickupPerception
+from Shape_recognition import ShapeAnalysis
+
+
+# === 오프라인 벤치마크 ===
+# 카메라 없이 녹화 영상 / 이미지 폴더(또는 합성 프레임)로 검출기를 돌려
+# 단계별 지연(p50/p90/p99), fps, 메모리 사용량을 잰다.
+#
+#   python Benchmark.py                                   → 합성 프레임, 640x480 / 1280x720 / 1920x1080
+#   python Benchmark.py --source tray.mp4 --frames 300    → 녹화 영상 (해상도별로 리사이즈)
+#   python Benchmark.py --yolo-model yolov5su.pt --json result.json
+#
+# 각 검출기는 (단계 이름, 함수) 목록으로 정의하고, 단계 함수는 ctx(dict)에 중간 결과를 넘겨준다.
+# 검출기마다 새 프로세스에서 측정한다 (최대 RSS 는 프로세스 전체 최대치라 앞 검출기 값이 섞이지 않도록).
+
+# === 1. 검출기별 단계 정의 ===
+def color_stages():
+    segmenter = ColorSegmenter(colors)
+    return [
+        ("hsv",     lambda ctx: ctx.update(hsv=segmenter.to_hsv(ctx["frame"]))),
+        ("label",   lambda ctx: ctx.update(labels=segmenter.label(ctx["hsv"]))),
+        ("extract", lambda ctx: ctx.update(objects=segmenter.extract(ctx["labels"], 500))),
+    ]
+
+
+# 처리 피라미드: 1/scale 축소 영상에서 후보 → 원본 해상도 창에서 중심 보정
+def color_pyramid_stages(scale=2):
+    segmenter = ColorSegmenter(colors)
+    return [
+        ("candidates", lambda ctx: ctx.update(candidates=segmenter.candidates(ctx["frame"], 500, scale))),
+        ("refine",     lambda ctx: ctx.update(
+            objects=segmenter.refine(ctx["frame"], ctx["candidates"], 500, scale))),
+    ]
+
+
+def shape_stages():
+    def preprocess(ctx):
+        gray = cv2.cvtColor(ctx["frame"], cv2.COLOR_BGR2GRAY)
+        blur = cv2.GaussianBlur(gray, (5, 5), 1)
+        ctx["edged"] = cv2.Canny(blur, 50, 150)
+
+    def contours(ctx):
+        ctx["contours"], _ = cv2.findContours(ctx["edged"], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    def classify(ctx):
+        ctx["shapes"] = ShapeAnalysis(ctx["contours"], min_area=500).shapes
+
+    return [("preprocess", preprocess), ("contours", contours), ("classify", classify)]
+
+
+# 실제 작업대 인식 파이프라인 (PerceptionWorker 가 쓰는 PickupPerception.detect 그대로)
+# scale: 1 = ROI 원본 해상도, 2 / 4 = 축소 후보 검출 + 원본 창 보정 (자동 앱은 2)
+def pickup_stages(scale=1):
+    pipeline = PickupPerception([c[:3] for c in colors], scale=scale)
+    frame_index = [0]
+
+    def detect(ctx):
+        ctx["result"] = pipeline.detect(ctx["frame"])
+
+    def track(ctx):
+        frame_index[0] += 1
+        result, timestamp = ctx["result"], frame_index[0] / 30.0
+        if result["roi"] is not None:
+            ctx["tracks"] = pipeline.tracker.update(result["objects"], timestamp)
+        else:
+            ctx["tracks"] = pipeline.tracker.predict(timestamp)
+
+    return [("detect", detect), ("track", track)]
+
+
+def yolo_stages(model_path, imgsz):
+    from Yolo_detector import YoloDetector  # ultralytics 가 있을 때만 불러오기
+    detector = YoloDetector(model_path, imgsz=imgsz)
+
+    # 레터박스한 입력을 그대로 추론 단계에 넘김 (레터박스 시간이 두 번 잡히지 않도록)
+    def prepare(ctx):
+        ctx["inputs"], ctx["metas"] = detector.letterbox_batch([ctx["frame"]])
+
+    def infer(ctx):
+        ctx["detections"] = detector.infer_letterboxed(ctx["inputs"], ctx["metas"])[0]
+
+    return [("letterbox", prepare), ("infer", infer)]
+
+
+DETECTORS = {"color": color_stages, "color_pyr2": lambda: color_pyramid_stages(2),
+             "color_pyr4": lambda: color_pyramid_stages(4), "shape": shape_stages,
+             "pickup": pickup_stages, "pickup_pyr2": lambda: pickup_stages(2)}
+
+
+# === 2. 입력 프레임 ===
+# 합성 프레임: 색 있는 도형 + ArUco 마커 4개 (ROI 인식 단계까지 실제로 동작하도록)
+def synthetic_frames(width, height, count, seed=0):
+    rng = np.random.default_rng(seed)
+    dictionary = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_6X6_250)
+    size = max(40, min(width, height) // 10)
+    markers = [cv2.cvtColor(cv2.aruco.generateImageMarker(dictionary, i, size), cv2.COLOR_GRAY2BGR)
+               for i in range(4)]
+    palette = [bgr for _, _, _, bgr in colors if bgr != (0, 0, 0)]
+
+    base = np.full((height, width, 3), 255, np.uint8)
+    pad = size // 2
+    for marker, (x, y) in zip(markers, [(pad, pad), (width - size - pad, pad),
+                                        (pad, height - size - pad), (width - size - pad, height - size - pad)]):
+        base[y:y + size, x:x + size] = marker
+
+    frames = []
+    for _ in range(count):
+        frame = base.copy()
+        for _ in range(6):
+            color = palette[rng.integers(len(palette))]
+            cx = int(rng.integers(size * 2, width - size * 2))
+            cy = int(rng.integers(size * 2, height - size * 2))
+            r = int(rng.integers(size // 3, size))
+            if rng.random() < 0.5:
+                cv2.circle(frame, (cx, cy), r, color, -1)
+            else:
+                cv2.rectangle(frame, (cx - r, cy - r), (cx + r, cy + r), color, -1)
+        frames.append(frame)
+    return frames
+
+
+# 녹화 영상 / 이미지 폴더에서 프레임을 읽어 해상도에 맞게 리사이즈
+def recorded_frames(path, width, height, count):
+    source = FileSource(path, realtime=False, loop=True)
+    if not source.isOpened():
+        raise SystemExit(f"소스를 열 수 없습니다: {path}")
+    frames = []
+    while len(frames) < count:
+        ret, frame = source.read()
+        if not ret:
+            break
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        frames.append(frame)
+    source.release()
+    return frames
+
+
+# === 3. 측정 ===
+def run_stages(stages, frames, warmup):
+    timings = {name: [] for name, _ in stages}
+    totals = []
+
+    for i, frame in enumerate(frames):
+        ctx = {"frame": frame}
+        start = time.perf_counter()
+        for name, fn in stages:
+            t0 = time.perf_counter()
+            fn(ctx)
+            if i >= warmup:
+                timings[name].append((time.perf_counter() - t0) * 1000)
+        if i >= warmup:
+            totals.append((time.perf_counter() - start) * 1000)
+
+    def summary(values):
+        if not values:
+            return {"p50": 0.0, "p90": 0.0, "p99": 0.0}
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        return {"p50": round(float(p50), 3), "p90": round(float(p90), 3), "p99": round(float(p99), 3)}
+
+    result = {"stages": {name: summary(values) for name, values in timings.items()},
+              "total": summary(totals)}
+    mean_total = float(np.mean(totals)) if totals else 0.0
+    result["fps"] = round(1000.0 / mean_total, 1) if mean_total else 0.0
+    return result
+
+
+# 프로세스 최대 RSS (리눅스: KB 단위 → MB)
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(stages_factory, frames, warmup):
+    rss_start = max_rss_mb()
+
+    # 1. 시간 측정: tracemalloc 없이 (켜 두면 모든 파이썬 할당에 훅이 걸려 지연·fps 가 부풀려짐)
+    result = run_stages(stages_factory(), frames, warmup)
+
+    # 2. 메모리 측정: 새 검출기로 같은 프레임을 한 번 더 (이 패스의 시간은 버림)
+    tracemalloc.start()
+    run_stages(stages_factory(), frames, warmup)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result["py_peak_mb"] = round(peak / 2 ** 20, 2)  # 파이썬 할당 최대치 (NumPy 배열 포함)
+    result["max_rss_mb"] = round(max_rss_mb(), 1)
+    # 프레임을 읽어 둔 뒤부터 늘어난 최대 RSS (검출기 자체가 더 쓴 메모리)
+    result["rss_delta_mb"] = round(max_rss_mb() - rss_start, 1)
+    return result
+
+
+# 검출기 하나를 새 프로세스에서 측정 (프레임도 그 프로세스에서 읽음)
+def measure_detector(name, width, height, args):
+    if args.source:
+        frames = recorded_frames(args.source, width, height, args.frames)
+    else:
+        frames = synthetic_frames(width, height, args.frames)
+    if name == "yolo":
+        factory = lambda: yolo_stages(args.yolo_model, args.imgsz)  # noqa: E731
+    else:
+        factory = DETECTORS[name]
+    return measure(factory, frames, args.warmup)
+
+
+def print_report(resolution, name, result):
+    print(f"\n[{resolution}] {name}: {result['fps']} fps, python peak {result['py_peak_mb']} MB, "
+          f"max RSS {result['max_rss_mb']} MB (+{result['rss_delta_mb']} MB)")
+    print(f"  {'stage':<12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    rows = list(result["stages"].items()) + [("total", result["total"])]
+    for stage, s in rows:
+        print(f"  {stage:<12}{s['p50']:>10.2f}{s['p90']:>10.2f}{s['p99']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비전 검출기 오프라인 벤치마크")
+    parser.add_argument("--source", default=None, help="동영상 파일 또는 이미지 폴더 (없으면 합성 프레임)")
+    parser.add_argument("--resolutions", default="640x480,1280x720,1920x1080", help="측정할 해상도 목록")
+    parser.add_argument("--frames", type=int, default=100, help="해상도별 프레임 수")
+    parser.add_argument("--warmup", type=int, default=5, help="측정에서 제외할 처음 프레임 수")
+    parser.add_argument("--detectors", default="color,color_pyr2,color_pyr4,shape,pickup,pickup_pyr2",
+                        help="측정할 검출기 목록")
+    parser.add_argument("--yolo-model", default=None, help="YOLO 모델 파일 (지정하면 yolo 검출기 추가)")
+    parser.add_argument("--imgsz", type=int, default=640, help="YOLO 추론 입력 크기")
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    selected = [d for d in args.detectors.split(",") if d in DETECTORS]
+    if args.yolo_model:
+        try:
+            import ultralytics  # noqa: F401
+            selected.append("yolo")
+        except ImportError:
+            print("ultralytics 가 설치되어 있지 않아 yolo 검출기는 건너뜁니다.")
+
+    # 측정마다 새 프로세스 (spawn: 부모의 메모리 사용량을 물려받지 않음)
+    context = multiprocessing.get_context("spawn")
+    report = {}
+    for resolution in args.resolutions.split(","):
+        width, height = (int(v) for v in resolution.lower().split("x"))
+        report[resolution] = {}
+        for name in selected:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(measure_detector, name, width, height, args).result()
+            report[resolution][name] = result
+            print_report(resolution, name, result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+
+from Frame_buffers import FrameBuffers
+from Metrics import metrics
+
+# 마스크 픽셀 수 / 연결 영역 수가 이 값보다 작으면 (잡음 조각이 많은 마스크) 연결 영역 분석으로 전환
+# (측정: 640×480 은 윤곽선 ~400개, 1920×1080 은 ~2000개 부근에서 두 방식의 시간이 같아짐)
+PIXELS_PER_BLOB = 1024
+
+
+# === 연결 영역(blob) 묶음: 면적 / 외곽 사각형 / 무게중심 배열 ===
+# 면적 큰 순으로 정렬해 두고, 조건 선택은 NumPy 배열 연산으로 한 번에 한다.
+class BlobAnalysis:
+    def __init__(self, area, bbox, centroid):
+        order = np.argsort(-area, kind="stable")             # 면적 큰 순
+        self.area = area[order]                              # (N,) 면적
+        self.bbox = bbox[order]                              # (N, 4) x, y, w, h
+        self.centroid = centroid[order]                      # (N, 2) 무게중심 cx, cy
+
+    def __len__(self):
+        return len(self.area)
+
+    # 조건(불리언 배열)을 만족하는 영역만 남김
+    def select(self, keep):
+        self.area = self.area[keep]
+        self.bbox = self.bbox[keep]
+        self.centroid = self.centroid[keep]
+        return self
+
+    # [(면적, (x, y, w, h), (cx, cy)), ...]  ※ 중심은 정수 픽셀 좌표
+    def items(self):
+        centers = self.centroid.astype(np.int32).tolist()
+        return [(area, tuple(box), tuple(center))
+                for area, box, center in zip(self.area.tolist(), self.bbox.tolist(), centers)]
+
+
+# 마스크 → (BlobAnalysis, 전체 연결 영역 수): cv2.connectedComponentsWithStats 한 번의 호출
+# 모든 영역의 면적(픽셀 수)·외곽 사각형·무게중심을 배열로 받아 면적 기준 제외도 배열 연산으로 처리
+# offset: 결과 좌표에 더할 (x, y) (창 좌표 → 원본 프레임 좌표), labels: 라벨 영상(int32) 재사용 버퍼
+def mask_blobs(mask, min_area=500, offset=(0, 0), labels=None):
+    # GRANA: 1080p 마스크에서 기본 알고리즘(통계 포함 시 ~13ms)보다 3배 빠름 (~4ms)
+    _, _, stats, centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+        mask, 8, cv2.CV_32S, cv2.CCL_GRANA, labels=labels)
+    stats, centroids = stats[1:], centroids[1:]              # 0번은 배경
+    keep = np.flatnonzero(stats[:, cv2.CC_STAT_AREA] >= min_area)
+    bbox = stats[keep, :4] + np.array([offset[0], offset[1], 0, 0], np.int32)
+    blobs = BlobAnalysis(stats[keep, cv2.CC_STAT_AREA], bbox, centroids[keep] + np.array(offset, np.float64))
+    return blobs, len(stats)
+
+
+# 마스크 → (BlobAnalysis, 연결 영역 수): 윤곽선으로 영역을 찾고 큰 영역만 외곽 사각형 창에서 라벨링
+# 윤곽선이 몇 개 안 되는 깨끗한 마스크에서는 전체 프레임을 라벨링하는 mask_blobs 보다 빠름
+# 결과는 mask_blobs 와 같음: 면적은 픽셀 수, 중심은 픽셀 무게중심, 구멍 안의 섬도 별도 영역
+def contour_blobs(mask, min_area=500, offset=(0, 0)):
+    # RETR_CCOMP 최상위 = 연결 영역의 바깥 윤곽선 (구멍 안의 섬 포함), 두 번째 단계 = 구멍
+    contours, hierarchy = cv2.findContours(mask, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+    outer = [c for c, h in zip(contours, hierarchy[0] if contours else []) if h[3] == -1]
+    boxes = np.array([cv2.boundingRect(c) for c in outer], np.int32).reshape(-1, 4)
+    keep = np.flatnonzero(boxes[:, 2] * boxes[:, 3] >= min_area)  # 외곽 사각형이 작으면 픽셀 수도 작음
+
+    area = np.zeros(len(keep), np.int32)
+    centroid = np.zeros((len(keep), 2), np.float64)
+    for n, i in enumerate(keep):
+        # 영역 전체가 외곽 사각형 안에 있으므로 창 안 라벨링 결과 = 전체 마스크 라벨링 결과
+        x, y, w, h = boxes[i]
+        px, py = outer[i][0, 0]                                # 윤곽선 점 = 이 영역의 픽셀
+        _, labels, stats, centers = cv2.connectedComponentsWithStats(mask[y:y + h, x:x + w], None, 8, cv2.CV_32S)
+        label = labels[py - y, px - x]
+        area[n] = stats[label, cv2.CC_STAT_AREA]
+        centroid[n] = centers[label] + (x, y)
+
+    valid = area >= min_area
+    bbox = boxes[keep][valid] + np.array([offset[0], offset[1], 0, 0], np.int32)
+    blobs = BlobAnalysis(area[valid], bbox, centroid[valid] + np.array(offset, np.float64))
+    return blobs, len(outer)
+
+
+# === 마스크 → 연결 영역 추출기 (스트림 / 검출기마다 하나) ===
+# 잡음이 많은 장면에서는 작은 조각마다 도는 윤곽선 루프(파이썬)가 검출 시간 대부분을 차지하므로
+# 직전 프레임에서 같은 key 의 마스크가 조각이 많았으면 connectedComponentsWithStats 한 번으로 처리하고,
+# 조각이 적으면 (대부분의 깨끗한 장면) 더 빠른 윤곽선 방식을 쓴다.
+# 두 방식의 결과(면적 = 픽셀 수, 외곽 사각형, 중심)는 같으므로 min_area 기준이 프레임마다 달라지지 않는다.
+# ※ 색상 번호 라벨 영상 전체에 한 번에 적용하면 맞닿은 서로 다른 색 객체가 하나로 합쳐지므로
+#   색상별 마스크(라벨 == 번호)마다 key(색상 번호)를 붙여 호출한다.
+#
+#   blobs = BlobExtractor()
+#   for area, (x, y, w, h), (cx, cy) in blobs.extract(mask, 500, key=idx).items(): ...
+class BlobExtractor:
+    def __init__(self):
+        self.counts = {}                  # key → 직전 프레임의 연결 영역(윤곽선) 수
+        self.buffers = FrameBuffers()
+
+    def extract(self, mask, min_area=500, offset=(0, 0), key=None):
+        if self.counts.get(key, 0) * PIXELS_PER_BLOB > mask.size:
+            labels = self.buffers.get("labels", mask.shape[:2], np.int32)
+            blobs, count = mask_blobs(mask, min_area, offset, labels)
+            metrics.count("vision.blobs.labelled")  # 연결 영역 분석으로 처리한 마스크 수
+        else:
+            blobs, count = contour_blobs(mask, min_area, offset)
+        self.counts[key] = count
+        return blobs
@@ -1,7 +1,10 @@
-import cv2
+from Vision_runtime import VisionRuntime
+
+# 실행 환경 (--headless: 창 없이 프레임 정보만 출력)
+runtime = VisionRuntime("camera")
 
 # 카메라 열기 (기본 웹캠은 보통 0번)
-cap = cv2.VideoCapture(0)
+cap = runtime.open_source(0)  # 백그라운드 스레드 캡처 (--source 로 녹화 영상 재생 가능)
 
 if not cap.isOpened():
     print("카메라를 열 수 없습니다.")
@@ -13,12 +16,15 @@ while True:
         print("프레임을 읽을 수 없습니다.")
         break
 
-    cv2.imshow('Camera', frame)  # 창에 영상 출력
+    # 헤드리스 모드에서는 프레임 크기와 캡처 통계만 출력
+    if runtime.headless:
+        runtime.emit({"width": frame.shape[1], "height": frame.shape[0], **cap.stats()})
+    runtime.show('Camera', frame)  # 창에 영상 출력
 
     # q 키 누르면 종료
-    if cv2.waitKey(1) & 0xFF == ord('q'):
+    if runtime.end_frame():
         break
 
 # 종료 처리
 cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+runtime.close()
\ No newline at end of file
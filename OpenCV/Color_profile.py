@@ -0,0 +1,345 @@
+import argparse
+import ast
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+# === 색상 프로파일 (HSV 범위 보정 / 저장 / 불러오기) ===
+# 스크립트마다 손으로 적어 둔 HSV 표 대신, 라벨을 붙인 샘플 프레임에서 색상별 HSV 범위를 계산해
+# 버전이 붙은 JSON 프로파일로 저장하고, 모든 스크립트가 시작할 때 불러 쓴다.
+#
+#   python Color_profile.py label --source 0 --colors red,yellow,green --out samples/labels.json
+#       → 프레임을 찍고('s') 색상마다 물체 영역을 마우스로 지정 → 이미지 + 라벨 파일 저장
+#   python Color_profile.py build samples/labels.json --out color_profile.json
+#       → 샘플 픽셀로 색상별 범위 계산 + 겹치는 범위 정리 → 프로파일 저장 (revision 자동 증가)
+#   python Color_profile.py check color_profile.json
+#       → 범위가 겹치는 색상 쌍 출력 (파일 대신 스크립트 이름을 주면 그 스크립트의 기본 표 검사)
+#
+# 프로파일 형식: {"version": 1, "revision": N, "created": ..., "colors": [{"name", "lower", "upper", "bgr",
+#                 "center", "pixels"}, ...], "resolved": [...]}
+# 범위는 H/S/V 상자 모양 그대로라 ColorSegmenter 의 LUT 라벨링을 그대로 사용한다.
+PROFILE_VERSION = 1
+
+# 채널별 값 범위 (OpenCV HSV: H 0~179, S/V 0~255)
+CHANNEL_MAX = (179, 255, 255)
+
+
+# === 1. 샘플 픽셀 → 색상 범위 ===
+# hsv_pixels: (N, 3) uint8, percentile: 양 끝에서 버릴 비율(%), margin: 채널별 여유
+# 반환: [(이름, lower, upper), ...] (빨간색처럼 색상환 0/180 을 넘는 경우 범위 2개)
+def fit_ranges(name, hsv_pixels, percentile=2.0, margin=(2, 10, 10)):
+    pixels = np.asarray(hsv_pixels, dtype=np.int32).reshape(-1, 3)
+    if len(pixels) == 0:
+        raise ValueError(f"{name}: 샘플 픽셀이 없습니다")
+
+    # S / V: 일반 백분위수
+    lower, upper = [0, 0, 0], [0, 0, 0]
+    for ch in (1, 2):
+        lo, hi = np.percentile(pixels[:, ch], [percentile, 100 - percentile])
+        lower[ch] = int(max(lo - margin[ch], 0))
+        upper[ch] = int(min(hi + margin[ch], CHANNEL_MAX[ch]))
+
+    # H: 원형 값 → 히스토그램에서 가장 긴 빈 구간을 찾아 그 중간을 0 으로 돌린 뒤 백분위수 계산
+    hue = pixels[:, 0] % 180
+    shift = _largest_gap_center(np.bincount(hue, minlength=180), len(hue))
+    shifted = (hue - shift) % 180
+    lo, hi = np.percentile(shifted, [percentile, 100 - percentile])
+    lo, hi = int(lo) - margin[0], int(np.ceil(hi)) + margin[0]
+    if hi - lo >= 179:
+        return [(name, (0, lower[1], lower[2]), (179, upper[1], upper[2]))]  # 색조 무관 (검정 / 흰색 등)
+
+    lo, hi = (lo + shift) % 180, (hi + shift) % 180
+    if lo <= hi:
+        return [(name, (lo, lower[1], lower[2]), (hi, upper[1], upper[2]))]
+    # 0/180 경계를 넘음 → 두 범위로 나눔 (같은 이름 → ColorSegmenter 에서 같은 색상 번호)
+    return [(name, (lo, lower[1], lower[2]), (179, upper[1], upper[2])),
+            (name, (0, lower[1], lower[2]), (hi, upper[1], upper[2]))]
+
+
+# 색조 히스토그램에서 (거의) 비어 있는 가장 긴 원형 구간의 중간 (빈 구간이 없으면 0)
+def _largest_gap_center(hist, total):
+    empty = hist <= max(total * 0.001, 0)
+    if empty.all() or not empty.any():
+        return 0
+    start = int(np.argmin(empty))  # 차 있는 칸에서 시작해 한 바퀴 돌며 빈 구간 측정
+    best_len, best_start, run_len, run_start = 0, 0, 0, 0
+    for k in range(1, 181):
+        i = (start + k) % 180
+        if empty[i]:
+            if run_len == 0:
+                run_start = i
+            run_len += 1
+            if run_len > best_len:
+                best_len, best_start = run_len, run_start
+        else:
+            run_len = 0
+    return (best_start + best_len // 2) % 180
+
+
+# 샘플 픽셀의 대표값 (H 는 원형 평균)
+def hsv_center(hsv_pixels):
+    pixels = np.asarray(hsv_pixels, dtype=np.float64).reshape(-1, 3)
+    angle = pixels[:, 0] * (2 * np.pi / 180)
+    h = (np.degrees(np.arctan2(np.sin(angle).mean(), np.cos(angle).mean())) / 2) % 180
+    return [float(h), float(np.median(pixels[:, 1])), float(np.median(pixels[:, 2]))]
+
+
+# === 2. 겹치는 범위 찾기 / 정리 ===
+# 두 범위가 H/S/V 세 채널 모두에서 겹치면 같은 픽셀이 두 색상에 걸림
+# → 우선순위가 낮은 색상은 윤곽선 작업만 하고 버려지거나, 물체가 두 색상으로 나뉘어 이중 검출됨
+def _overlap(a, b):
+    lo = [max(a[1][c], b[1][c]) for c in range(3)]
+    hi = [min(a[2][c], b[2][c]) for c in range(3)]
+    return None if any(l > h for l, h in zip(lo, hi)) else (lo, hi)
+
+
+# 범위가 겹치는 (i, j) 쌍 목록 (같은 이름끼리는 제외)
+def find_overlaps(colors):
+    pairs = []
+    for i in range(len(colors)):
+        for j in range(i + 1, len(colors)):
+            if colors[i][0] != colors[j][0] and _overlap(colors[i], colors[j]) is not None:
+                pairs.append((i, j))
+    return pairs
+
+
+# 겹침 정리: 겹치는 쌍마다 한 채널을 골라 두 색상의 대표값 중간에서 잘라 나눈다.
+# 채널은 두 범위가 잃는 폭(비율)의 합이 가장 작은 채널 (대표값 차이가 큰 채널이 먼저)
+# 한 범위가 채널 전체를 덮으면(검정의 H 등) 그 채널은 고르지 않음
+# centers: 이름 → 대표 HSV (샘플이 없으면 범위 중심)
+# 반환: (정리된 색상 목록, 정리 기록 [문구, ...])
+def resolve_overlaps(colors, centers=None, max_passes=10):
+    colors = [(c[0], list(c[1]), list(c[2])) + tuple(c[3:]) for c in colors]
+    centers = centers or {}
+    log = []
+
+    def center(entry):
+        box_center = [(entry[1][c] + entry[2][c]) / 2 for c in range(3)]
+        value = centers.get(entry[0], box_center)
+        # 범위 두 개로 나뉜 색상(빨간색)은 이 범위 안으로 당겨서 사용
+        return [min(max(value[c], entry[1][c]), entry[2][c]) for c in range(3)]
+
+    for _ in range(max_passes):
+        pairs = find_overlaps(colors)
+        if not pairs:
+            break
+        for i, j in pairs:
+            a, b = colors[i], colors[j]
+            overlap = _overlap(a, b)
+            if overlap is None:
+                continue  # 앞 쌍을 정리하면서 이미 풀림
+            ca, cb = center(a), center(b)
+
+            best = None
+            for ch in range(3):
+                if any(e[1][ch] <= 0 and e[2][ch] >= CHANNEL_MAX[ch] for e in (a, b)):
+                    continue  # 채널 전체를 덮는 범위(검정의 색조 등)는 그 채널로 구분하는 색이 아님
+                low, high = (a, b) if ca[ch] <= cb[ch] else (b, a)
+                c_low, c_high = (ca, cb) if low is a else (cb, ca)
+                cut = int((c_low[ch] + c_high[ch]) // 2)
+                cut = min(max(cut, overlap[0][ch] - 1, low[1][ch]), overlap[1][ch], high[2][ch] - 1)
+                if cut < low[1][ch] or cut + 1 > high[2][ch]:
+                    continue  # 자르면 한쪽 범위가 비어 버림
+                lost = ((low[2][ch] - cut) / (low[2][ch] - low[1][ch] + 1)
+                        + (cut + 1 - high[1][ch]) / (high[2][ch] - high[1][ch] + 1))
+                key = (lost, -abs(ca[ch] - cb[ch]) / (CHANNEL_MAX[ch] + 1))
+                if best is None or key < best[0]:
+                    best = (key, ch, low, high, cut)
+            if best is None:
+                log.append(f"{a[0]} / {b[0]}: 나눌 수 없음 (한 범위가 다른 범위를 덮음)")
+                continue
+            _, ch, low, high, cut = best
+            low[2][ch], high[1][ch] = cut, cut + 1
+            log.append(f"{low[0]} / {high[0]}: {'HSV'[ch]} {cut} / {cut + 1} 에서 나눔")
+
+    return [(c[0], tuple(c[1]), tuple(c[2])) + tuple(c[3:]) for c in colors], log
+
+
+# === 3. 저장 / 불러오기 ===
+def save_profile(path, colors, centers=None, pixels=None, resolved=None):
+    revision = 1
+    if os.path.exists(path):
+        try:
+            revision = load_profile(path).get("revision", 0) + 1
+        except (ValueError, OSError):
+            pass
+    data = {
+        "version": PROFILE_VERSION,
+        "revision": revision,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "colors": [{"name": c[0], "lower": list(c[1]), "upper": list(c[2]),
+                    "bgr": list(c[3]) if len(c) > 3 else None,
+                    "center": (centers or {}).get(c[0]), "pixels": (pixels or {}).get(c[0])}
+                   for c in colors],
+        "resolved": resolved or [],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return revision
+
+
+def load_profile(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != PROFILE_VERSION:
+        raise ValueError(f"지원하지 않는 색상 프로파일 버전: {data.get('version')} ({path})")
+    return data
+
+
+# 프로파일이 있으면 그 색상 표, 없으면 default 표 → [(이름, lower, upper, bgr), ...]
+# (스크립트에 적어 둔 표는 프로파일이 없을 때의 기본값으로만 사용)
+def load_colors(default, path=None):
+    if not path or not os.path.exists(path):
+        return list(default)
+    fallback_bgr = {entry[0]: entry[3] for entry in default if len(entry) > 3}
+    colors = []
+    for c in load_profile(path)["colors"]:
+        bgr = c.get("bgr") or fallback_bgr.get(c["name"]) or _display_bgr(c["lower"], c["upper"])
+        colors.append((c["name"], tuple(c["lower"]), tuple(c["upper"]), tuple(bgr)))
+    return colors
+
+
+# 스크립트에 적어 둔 기본 색상 표 (최상위 colors = [...]) 를 실행하지 않고 읽기
+# (카메라 루프가 최상위에 있는 스크립트도 있으므로 import 하지 않음)
+# module: 스크립트 이름 (예: Color_recognition_Fruit, 이 폴더 기준) 또는 .py 경로
+def script_colors(module):
+    path = module if module.endswith(".py") else os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                              module + ".py")
+    if not os.path.exists(path):
+        raise SystemExit(f"스크립트를 찾을 수 없습니다: {path}")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id == "colors"):
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                raise SystemExit(f"{path} 의 colors 가 상수 표가 아닙니다")
+    raise SystemExit(f"{path} 에 색상 표(colors = [...])가 없습니다")
+
+
+# 범위 중심 HSV 를 화면 표시용 BGR 로
+def _display_bgr(lower, upper):
+    hsv = np.uint8([[[(lower[0] + upper[0]) // 2, max(upper[1], 128), max(upper[2], 128)]]])
+    return tuple(int(v) for v in cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0, 0])
+
+
+# === 4. 라벨 파일 → 프로파일 ===
+# 라벨 파일: {"samples": [{"image": "001.png", "color": "red", "box": [x, y, w, h]}, ...]}
+# (이미지 경로는 라벨 파일 기준 상대 경로)
+def collect_pixels(labels_path):
+    with open(labels_path, encoding="utf-8") as f:
+        samples = json.load(f)["samples"]
+    base = os.path.dirname(os.path.abspath(labels_path))
+    images, pixels = {}, {}
+    for s in samples:
+        path = os.path.join(base, s["image"])
+        if path not in images:
+            bgr = cv2.imread(path)
+            if bgr is None:
+                raise ValueError(f"이미지를 읽을 수 없습니다: {path}")
+            images[path] = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+        x, y, w, h = s["box"]
+        pixels.setdefault(s["color"], []).append(images[path][y:y + h, x:x + w].reshape(-1, 3))
+    return {name: np.concatenate(chunks) for name, chunks in pixels.items()}
+
+
+def build_profile(labels_path, out_path, percentile=2.0, margin=(2, 10, 10)):
+    pixels = collect_pixels(labels_path)
+    colors, centers = [], {}
+    for name, hsv_pixels in pixels.items():
+        centers[name] = hsv_center(hsv_pixels)
+        for entry in fit_ranges(name, hsv_pixels, percentile, margin):
+            colors.append(entry + (_display_bgr(entry[1], entry[2]),))
+    colors, log = resolve_overlaps(colors, centers)
+    revision = save_profile(out_path, colors, centers, {n: int(len(p)) for n, p in pixels.items()}, log)
+    return colors, log, revision
+
+
+# === 5. 샘플 라벨링 (카메라 / 영상에서 프레임을 찍고 색상별 영역 지정) ===
+def label_samples(source, color_names, out_path):
+    from Frame_capture import open_source
+    cap = open_source(source)
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(out_dir, exist_ok=True)
+    samples = []
+    if os.path.exists(out_path):
+        with open(out_path, encoding="utf-8") as f:
+            samples = json.load(f)["samples"]
+
+    print("s: 프레임 찍기 → 색상마다 영역 드래그 후 Enter (여러 개 가능, 끝나면 Esc) / q: 저장 후 종료")
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        cv2.imshow("label", frame)
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            break
+        if key != ord('s'):
+            continue
+        image = f"sample_{int(time.time() * 1000)}.png"
+        cv2.imwrite(os.path.join(out_dir, image), frame)
+        for name in color_names:
+            for box in cv2.selectROIs(f"{name} 영역 선택", frame, showCrosshair=False):
+                samples.append({"image": image, "color": name, "box": [int(v) for v in box]})
+            cv2.destroyWindow(f"{name} 영역 선택")
+
+    cap.release()
+    cv2.destroyAllWindows()
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"samples": samples}, f, indent=2, ensure_ascii=False)
+    print(f"샘플 {len(samples)}개 → {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HSV 색상 프로파일 보정")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("label", help="샘플 프레임 찍고 색상별 영역 지정")
+    p.add_argument("--source", default="0", help="카메라 번호, 동영상 파일 또는 이미지 폴더")
+    p.add_argument("--colors", required=True, help="라벨을 붙일 색상 이름 (쉼표로 구분)")
+    p.add_argument("--out", default="samples/labels.json", help="라벨 파일")
+
+    p = sub.add_parser("build", help="라벨 파일로 색상 범위 계산 → 프로파일 저장")
+    p.add_argument("labels", help="라벨 파일")
+    p.add_argument("--out", default="color_profile.json", help="프로파일 파일")
+    p.add_argument("--percentile", type=float, default=2.0, help="양 끝에서 버릴 샘플 비율 (%%)")
+    p.add_argument("--margin", default="2,10,10", help="H,S,V 여유")
+
+    p = sub.add_parser("check", help="겹치는 색상 범위 검사")
+    p.add_argument("profile", help="프로파일 파일 또는 색상 표가 있는 스크립트 모듈 이름 (예: Color_recognition_Fruit)")
+    args = parser.parse_args()
+
+    if args.command == "label":
+        label_samples(args.source, args.colors.split(","), args.out)
+    elif args.command == "build":
+        margin = tuple(int(v) for v in args.margin.split(","))
+        colors, log, revision = build_profile(args.labels, args.out, args.percentile, margin)
+        for name, lower, upper, _ in colors:
+            print(f"  {name:<8} {lower} ~ {upper}")
+        for line in log:
+            print(f"  겹침 정리: {line}")
+        print(f"{args.out} 저장 (revision {revision})")
+    else:
+        if os.path.exists(args.profile) and not args.profile.endswith(".py"):
+            colors = load_colors([], args.profile)
+        else:
+            colors = script_colors(args.profile)
+        pairs = find_overlaps(colors)
+        for i, j in pairs:
+            lo, hi = _overlap(colors[i], colors[j])
+            print(f"  {colors[i][0]} / {colors[j][0]}: H {lo[0]}~{hi[0]}, S {lo[1]}~{hi[1]}, V {lo[2]}~{hi[2]}")
+        _, log = resolve_overlaps(colors)
+        for line in log:
+            print(f"  제안: {line}")
+        print(f"겹치는 쌍 {len(pairs)}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import cv2
-import numpy as np
+from Color_segmentation import bgr_detector
+from Vision_runtime import VisionRuntime
 
-# HSV 색상 범위 정의: (이름, HSV 최솟값, HSV 최댓값, 출력할 BGR 색)
+# HSV 색상 범위 기본값: (이름, HSV 최솟값, HSV 최댓값, 출력할 BGR 색)
+# --color-profile (또는 COLOR_PROFILE) 로 색상 프로파일을 주면 이 표 대신 프로파일을 사용
 colors = [
     ("red",    (0, 100, 100),   (10, 255, 255),   (0, 0, 255)),       # 빨간색
     ("orange", (11, 100, 100),  (20, 255, 255),   (0, 128, 255)),     # 주황색
@@ -15,32 +17,34 @@ colors = [
     ("black",  (0, 0, 0),       (180, 255, 50),   (0, 0, 0))          # 검정색
 ]
 
-# 카메라 장치 열기 (0번 카메라 사용)
-cap = cv2.VideoCapture(0)
+# 처리 배율: 2 / 4 면 1/2 / 1/4 축소 영상에서 후보를 찾고 원본 해상도 작은 창에서 중심 보정 (1 = 원본 전체)
+PROCESS_SCALE = 2
 
-while True:
-    # 프레임 읽기
-    ret, frame = cap.read()
-    if not ret:
-        break  # 프레임을 못 읽으면 종료
+def main():
+    # 실행 환경 (--headless: 창/그리기 없이 결과만 JSON Lines 로 출력)
+    runtime = VisionRuntime("color_fruit")
 
-    # BGR 이미지를 HSV 색공간으로 변환 (색상 인식을 위해 필수)
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    # 색상 표 (프로파일이 있으면 프로파일, 없으면 위 기본 표)
+    palette = runtime.colors(colors)
+    color_bgr = {name: bgr for name, _, _, bgr in palette}
 
-    # 정의된 각 색상 범위마다 반복
-    for name, lower, upper, bgr in colors:
-        # 현재 색상에 해당하는 마스크 이미지 생성
-        mask = cv2.inRange(hsv, np.array(lower), np.array(upper))
+    # 카메라 장치 열기 (0번 카메라 사용)
+    cap = runtime.open_source(0)  # 백그라운드 스레드 캡처 (--source 로 녹화 영상 재생 가능)
 
-        # 마스크에서 외곽선 검출
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    # 프레임 읽기 + 검출 (프레임을 못 읽으면 종료, --workers N 이면 작업 프로세스 N 개가 나눠 검출)
+    # 색상 범위 표를 룩업 테이블(LUT)로 한 번만 컴파일해 두고, 축소 영상에서 후보 검출 →
+    # 후보 주변만 원본 해상도로 객체 목록 추출 (결과 좌표는 원본 프레임 기준)
+    for frame, objects in runtime.detect_frames(cap, bgr_detector, palette, min_area=500, scale=PROCESS_SCALE):
+        # 구조화된 결과 출력 (JSON Lines / 콜백)
+        runtime.emit({"objects": [
+            {"color": name, "area": float(area), "bbox": [x, y, w, h], "center": [cx, cy]}
+            for name, area, (x, y, w, h), (cx, cy) in objects
+        ]})
 
-        # 검출된 모든 윤곽선에 대해 처리
-        for cnt in contours:
-            area = cv2.contourArea(cnt)  # 윤곽선 면적 계산
-            if area > 500:  # 너무 작은 Q무시
-                x, y, w, h = cv2.boundingRect(cnt)  # 외곽 사각형 좌표 계산
-                cx, cy = x + w // 2, y + h // 2      # 중심 좌표 계산 (선택적 활용 가능)
+        # 화면에 보여 줄 때만 그리기 (헤드리스에서는 그리기 비용 없음)
+        if runtime.draw:
+            for name, area, (x, y, w, h), _ in objects:
+                bgr = color_bgr[name]
 
                 # 인식된 영역에 사각형 그리기
                 cv2.rectangle(frame, (x, y), (x + w, y + h), bgr, 2)
@@ -49,13 +53,17 @@ while True:
                 cv2.putText(frame, name, (x, y - 10),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.6, bgr, 2)
 
-    # 결과 프레임을 화면에 출력
-    cv2.imshow("Color Detection", frame)
+        # 결과 프레임을 화면에 출력
+        runtime.show("Color Detection", frame)
 
-    # 'q' 키를 누르면 종료
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+        # 'q' 키를 누르면 종료
+        if runtime.end_frame():
+            break
 
-# 종료 시 자원 해제
-cap.release()
-cv2.destroyAllWindows()
+    # 종료 시 자원 해제
+    cap.release()
+    runtime.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,27 @@
 import cv2
 import numpy as np
+from Frame_buffers import FrameBuffers
+from Vision_runtime import VisionRuntime
+
+# === 빨간색 HSV 범위 설정 (한 번만 만들어 둠) ===
+# 빨간색은 HSV 색상값 H가 0도와 180도 양쪽 끝에 걸쳐 있음
+# 그래서 2개의 범위로 나누어 탐지해야 함
+
+# 첫 번째 빨간색 범위 (약 0° ~ 10°)
+lower_red1 = np.array([0, 120, 70])
+upper_red1 = np.array([10, 255, 255])
+
+# 두 번째 빨간색 범위 (약 170° ~ 180°)
+lower_red2 = np.array([170, 120, 70])
+upper_red2 = np.array([180, 255, 255])
+
+# === 실행 환경 (--headless: 창 없이 빨간색 픽셀 수만 출력) ===
+runtime = VisionRuntime("color_red")
+gate = runtime.change_gate()  # 화면이 그대로면 마스크를 다시 만들지 않음
+buffers = FrameBuffers()      # HSV / 마스크 / 결과 영상을 프레임마다 새로 할당하지 않고 재사용
 
 # === 웹캠 열기 ===
-cap = cv2.VideoCapture(0)  # 0번 카메라 사용
+cap = runtime.open_source(0)  # 백그라운드 스레드 캡처 (--source 로 녹화 영상 재생 가능)
 
 if not cap.isOpened():
     print("카메라 열기 실패")
@@ -14,40 +33,38 @@ while True:
     if not ret:
         break  # 프레임을 못 읽으면 종료
 
-    # BGR → HSV 색공간으로 변환
-    # OpenCV에서 기본은 BGR이며, 색상 필터링에는 HSV가 더 적합
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-
-    # === 빨간색 HSV 범위 설정 ===
-    # 빨간색은 HSV 색상값 H가 0도와 180도 양쪽 끝에 걸쳐 있음
-    # 그래서 2개의 범위로 나누어 탐지해야 함
-
-    # 첫 번째 빨간색 범위 (약 0° ~ 10°)
-    lower_red1 = np.array([0, 120, 70])
-    upper_red1 = np.array([10, 255, 255])
-
-    # 두 번째 빨간색 범위 (약 170° ~ 180°)
-    lower_red2 = np.array([170, 120, 70])
-    upper_red2 = np.array([180, 255, 255])
+    # 화면이 바뀌었을 때만 (또는 --refresh-frames 주기마다) 마스크 새로 만들기, 아니면 직전 마스크 사용
+    if gate.changed(frame):
+        shape = frame.shape[:2]
+        # BGR → HSV 색공간으로 변환
+        # OpenCV에서 기본은 BGR이며, 색상 필터링에는 HSV가 더 적합
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=buffers.get("hsv", frame.shape))
 
-    # 각 범위에 해당하는 픽셀만 흰색(255)으로 표시한 마스크 생성
-    mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-    mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
+        # 각 범위에 해당하는 픽셀만 흰색(255)으로 표시한 마스크 생성
+        mask1 = cv2.inRange(hsv, lower_red1, upper_red1, dst=buffers.get("mask1", shape))
+        mask2 = cv2.inRange(hsv, lower_red2, upper_red2, dst=buffers.get("mask2", shape))
 
-    # 두 마스크를 합쳐서 빨간색 전체 범위 마스크 생성
-    red_mask = mask1 | mask2
+        # 두 마스크를 합쳐서 빨간색 전체 범위 마스크 생성
+        red_mask = cv2.bitwise_or(mask1, mask2, dst=buffers.get("red_mask", shape))
+        red_pixels = cv2.countNonZero(red_mask)
 
-    # 빨간색 영역만 추출: 마스크를 원본 프레임에 적용
-    red_detected = cv2.bitwise_and(frame, frame, mask=red_mask)
+    # 구조화된 결과 출력 (빨간색 픽셀 수 / 비율)
+    runtime.emit({"red_pixels": red_pixels, "red_ratio": red_pixels / red_mask.size})
 
     # === 영상 출력 ===
-    cv2.imshow("Original", frame)            # 원본 영상
-    cv2.imshow("Red Mask", red_detected)     # 빨간색만 추출된 영상
+    runtime.show("Original", frame)          # 원본 영상
+    if runtime.draw:
+        # 빨간색 영역만 추출: 마스크를 원본 프레임에 적용 (화면에 보여 줄 때만)
+        # 미리 만든 버퍼에 마스크를 적용하면 마스크 밖은 이전 값이 남으므로 먼저 0 으로 채움
+        red_detected = buffers.get("red_detected", frame.shape)
+        red_detected[:] = 0
+        cv2.bitwise_and(frame, frame, dst=red_detected, mask=red_mask)
+        runtime.show("Red Mask", red_detected)   # 빨간색만 추출된 영상
 
     # 'q' 키를 누르면 종료
-    if cv2.waitKey(1) & 0xFF == ord('q'):
+    if runtime.end_frame():
         break
 
 # === 자원 해제 및 종료 ===
 cap.release()               # 카메라 장치 해제
-cv2.destroyAllWindows()     # 모든 창 닫기
+runtime.close()             # 모든 창 닫기
@@ -0,0 +1,168 @@
+import cv2
+import numpy as np
+
+from Blob_extraction import BlobExtractor  # 마스크 → 연결 영역 면적 / 외곽 사각형 / 중심 배열
+from Frame_buffers import FrameBuffers  # 프레임마다 새로 할당하지 않는 재사용 버퍼
+
+# 한 번에 구분할 수 있는 색상 범위 개수 (범위 하나당 1비트, 8개씩 uint8 비트마스크 그룹 2개)
+MAX_RANGES = 16
+GROUP_BITS = 8
+
+
+# === 색상 테이블 → 한 번에 라벨링하는 세그멘테이션 엔진 ===
+# 색상 범위 표 [(이름, HSV 최솟값, HSV 최댓값, ...), ...] 를 룩업 테이블(LUT)로 미리 컴파일해 두고,
+# 프레임마다 모든 픽셀에 색상 번호를 한 번의 벡터 연산으로 붙인다.
+# → 색상마다 cv2.inRange 를 반복하던 기존 방식(색상 수만큼 전체 프레임 순회)을 대체
+#
+# 색상 범위는 H/S/V 각각의 구간(상자 모양)이므로 180×256×256 3차원 LUT 는
+# "채널별 256칸 비트마스크 LUT 3개의 AND" 로 정확히 분해된다.
+# (1080p 기준 3차원 LUT 랜덤 조회보다 cv2.LUT 3번 + AND 가 훨씬 빠르고 메모리도 작음)
+# 범위 8개마다 uint8 비트마스크 그룹 하나 → 비트마스크 → 색상 번호도 256칸 cv2.LUT 로 변환
+# (uint16 비트마스크를 np.take 로 변환하면 인덱스를 intp 로 바꾸느라 1080p 에서 프레임마다 16MB 를 할당)
+# HSV·채널·비트마스크·라벨·마스크 영상은 FrameBuffers 에 두고 dst= 로 재사용한다 (워밍업 뒤 프레임당 큰 할당 없음).
+# → label() / to_hsv() 가 돌려준 영상은 다음 호출 때 덮어씀 (검출기 하나를 여러 스레드에서 동시에 쓰지 않음)
+class ColorSegmenter:
+    def __init__(self, colors):
+        # colors: (이름, lower, upper, ...) 튜플 목록 (뒤쪽 추가 항목은 그대로 보존)
+        self.colors = list(colors)
+        if len(self.colors) > MAX_RANGES:
+            raise ValueError(f"색상 범위는 최대 {MAX_RANGES}개까지 지원합니다.")
+
+        # 같은 이름이 여러 번 나오면(예: 빨간색 0~10, 170~180) 같은 번호로 묶음
+        self.names = []
+        for entry in self.colors:
+            if entry[0] not in self.names:
+                self.names.append(entry[0])
+
+        self.groups = self._build_luts()
+        # 색상 번호 → 그 색상의 범위가 들어 있는 마지막 그룹까지의 그룹 수 (한 색상만 볼 때 뒤 그룹 생략)
+        self.group_count = [0] + [max(i // GROUP_BITS for i, entry in enumerate(self.colors) if entry[0] == name) + 1
+                                  for name in self.names]
+        self.buffers = FrameBuffers()
+        self.blobs = BlobExtractor()
+
+    # 색상 범위 표를 범위 8개씩 [(H, S, V 비트마스크 LUT, 우선순위 LUT), ...] 로 변환
+    def _build_luts(self):
+        groups = []
+        masks = np.arange(256)
+        for first in range(0, len(self.colors), GROUP_BITS):
+            entries = self.colors[first:first + GROUP_BITS]
+            luts = [np.zeros(256, dtype=np.uint8) for _ in range(3)]
+            for bit, entry in enumerate(entries):
+                lower, upper = entry[1], entry[2]
+                for ch in range(3):
+                    lo = max(int(lower[ch]), 0)
+                    hi = min(int(upper[ch]), 255)
+                    luts[ch][lo:hi + 1] |= np.uint8(1 << bit)
+
+            # 비트마스크 → 색상 번호 (0 = 배경, 1.. = names 순서)
+            # 범위가 겹치면 표에서 먼저 나온 범위(가장 낮은 비트, 앞 그룹)가 우선
+            # → 기존 루프의 "첫 번째 매칭" 순서와 동일
+            priority = np.zeros(256, dtype=np.uint8)
+            assigned = np.zeros(256, dtype=bool)
+            for bit, entry in enumerate(entries):
+                hit = ((masks >> bit) & 1).astype(bool) & ~assigned
+                priority[hit] = self.names.index(entry[0]) + 1
+                assigned |= hit
+            groups.append((luts[0], luts[1], luts[2], priority))
+        return groups
+
+    # BGR → HSV (재사용 버퍼에)
+    def to_hsv(self, bgr, name="hsv"):
+        return cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV, dst=self.buffers.get(name, bgr.shape))
+
+    # HSV 이미지의 모든 픽셀에 색상 번호를 붙인 라벨 이미지 반환 (단일 패스)
+    # groups: 앞에서부터 이 개수의 그룹만 사용 (없으면 전체, 특정 색상 픽셀만 필요할 때 group_count[색상 번호])
+    def label(self, hsv, groups=None):
+        shape = hsv.shape[:2]
+        get = self.buffers.get
+        h, s, v = (cv2.extractChannel(hsv, ch, dst=get(f"channel{ch}", shape)) for ch in range(3))
+        bits, lut = get("bits", shape), get("lut", shape)
+        labels = None
+        for index, (h_lut, s_lut, v_lut, priority) in enumerate(self.groups[:groups]):
+            cv2.LUT(h, h_lut, dst=bits)
+            cv2.bitwise_and(bits, cv2.LUT(s, s_lut, dst=lut), dst=bits)
+            cv2.bitwise_and(bits, cv2.LUT(v, v_lut, dst=lut), dst=bits)
+            group_labels = cv2.LUT(bits, priority, dst=get(f"labels{index}", shape))
+            if labels is not None:
+                cv2.copyTo(labels, labels, dst=group_labels)  # 앞 그룹에서 색상이 정해진 픽셀은 앞 그룹 우선
+            labels = group_labels
+        return labels
+
+    # 라벨 이미지에서 색상별 연결 영역(객체) 목록을 한 번에 추출
+    # 반환: [(색상이름, 면적, (x, y, w, h), (cx, cy)), ...]  ※ 색상 표 순서, 색상 안에서는 면적 큰 순
+    def segment(self, hsv, min_area=500):
+        labels = self.label(hsv)
+        return self.extract(labels, min_area)
+
+    # 이미 만들어 둔 라벨 이미지에서 객체 목록 추출
+    def extract(self, labels, min_area=500):
+        # 색상별 픽셀 수를 한 번에 세어서, 최소 면적에 못 미치는 색상은 연결 영역 분석 자체를 생략
+        bins = len(self.names) + 1
+        counts = cv2.calcHist([labels], [0], None, [bins], [0, bins]).ravel()
+
+        results = []
+        mask = self.buffers.get("mask", labels.shape)
+        for idx, name in enumerate(self.names, start=1):
+            if counts[idx] < min_area:
+                continue
+
+            cv2.compare(labels, idx, cv2.CMP_EQ, dst=mask)
+            blobs = self.blobs.extract(mask, min_area, key=idx)
+            results += [(name, area, box, center) for area, box, center in blobs.items()]
+        return results
+
+    # ------------------------------------------------------------
+    # 축소 영상에서 후보 검출 → 원본 해상도 작은 창에서 중심 보정 (처리 피라미드)
+    # ------------------------------------------------------------
+    # BGR 이미지를 받아 segment() 와 같은 형식의 결과를 원본 좌표로 반환
+    # scale=1 이면 원본 해상도 전체 처리 (segment 와 동일), 2 / 4 면 1/2 / 1/4 축소 영상에서 후보 검출
+    def segment_bgr(self, bgr, min_area=500, scale=1):
+        if scale <= 1:
+            return self.segment(self.to_hsv(bgr), min_area)
+        return self.refine(bgr, self.candidates(bgr, min_area, scale), min_area, scale)
+
+    # 1/scale 축소 영상에서 후보 영역 찾기 → [(색상 번호, 축소 영상 (x, y, w, h)), ...]
+    def candidates(self, bgr, min_area=500, scale=2):
+        h, w = bgr.shape[:2]
+        # 최근접 축소: 경계 픽셀 색이 섞이지 않아 없는 색상 후보가 생기지 않음
+        size = (w // scale, h // scale)
+        small = cv2.resize(bgr, size, dst=self.buffers.get("small", (size[1], size[0], 3)),
+                           interpolation=cv2.INTER_NEAREST)
+        labels = self.label(self.to_hsv(small))
+        # 축소 영상에서는 면적이 1/scale² 로 줄고 경계가 거칠어지므로 기준을 절반으로 완화
+        small_area = min_area / (scale * scale) / 2
+        return [(self.names.index(name) + 1, box)
+                for name, _, box, _ in self.extract(labels, small_area)]
+
+    # 후보 주변 원본 해상도 창에서만 라벨링 + 연결 영역 분석 → 원본 좌표 결과
+    def refine(self, bgr, candidates, min_area=500, scale=2):
+        h, w = bgr.shape[:2]
+        margin = 2 * scale + 2  # 축소로 잘려 나간 가장자리 여유
+        results, seen = [], set()
+        for idx, (x, y, bw, bh) in candidates:
+            # 후보 상자 (원본 좌표) 와 여유를 더한 창
+            bx1, by1, bx2, by2 = x * scale, y * scale, (x + bw) * scale, (y + bh) * scale
+            x1, y1 = max(bx1 - margin, 0), max(by1 - margin, 0)
+            x2, y2 = min(bx2 + margin, w), min(by2 + margin, h)
+
+            labels = self.label(self.to_hsv(bgr[y1:y2, x1:x2]), self.group_count[idx])
+            mask = cv2.compare(labels, idx, cv2.CMP_EQ, dst=self.buffers.get("mask", labels.shape))
+            blobs = self.blobs.extract(mask, min_area, offset=(x1, y1), key=(idx, "window"))
+
+            # 창이 겹쳐 이웃 후보의 객체가 같이 잡히면 중심이 이 후보 상자 안에 있는 것만 사용
+            cx, cy = blobs.centroid[:, 0].astype(np.int32), blobs.centroid[:, 1].astype(np.int32)
+            blobs.select((cx >= bx1 - scale) & (cx < bx2 + scale) & (cy >= by1 - scale) & (cy < by2 + scale))
+            for area, box, center in blobs.items():
+                if (idx, center) in seen:
+                    continue
+                seen.add((idx, center))
+                results.append((self.names[idx - 1], area, box, center))
+        return results
+
+
+# === 프로세스 풀용 검출기 생성 함수 (PerceptionPool.open_stream 에 전달) ===
+# 작업 프로세스 안에서 한 번만 LUT 를 컴파일하고 "BGR 프레임 → segment_bgr 결과" 함수를 돌려준다.
+def bgr_detector(ranges, min_area=500, scale=1):
+    segmenter = ColorSegmenter(ranges)
+    return lambda bgr: segmenter.segment_bgr(bgr, min_area, scale)
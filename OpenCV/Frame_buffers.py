@@ -0,0 +1,36 @@
+import numpy as np
+
+from Metrics import metrics
+
+
+# === 프레임 처리용 재사용 버퍼 ===
+# 프레임마다 cvtColor / inRange / LUT 결과를 새 배열로 받지 않도록, 이름별 버퍼를 한 번 만들어 두고
+# OpenCV 호출의 dst= 로 넘긴다.
+# - 버퍼는 지금까지 요청된 가장 큰 크기로 만들고, 요청 크기만큼의 앞부분 view 를 돌려줌
+#   → ArUco ROI 처럼 프레임마다 크기가 조금씩 바뀌어도 워밍업 뒤에는 새로 할당하지 않음
+# - 돌려준 배열은 같은 이름으로 다시 요청하면 덮어쓰므로, 다음 프레임까지 보관할 결과는 복사해서 사용
+# - 스레드 간 공유하지 않음 (검출기 / 스트림마다 하나씩)
+#
+#   buffers = FrameBuffers()
+#   hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=buffers.get("hsv", frame.shape))
+class FrameBuffers:
+    def __init__(self):
+        self.buffers = {}  # 이름 → 할당된 배열 (최대 크기)
+
+    # shape, dtype 크기의 버퍼 view (처음이거나 더 큰 크기가 필요할 때만 할당)
+    def get(self, name, shape, dtype=np.uint8):
+        shape = tuple(shape)
+        buffer = self.buffers.get(name)
+        if (buffer is None or buffer.dtype != dtype or buffer.ndim != len(shape)
+                or any(have < need for have, need in zip(buffer.shape, shape))):
+            if buffer is not None and buffer.dtype == dtype and buffer.ndim == len(shape):
+                shape_alloc = tuple(max(have, need) for have, need in zip(buffer.shape, shape))
+            else:
+                shape_alloc = shape
+            buffer = self.buffers[name] = np.empty(shape_alloc, dtype)
+            metrics.count("vision.buffer_alloc")
+        return buffer[tuple(slice(0, n) for n in shape)]
+
+    # 할당된 버퍼 전체 크기 (바이트)
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in self.buffers.values())
@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+# === 백그라운드 스레드 카메라 캡처 ===
+# cv2.VideoCapture.read() 를 처리 루프 안에서 동기로 부르면
+# 디코딩 지연이 처리 지연에 그대로 더해지고, 드라이버 버퍼에 오래된 프레임이 쌓인다.
+# → 별도 스레드가 계속 프레임을 가져와 크기가 정해진 링 버퍼에 넣고,
+#   처리 루프는 버퍼에서 꺼내 쓰기만 한다.
+#
+# mode="latest" : 항상 가장 최신 프레임만 반환 (밀린 프레임은 버리고 dropped 로 집계)
+# mode="every"  : 들어온 순서대로 모든 프레임 반환 (버퍼가 가득 차면 가장 오래된 것부터 버림)
+#
+# cv2.VideoCapture 와 같은 isOpened() / read() / release() 를 제공하므로 그대로 바꿔 끼울 수 있다.
+# running 이 False 면 카메라가 끊겼거나 영상이 끝난 것 (read 가 더 기다리지 않고 바로 실패함)
+class ThreadedCapture:
+    def __init__(self, source=0, mode="latest", buffer_size=4):
+        if mode not in ("latest", "every"):
+            raise ValueError(f"지원하지 않는 모드: {mode}")
+
+        self.mode = mode
+        self.cap = cv2.VideoCapture(source)
+
+        self.buffer = deque(maxlen=buffer_size)  # (프레임 번호, 타임스탬프, 프레임)
+        self.cond = threading.Condition()
+        self.running = self.cap.isOpened()
+
+        # 📊 통계
+        self.frames_captured = 0   # 카메라에서 읽어 온 프레임 수
+        self.frames_dropped = 0    # 처리되지 못하고 버려진 프레임 수
+        self.last_index = -1       # 마지막으로 반환한 프레임 번호
+
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        if self.running:
+            self.thread.start()
+
+    # 백그라운드 스레드: 카메라에서 계속 프레임을 읽어 링 버퍼에 넣음
+    def _capture_loop(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            timestamp = time.monotonic()  # 캡처 완료 시각 (지연 측정용)
+
+            with self.cond:
+                if not ret:
+                    self.running = False  # 카메라 끊김 또는 영상 끝
+                    self.cond.notify_all()
+                    break
+
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.frames_dropped += 1  # 가장 오래된 프레임이 밀려남
+                self.buffer.append((self.frames_captured, timestamp, frame))
+                self.frames_captured += 1
+                self.cond.notify_all()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    # 다음 프레임과 함께 (프레임 번호, 캡처 시각) 정보를 반환
+    # 반환: (성공 여부, 프레임, 프레임 번호, 타임스탬프)
+    def read_with_info(self, timeout=None):
+        with self.cond:
+            # 새 프레임이 들어오거나 캡처가 끝날 때까지 대기
+            if not self.cond.wait_for(lambda: self.buffer or not self.running, timeout):
+                return False, None, -1, 0.0
+            if not self.buffer:
+                return False, None, -1, 0.0
+
+            if self.mode == "latest":
+                index, timestamp, frame = self.buffer.pop()
+                self.frames_dropped += len(self.buffer)  # 건너뛴 오래된 프레임
+                self.buffer.clear()
+            else:
+                index, timestamp, frame = self.buffer.popleft()
+
+            self.last_index = index
+            return True, frame, index, timestamp
+
+    # cv2.VideoCapture.read() 와 같은 형태 (ret, frame)
+    def read(self):
+        ret, frame, _, _ = self.read_with_info()
+        return ret, frame
+
+    # 카메라 속성 조회 (cv2.CAP_PROP_FRAME_WIDTH 등)
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def stats(self):
+        with self.cond:
+            return {
+                "captured": self.frames_captured,
+                "dropped": self.frames_dropped,
+                "buffered": len(self.buffer),
+            }
+
+    def release(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+        self.cap.release()
+
+
+# === 녹화 영상 / 이미지 폴더 프레임 소스 ===
+# 카메라 없이도 검출기를 돌리고 성능을 잴 수 있도록 ThreadedCapture 와 같은 형태로 프레임을 제공한다.
+# - path 가 폴더면 그 안의 이미지 파일을 이름 순으로, 파일이면 동영상으로 읽음
+# - realtime=True : 원래 fps 에 맞춰 프레임 제공 (실제 카메라처럼)
+# - realtime=False: 기다리지 않고 최대 속도로 제공 (벤치마크용)
+# - loop=True     : 끝까지 읽으면 처음부터 다시
+class FileSource:
+    IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+    def __init__(self, path, realtime=False, fps=None, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.images = None
+        self.cap = None
+
+        if os.path.isdir(path):
+            self.images = sorted(os.path.join(path, f) for f in os.listdir(path)
+                                 if f.lower().endswith(self.IMAGE_EXTS))
+            self.fps = fps or 30.0
+        else:
+            self.cap = cv2.VideoCapture(path)
+            self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+        self.running = self.isOpened()  # 읽을 프레임이 남아 있는지 (ThreadedCapture.running 과 같은 뜻)
+        self.position = 0          # 다음에 읽을 이미지 위치 (이미지 폴더)
+        self.frames_captured = 0
+        self.started = None        # 첫 프레임 시각 (realtime 재생 기준)
+        self.last_index = -1
+
+    def isOpened(self):
+        if self.images is not None:
+            return len(self.images) > 0
+        return self.cap.isOpened()
+
+    def _next_frame(self):
+        if self.images is not None:
+            if self.position >= len(self.images):
+                if not self.loop or not self.images:
+                    return False, None
+                self.position = 0
+            frame = cv2.imread(self.images[self.position])
+            self.position += 1
+            return frame is not None, frame
+
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    # ThreadedCapture.read_with_info 와 같은 형태 (성공 여부, 프레임, 프레임 번호, 타임스탬프)
+    def read_with_info(self, timeout=None):
+        ret, frame = self._next_frame()
+        if not ret:
+            self.running = False  # 영상 끝 (loop=False) 또는 읽기 실패
+            return False, None, -1, 0.0
+
+        index = self.frames_captured
+        if self.started is None:
+            self.started = time.monotonic()
+        if self.realtime:
+            # 원래 재생 속도에 맞춰 대기
+            delay = self.started + index / self.fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.frames_captured += 1
+        self.last_index = index
+        return True, frame, index, time.monotonic()
+
+    def read(self):
+        ret, frame, _, _ = self.read_with_info()
+        return ret, frame
+
+    def get(self, prop):
+        if self.cap is not None:
+            return self.cap.get(prop)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.images)
+        return 0.0
+
+    def stats(self):
+        return {"captured": self.frames_captured, "dropped": 0, "buffered": 0}
+
+    def release(self):
+        self.running = False
+        if self.cap is not None:
+            self.cap.release()
+
+
+# 프레임 소스 열기: 숫자(카메라 번호)면 ThreadedCapture, 경로면 FileSource
+def open_source(source=0, realtime=True, loop=False, **kwargs):
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return ThreadedCapture(int(source), **kwargs)
+    return FileSource(source, realtime=realtime, loop=loop)
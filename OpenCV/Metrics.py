@@ -0,0 +1,281 @@
+import csv
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# === 단계별 지연 측정 (스팬 / 카운터 / 히스토그램) ===
+# 비전 단계와 픽앤플레이스 사이클 단계의 시간을 모아 Prometheus 텍스트 또는 CSV/JSONL 파일로 내보낸다.
+#
+#   from Metrics import metrics
+#   with metrics.span("vision.aruco"):      # 구간 시간 → 히스토그램
+#       ...
+#   metrics.count("cycle.picked")           # 카운터
+#
+# 꺼져 있으면(기본값) span() 은 아무 일도 하지 않는 공용 객체를 돌려주고 count/observe 는 바로 반환
+# → 측정 코드를 그대로 두어도 비용이 거의 없음. 환경 변수 METRICS=1 또는 metrics.enable() 로 켠다.
+
+# 히스토그램 구간 (초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)  # 구간별 개수 (누적 아님)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class Metrics:
+    def __init__(self, enabled=False, labels=None):
+        self.enabled = enabled
+        self.labels = dict(labels or {})  # 모든 출력에 붙는 라벨 (예: {"cell": "cell-1"})
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def enable(self, labels=None):
+        if labels:
+            self.labels.update(labels)
+        self.enabled = True
+
+    # 구간 시간 측정 (with 문)
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    # 함수 전체 시간 측정 (데코레이터, 호출할 때마다 켜짐 여부 확인)
+    def traced(self, name):
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name):
+                    return func(*args, **kwargs)
+            wrapper.__name__ = func.__name__
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    # 시간(초) 한 건 기록
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = _Histogram()
+            hist.add(seconds)
+
+    # 비동기 명령(Future) 여러 개가 차례로 끝나는 시각 차이를 단계별 시간으로 기록
+    # stages: [(이름, Future), ...], start: 첫 단계 시작 시각 (time.perf_counter 기준)
+    def observe_chain(self, stages, start):
+        if not self.enabled:
+            return
+        done_at = {}
+        lock = threading.Lock()
+
+        def on_done(index):
+            def callback(_):
+                with lock:
+                    done_at[index] = time.perf_counter()
+                    if len(done_at) < len(stages):
+                        return
+                previous = start
+                for i, (name, _) in enumerate(stages):
+                    # 앞 단계보다 먼저 끝난 단계는 0 으로 기록
+                    self.observe(name, max(0.0, done_at[i] - previous))
+                    previous = max(previous, done_at[i])
+            return callback
+
+        for i, (_, future) in enumerate(stages):
+            future.add_done_callback(on_done(i))
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    # 현재 값 사본 {"counters": {...}, "histograms": {이름: {count, sum, max, buckets}}}
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "histograms": {name: {"count": h.count, "sum": h.total, "max": h.max,
+                                      "buckets": list(h.buckets)}
+                               for name, h in self.histograms.items()},
+            }
+
+    # Prometheus 텍스트 형식
+    def prometheus_text(self):
+        snap = self.snapshot()
+        labels = ",".join(f'{k}="{v}"' for k, v in self.labels.items())
+
+        def metric_name(name):
+            return name.replace(".", "_").replace("-", "_")
+
+        def with_labels(extra=""):
+            parts = [p for p in (labels, extra) if p]
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        lines = []
+        for name, value in sorted(snap["counters"].items()):
+            m = metric_name(name) + "_total"
+            lines.append(f"# TYPE {m} counter")
+            lines.append(f"{m}{with_labels()} {value}")
+        for name, h in sorted(snap["histograms"].items()):
+            m = metric_name(name) + "_seconds"
+            lines.append(f"# TYPE {m} histogram")
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h["buckets"]):
+                cumulative += n
+                le = 'le="%s"' % bound
+                lines.append(f"{m}_bucket{with_labels(le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{m}_bucket{with_labels(inf)} {h['count']}")
+            lines.append(f"{m}_sum{with_labels()} {h['sum']}")
+            lines.append(f"{m}_count{with_labels()} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+
+# === Prometheus 수집용 HTTP 엔드포인트 (GET /metrics) ===
+# 기본은 이 PC 에서만 접속 (127.0.0.1), 다른 PC 의 수집기가 가져가야 하면 host 를 명시 (예: "0.0.0.0")
+class PrometheusServer:
+    def __init__(self, metrics, port=9100, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                data = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass  # 요청마다 로그 출력하지 않음
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# === 주기적 파일 내보내기 (CSV / JSONL, 크기 기준 순환) ===
+# interval 초마다 직전 기록 이후의 변화량(건수, 합계, 평균)과 지금까지의 최대값을 한 줄씩 추가한다.
+# 파일이 max_bytes 를 넘으면 path.1, path.2 ... 로 밀어내고 backups 개까지만 보관.
+class FileExporter:
+    FIELDS = ("time", "labels", "name", "kind", "count", "sum", "avg", "max")
+
+    def __init__(self, metrics, path, interval=10.0, max_bytes=10 * 2 ** 20, backups=3):
+        self.metrics = metrics
+        self.path = path
+        self.csv = path.lower().endswith(".csv")
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.previous = {"counters": {}, "histograms": {}}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.flush()
+
+    # 직전 기록 이후 변화량을 파일에 추가
+    def flush(self):
+        snap = self.metrics.snapshot()
+        now = time.time()
+        labels = ";".join(f"{k}={v}" for k, v in self.metrics.labels.items())
+        rows = []
+        for name, value in snap["counters"].items():
+            delta = value - self.previous["counters"].get(name, 0)
+            if delta:
+                rows.append((now, labels, name, "counter", delta, delta, None, None))
+        for name, h in snap["histograms"].items():
+            prev = self.previous["histograms"].get(name, {"count": 0, "sum": 0.0})
+            count = h["count"] - prev["count"]
+            if count:
+                total = h["sum"] - prev["sum"]
+                rows.append((now, labels, name, "histogram", count, total, total / count, h["max"]))
+        self.previous = snap
+        if not rows:
+            return
+
+        self._rotate()
+        new_file = not os.path.exists(self.path)
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            if self.csv:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(self.FIELDS)
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write(json.dumps(dict(zip(self.FIELDS, row)), ensure_ascii=False) + "\n")
+
+    def _rotate(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < self.max_bytes:
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join(timeout=1.0)
+        self.flush()
+
+
+# 프로세스 공용 측정기 (환경 변수 METRICS=1 이면 처음부터 켜짐)
+metrics = Metrics(enabled=os.environ.get("METRICS") == "1")
@@ -0,0 +1,142 @@
+import itertools
+
+import cv2
+import numpy as np
+
+
+# === 객체 하나의 추적 상태 (등속도 칼만 필터) ===
+# 상태: [x, y, vx, vy] (픽셀, 픽셀/초), 측정: [x, y]
+class Track:
+    def __init__(self, track_id, color, center, timestamp, process_noise=50.0, measurement_noise=4.0):
+        self.id = track_id
+        self.color = color
+        self.hits = 1            # 검출과 짝지어진 횟수
+        self.misses = 0          # 연속으로 검출되지 않은 횟수
+        self.confidence = 0.3    # 0~1, 검출되면 올라가고 놓치면 내려감
+        self.timestamp = timestamp
+        self.process_noise = process_noise
+
+        kf = cv2.KalmanFilter(4, 2)
+        kf.measurementMatrix = np.array([[1, 0, 0, 0], [0, 1, 0, 0]], np.float32)
+        kf.measurementNoiseCov = np.eye(2, dtype=np.float32) * measurement_noise
+        kf.errorCovPost = np.diag([measurement_noise, measurement_noise, 1e3, 1e3]).astype(np.float32)
+        kf.statePost = np.array([[center[0]], [center[1]], [0], [0]], np.float32)
+        self.kf = kf
+
+    # 평활화된 위치 (x, y)
+    @property
+    def position(self):
+        return float(self.kf.statePost[0, 0]), float(self.kf.statePost[1, 0])
+
+    @property
+    def velocity(self):
+        return float(self.kf.statePost[2, 0]), float(self.kf.statePost[3, 0])
+
+    # timestamp 시각까지 등속도로 예측
+    def predict(self, timestamp):
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return
+        kf = self.kf
+        kf.transitionMatrix = np.array([[1, 0, dt, 0], [0, 1, 0, dt], [0, 0, 1, 0], [0, 0, 0, 1]], np.float32)
+        # 가속도 잡음 모델 (시간 간격이 길수록 불확실성 증가)
+        q = self.process_noise
+        dt2, dt3, dt4 = dt * dt, dt ** 3 / 2, dt ** 4 / 4
+        kf.processNoiseCov = (np.array([[dt4, 0, dt3, 0], [0, dt4, 0, dt3],
+                                        [dt3, 0, dt2, 0], [0, dt3, 0, dt2]], np.float32) * q)
+        kf.predict()
+        # 측정 없이 예측만 한 경우에도 position 이 예측값을 가리키도록 사후 상태에 반영
+        kf.statePost = kf.statePre.copy()
+        kf.errorCovPost = kf.errorCovPre.copy()
+        self.timestamp = timestamp
+
+    def correct(self, center):
+        self.kf.correct(np.array([[center[0]], [center[1]]], np.float32))
+        self.hits += 1
+        self.misses = 0
+        self.confidence += (1.0 - self.confidence) * 0.3
+
+    def miss(self):
+        self.misses += 1
+        self.confidence *= 0.7
+
+
+# === 다중 객체 추적기 ===
+# 프레임마다 검출된 (색상, 중심) 목록을 기존 트랙과 짝지어 고유 ID 를 유지한다.
+# - 짝짓기: 같은 색상끼리, 예측 위치와의 거리가 max_distance 이내인 쌍을 가까운 순서로 (탐욕적 매칭)
+# - 짝이 없는 검출 → 새 트랙, 짝이 없는 트랙 → misses 증가, max_misses 를 넘으면 삭제
+#   (확정 전 트랙은 한 번만 놓쳐도 삭제)
+# - min_hits 번 이상 검출된 트랙만 확정(confirmed) 트랙으로 취급
+# - 검출을 건너뛴 프레임에서는 predict() 로 위치만 앞으로 예측
+class ObjectTracker:
+    def __init__(self, max_distance=40.0, max_misses=10, min_hits=3, process_noise=50.0,
+                 measurement_noise=4.0):
+        self.max_distance = max_distance
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.tracks = []
+        self.ids = itertools.count(1)
+
+    # 검출 결과 반영 → 확정 트랙 목록
+    # detections: [(색상, (cx, cy)), ...], timestamp: 프레임 캡처 시각 (초)
+    def update(self, detections, timestamp):
+        for track in self.tracks:
+            track.predict(timestamp)
+
+        unmatched = set(range(len(detections)))
+        if self.tracks and detections:
+            predicted = np.array([t.position for t in self.tracks], np.float32)
+            measured = np.array([c for _, c in detections], np.float32)
+            dist = np.linalg.norm(predicted[:, None, :] - measured[None, :, :], axis=2)
+            # 색상이 다르면 짝지을 수 없음
+            same_color = (np.array([t.color for t in self.tracks])[:, None]
+                          == np.array([c for c, _ in detections])[None, :])
+            dist[~same_color] = np.inf
+
+            matched_tracks = set()
+            for flat in np.argsort(dist, axis=None):
+                ti, di = np.unravel_index(flat, dist.shape)
+                if dist[ti, di] > self.max_distance:
+                    break
+                if ti in matched_tracks or di not in unmatched:
+                    continue
+                self.tracks[ti].correct(detections[di][1])
+                matched_tracks.add(ti)
+                unmatched.discard(di)
+
+            for ti, track in enumerate(self.tracks):
+                if ti not in matched_tracks:
+                    track.miss()
+        else:
+            for track in self.tracks:
+                track.miss()
+
+        for di in sorted(unmatched):
+            color, center = detections[di]
+            self.tracks.append(Track(next(self.ids), color, center, timestamp,
+                                     self.process_noise, self.measurement_noise))
+
+        # 확정 전 트랙은 한 번만 놓쳐도 삭제 (잡음 검출이 트랙으로 쌓이지 않도록)
+        self.tracks = [t for t in self.tracks
+                       if t.misses <= self.max_misses and (t.hits >= self.min_hits or t.misses == 0)]
+        return self.confirmed()
+
+    # 검출 없이 timestamp 시각까지 위치만 예측 → 확정 트랙 목록
+    def predict(self, timestamp):
+        for track in self.tracks:
+            track.predict(timestamp)
+        return self.confirmed()
+
+    def confirmed(self):
+        return [t for t in self.tracks if t.hits >= self.min_hits]
+
+    def get(self, track_id):
+        for track in self.tracks:
+            if track.id == track_id:
+                return track
+        return None
+
+    def reset(self):
+        self.tracks = []
@@ -0,0 +1,205 @@
+import itertools
+import multiprocessing as mp
+import pickle
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Metrics import metrics
+
+
+# === 프로세스 풀 인식 (공유 메모리 프레임 전달) ===
+# 인식(ArUco, 색상 세그멘테이션)을 작업 프로세스 여러 개에서 돌려 GIL 과 GUI 스레드에 막히지 않고 여러 코어를 쓴다.
+# - 프레임은 공유 메모리 링(slots 칸)에 복사해 칸 번호만 넘김 → 프레임 자체는 피클하지 않음
+# - 작업 프로세스는 검출 결과(색상, 좌표 등 작은 튜플/dict)만 돌려줌
+# - 스트림(카메라)마다 검출기 생성 함수(factory)를 등록할 때 한 번만 피클해 작업 프로세스마다 보내 둠
+#   (프레임 작업에는 스트림 번호만 실림), 작업 프로세스는 스트림별 검출기를 처음 쓸 때 만들어 재사용
+# - 작업 프로세스가 죽으면 대기 중인 Future 는 예외로 끝나고, 이후 submit 은 바로 RuntimeError
+#
+#   pool = PerceptionPool(workers=4)
+#   stream = pool.open_stream(bgr_detector, colors, min_area=500, scale=2)
+#   objects = pool.submit(stream, frame).result()
+#   pool.close()
+#
+# factory(*args, **kwargs) 는 "프레임 → 결과" 함수를 돌려주는 모듈 수준 함수여야 함 (작업 프로세스로 피클되어 전달).
+# 같은 스트림의 프레임도 여러 작업 프로세스에 나뉘어 처리되므로, 순서가 중요한 상태(객체 추적 등)는
+# 결과를 받은 쪽에서 프레임 순서대로 처리한다 (PickupPerception.push / VisionRuntime.detect_frames).
+class PerceptionPool:
+    # workers: 작업 프로세스 수, slots: 공유 메모리 칸 수 (기본 workers × 2)
+    # max_frame_shape: 한 칸에 들어가는 최대 프레임 크기 (높이, 너비, 채널)
+    def __init__(self, workers=2, slots=None, max_frame_shape=(1080, 1920, 3), opencv_threads=1):
+        self.workers = max(1, workers)
+        self.slot_count = slots or self.workers * 2
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slot_count)
+        self.free_slots = queue.Queue()
+        for slot in range(self.slot_count):
+            self.free_slots.put(slot)
+
+        self.streams = set()             # 등록된 스트림 번호
+        self.stream_ids = itertools.count()
+        self.job_ids = itertools.count()
+        self.jobs = {}                   # 작업 번호 → (Future, 칸 번호, 제출 시각)
+        self.lock = threading.Lock()
+        self.closed = False
+        self.broken = None               # 작업 프로세스가 죽었을 때의 오류 (이후 submit 거부)
+
+        # spawn: Qt / 캡처 스레드가 있는 부모를 fork 하지 않음
+        ctx = mp.get_context("spawn")
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.stream_queues = [ctx.Queue() for _ in range(self.workers)]  # 작업 프로세스별 스트림 등록
+        self.processes = [ctx.Process(target=_worker_main,
+                                      args=(self.shm.name, self.slot_bytes, self.tasks, stream_queue,
+                                            self.results, opencv_threads),
+                                      daemon=True)
+                          for stream_queue in self.stream_queues]
+        for process in self.processes:
+            process.start()
+
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+
+    # 검출기 등록 → 스트림 번호 (factory 와 인자는 여기서 한 번만 피클해 모든 작업 프로세스에 보냄)
+    def open_stream(self, factory, *args, **kwargs):
+        spec = pickle.dumps((factory, args, kwargs))
+        stream = next(self.stream_ids)
+        for stream_queue in self.stream_queues:
+            stream_queue.put((stream, spec))
+        self.streams.add(stream)
+        return stream
+
+    # 프레임 한 장 검출 예약 → Future (결과: 검출기가 돌려준 값)
+    # 빈 칸이 없으면 앞선 작업이 끝날 때까지 기다림 (timeout 초 넘으면 queue.Empty)
+    def submit(self, stream, frame, timeout=None):
+        self._check_usable()
+        if stream not in self.streams:
+            raise KeyError(f"등록되지 않은 스트림: {stream}")
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"프레임 {frame.shape} 가 공유 메모리 칸보다 큽니다 (max_frame_shape 확인)")
+
+        slot = self.free_slots.get(timeout=timeout)
+        future = Future()
+        future.set_running_or_notify_cancel()
+        job = next(self.job_ids)
+        with self.lock:
+            # 칸을 기다리는 동안 작업 프로세스가 죽었거나 풀이 닫혔으면 칸을 돌려놓고 거부
+            if self.broken is not None or self.closed:
+                self.free_slots.put(slot)
+                self._check_usable()
+            view = np.ndarray(frame.shape, np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+            view[...] = frame
+            del view
+            self.jobs[job] = (future, slot, time.perf_counter())
+        self.tasks.put((job, slot, frame.shape, stream))
+        return future
+
+    def _check_usable(self):
+        if self.closed:
+            raise RuntimeError("PerceptionPool 이 닫혔습니다")
+        if self.broken is not None:
+            raise RuntimeError(f"PerceptionPool 을 쓸 수 없습니다: {self.broken}")
+
+    # 결과 수집 스레드: 칸 반납 + Future 완료
+    # 결과가 계속 들어와도 1초마다 작업 프로세스 생존 확인 (죽은 프로세스가 가져간 작업은 끝나지 않으므로)
+    def _collect(self):
+        next_check = time.monotonic() + 1.0
+        while True:
+            try:
+                item = self.results.get(timeout=1.0)
+            except queue.Empty:
+                if self.closed:
+                    break
+                item = ()
+            if item is None:
+                break
+            if item:
+                job, result, error, elapsed = item
+                with self.lock:
+                    future, slot, submitted = self.jobs.pop(job)
+                self.free_slots.put(slot)
+                metrics.observe("vision.pool.detect", elapsed)                        # 작업 프로세스 안 검출 시간
+                metrics.observe("vision.pool.latency", time.perf_counter() - submitted)  # 제출 → 결과 수신
+                if error is not None:
+                    future.set_exception(RuntimeError(error))
+                else:
+                    future.set_result(result)
+
+            if time.monotonic() >= next_check:
+                next_check = time.monotonic() + 1.0
+                if not self.closed and not all(p.is_alive() for p in self.processes):
+                    error = RuntimeError("인식 작업 프로세스가 종료되었습니다")
+                    with self.lock:
+                        self.broken = error
+                    self._fail_all(error)
+                    break
+
+    # 대기 중인 작업을 모두 오류로 끝내고 칸 반납 (칸을 기다리던 submit 이 멈춰 있지 않도록)
+    def _fail_all(self, error):
+        with self.lock:
+            jobs, self.jobs = self.jobs, {}
+        for future, slot, _ in jobs.values():
+            self.free_slots.put(slot)
+            future.set_exception(error)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self.results.put(None)
+        self.collector.join(timeout=2.0)
+        self._fail_all(RuntimeError("PerceptionPool 이 닫혔습니다"))
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# === 작업 프로세스 ===
+def _worker_main(shm_name, slot_bytes, tasks, streams, results, opencv_threads):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C 는 부모가 처리하고 close() 로 종료
+    import cv2
+    cv2.setNumThreads(opencv_threads)  # 프로세스 여러 개 × OpenCV 내부 스레드로 코어가 넘치지 않도록
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    specs = {}      # 스트림 번호 → 피클된 (factory, args, kwargs)
+    detectors = {}  # 스트림 번호 → 검출 함수
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job, slot, shape, stream = task
+        # 스트림 등록은 작업보다 먼저 보내지만 다른 큐라서 늦게 도착할 수 있음 → 올 때까지 받음
+        while stream not in specs:
+            opened, spec = streams.get()
+            specs[opened] = spec
+        start = time.perf_counter()
+        frame = np.ndarray(shape, np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+        try:
+            detector = detectors.get(stream)
+            if detector is None:
+                factory, args, kwargs = pickle.loads(specs[stream])
+                detector = detectors[stream] = factory(*args, **kwargs)
+            result, error = detector(frame), None
+        except Exception as e:
+            result, error = None, repr(e)
+        del frame  # 공유 메모리 참조 해제 (칸은 부모가 결과를 받은 뒤 다시 씀)
+        results.put((job, result, error, time.perf_counter() - start))
+    shm.close()
@@ -0,0 +1,197 @@
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import cv2
+
+from Aruco_tracker import ArucoRoiTracker  # ArUco ROI 추적 (검출기 재사용 + 창 검색)
+from Change_gate import ChangeGate  # 작업대가 그대로면 검출 생략 (축소 흑백 서명 비교)
+from Color_segmentation import ColorSegmenter  # 색상 LUT 기반 단일 패스 세그멘테이션
+from Metrics import metrics  # 단계별 지연 측정 (꺼져 있으면 비용 없음)
+from Object_tracker import ObjectTracker  # 프레임 간 객체 짝짓기 (고유 ID + 칼만 평활화)
+
+
+# === 픽업 작업대 인식 파이프라인 (Qt 없이 사용 가능) ===
+# ArUco 마커로 작업 영역(ROI)을 잡고, ROI 안의 색상 객체를 찾는다.
+# Cobot 의 PerceptionWorker(작업 스레드)와 오프라인 벤치마크가 같은 코드를 사용한다.
+# 검출 결과는 ObjectTracker 로 프레임 간에 이어 붙여 고유 ID 와 평활화된 위치(tracks)를 함께 제공한다.
+# pool(PerceptionPool)을 주면 검출(ArUco + 색상)은 작업 프로세스에서, 추적은 이 프로세스에서 프레임 순서대로 한다.
+# refresh_interval 을 주면 ROI 안이 바뀌지 않은 프레임은 검출하지 않고 직전 검출 결과를 그대로 쓴다 (ChangeGate).
+class PickupPerception:
+    # scale: 1 이면 ROI 를 원본 해상도로 처리, 2 / 4 면 축소 영상에서 후보를 찾고 원본 창에서 중심 보정
+    # detect_interval: N 프레임마다 한 번만 검출, 사이 프레임은 트랙 위치만 예측
+    # pool: 검출을 맡길 PerceptionPool (없으면 이 스레드에서 검출)
+    # refresh_interval: 장면이 그대로여도 N 프레임마다 한 번은 검출 (0 = 변화 감지 없이 매번 검출)
+    def __init__(self, hsv_ranges, min_area=200, margin=30, full_search_interval=30, scale=1,
+                 detect_interval=1, tracker=None, pool=None, refresh_interval=0):
+        self.min_area = min_area          # 너무 작은 물체 제외 기준 면적
+        self.scale = scale                # 처리 피라미드 축소 배율
+        self.detect_interval = max(1, detect_interval)
+        self.tracker = tracker or ObjectTracker()
+        self.frame_count = 0
+        self.last_result = None           # 마지막으로 검출한 프레임의 결과
+        self.gate = ChangeGate(refresh_interval=refresh_interval)
+        self.refresh_requested = False    # 다음 프레임은 변화 감지·검출 주기와 관계없이 검출
+
+        # 🔍 ArUco ROI 추적기 (6x6 마커, 평소엔 마커 주변만 검색하고 주기적으로 전체 검색)
+        self.aruco = ArucoRoiTracker(cv2.aruco.DICT_6X6_250, roi_margin=margin,
+                                     full_search_interval=full_search_interval)
+
+        # 색상 표를 룩업 테이블로 한 번만 컴파일
+        self.segmenter = ColorSegmenter(hsv_ranges)
+
+        # 🧵 프로세스 풀 (작업 프로세스마다 같은 설정의 검출기를 만들어 사용)
+        self.pool = pool
+        self.stream = None
+        if pool is not None:
+            self.stream = pool.open_stream(pickup_detector, hsv_ranges, min_area=min_area, margin=margin,
+                                           full_search_interval=full_search_interval, scale=scale)
+        self.pending = deque()            # push() 로 넣고 아직 꺼내지 않은 프레임 [(처리 방식, Future, 시각, tag)]
+
+    # 프레임 한 장 처리 → 검출(또는 예측) 결과 + 트랙 목록
+    # result["detected"]: 이 프레임에서 실제로 검출했는지 (False 면 objects 는 직전 검출 결과)
+    # result["unchanged"]: 검출하지 않았지만 장면이 그대로라 직전 objects 가 이 프레임에도 맞음
+    # result["tracks"]: [(트랙 ID, 색상, (x, y), 신뢰도), ...] 확정 트랙 (평활화된 전체 프레임 좌표)
+    def process(self, frame, timestamp=None):
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        mode = self._mode(frame)
+        if mode == "predict":
+            return self._predict(timestamp)
+        if mode == "reuse":
+            return self._reuse(timestamp)
+        if self.pool is not None:
+            return self._track(self.pool.submit(self.stream, frame).result(), timestamp)
+        return self._track(self.detect(frame), timestamp)
+
+    # 파이프라인 처리: 프레임을 넣고, 검출이 끝난 결과를 넣은 순서대로 꺼냄 → [(tag, 결과), ...]
+    # 프로세스 풀이면 작업 프로세스 수만큼 프레임을 겹쳐 처리 (가장 오래된 프레임만 기다림)
+    # 풀이 없으면 바로 검출해 이번 프레임 결과를 돌려줌 (process 와 같음)
+    def push(self, frame, timestamp=None, tag=None):
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        mode = self._mode(frame)
+        future = None
+        if mode == "detect":
+            if self.pool is not None:
+                future = self.pool.submit(self.stream, frame)
+            else:
+                future = Future()
+                future.set_result(self.detect(frame))
+        self.pending.append((mode, future, timestamp, tag))
+
+        depth = self.pool.workers if self.pool is not None else 1
+        ready = []
+        while self.pending and (len(self.pending) > depth or self.pending[0][1] is None
+                                or self.pending[0][1].done()):
+            ready.append(self._pop())
+        return ready
+
+    # 남은 프레임 결과를 모두 기다려 꺼냄
+    def drain(self):
+        return [self._pop() for _ in range(len(self.pending))]
+
+    def _pop(self):
+        mode, future, timestamp, tag = self.pending.popleft()
+        if mode == "predict":
+            return tag, self._predict(timestamp)
+        if mode == "reuse":
+            return tag, self._reuse(timestamp)
+        return tag, self._track(future.result(), timestamp)
+
+    # 다음 프레임을 새로 검출하도록 요청 (로봇이 장면을 바꾼 뒤, 다른 스레드에서 호출해도 됨)
+    def request_refresh(self):
+        self.refresh_requested = True
+
+    # 이번 프레임 처리 방식: "detect"(검출), "predict"(검출 주기 사이, 트랙 위치만 예측),
+    # "reuse"(ROI 안이 그대로, 직전 검출 결과 재사용)
+    # 검출 주기 건너뛰기는 직전 검출에서 ROI 를 찾았을 때만, 변화 비교는 ROI 가 없으면 프레임 전체로
+    # 새로 검출하라는 요청이 있으면 변화 감지 기준을 지워 이번 프레임을 검출 (기준도 이 프레임으로 바뀜)
+    def _mode(self, frame):
+        index = self.frame_count
+        self.frame_count += 1
+        last = self.last_result
+        if self.refresh_requested:
+            self.refresh_requested = False
+            self.gate.reset()
+        elif index % self.detect_interval != 0 and last is not None and last["roi"] is not None:
+            return "predict"
+        roi = last["roi"] if last is not None else None
+        return "detect" if self.gate.changed(frame, roi) else "reuse"
+
+    # 검출 건너뜀: 직전 ROI·객체 그대로, 트랙 위치만 예측
+    def _predict(self, timestamp):
+        result = dict(self.last_result, detected=False)
+        result["tracks"] = self._track_list(self.tracker.predict(timestamp))
+        return result
+
+    # 장면 그대로: 직전 검출 결과를 이 프레임의 검출로 보고 추적기에 다시 반영
+    def _reuse(self, timestamp):
+        last = self.last_result
+        if last["roi"] is not None:
+            tracks = self.tracker.update(last["objects"], timestamp)
+        else:
+            tracks = self.tracker.predict(timestamp)
+        result = dict(last, detected=False, unchanged=True)
+        result["tracks"] = self._track_list(tracks)
+        return result
+
+    # 검출 결과를 프레임 순서대로 추적기에 반영
+    def _track(self, result, timestamp):
+        with metrics.span("vision.track"):
+            if result["roi"] is not None:
+                tracks = self.tracker.update(result["objects"], timestamp)
+            else:
+                tracks = self.tracker.predict(timestamp)  # ROI 를 못 찾은 프레임은 놓친 것으로 세지 않음
+        result["detected"] = True
+        result["tracks"] = self._track_list(tracks)
+        self.last_result = result
+        return result
+
+    @staticmethod
+    def _track_list(tracks):
+        return [(t.id, t.color, t.position, t.confidence) for t in tracks]
+
+    # 프레임 한 장 검출: ArUco 마커로 ROI 설정 → ROI 안의 색상 객체 검출
+    def detect(self, frame):
+        result = {"roi": None, "marker_pts": None, "theta": None, "markers": {}, "objects": []}
+        metrics.count("vision.frames")
+
+        # ✅ 2개 이상의 마커가 감지되었을 때만 ROI를 설정함
+        with metrics.span("vision.aruco"):
+            found = self.aruco.update(frame)
+        if not found:
+            metrics.count("vision.no_roi")
+            return result
+
+        x1, y1, x2, y2 = self.aruco.roi
+        result["roi"] = self.aruco.roi
+        result["marker_pts"] = self.aruco.marker_pts  # 나중에 회전 각도 계산에 사용
+        result["theta"] = self.aruco.theta
+        # 마커 ID → 중심 좌표 (좌표 보정 모델의 카메라 이동 보정용)
+        result["markers"] = {int(i): c.mean(axis=0) for i, c in zip(self.aruco.ids, self.aruco.corners)}
+
+        roi = frame[y1:y2, x1:x2]
+        if self.scale > 1:
+            # 🔻 축소 ROI 에서 후보 검출 → 후보 주변 원본 해상도 창에서만 중심 계산
+            with metrics.span("vision.candidates"):
+                candidates = self.segmenter.candidates(roi, self.min_area, self.scale)
+            with metrics.span("vision.refine"):
+                objects = self.segmenter.refine(roi, candidates, self.min_area, self.scale)
+        else:
+            # 🔄 ROI 영역만 HSV 로 변환 후 단일 패스 색상 라벨링
+            with metrics.span("vision.hsv"):
+                hsv = self.segmenter.to_hsv(roi)
+            with metrics.span("vision.label"):        # 색상 LUT → 라벨 영상 (마스크 역할)
+                labels = self.segmenter.label(hsv)
+            with metrics.span("vision.contours"):     # 라벨별 외곽선 + 면적 + 모멘트
+                objects = self.segmenter.extract(labels, min_area=self.min_area)
+
+        for color_name, _, _, (cx, cy) in objects:
+            # ROI 기준 → 전체 프레임 기준으로 보정
+            result["objects"].append((color_name, (cx + x1, cy + y1)))
+        return result
+
+
+# === 프로세스 풀용 검출기 생성 함수 (PerceptionPool.open_stream 에 전달) ===
+# 작업 프로세스 안에서 스트림마다 ROI 추적기·색상 LUT 를 한 번 만들고 detect() 만 사용 (추적은 부모 쪽)
+def pickup_detector(hsv_ranges, **kwargs):
+    return PickupPerception(hsv_ranges, **kwargs).detect
@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+from Change_gate import ChangeGate
+from Color_profile import load_colors
+from Frame_capture import open_source
+from Perception_pool import PerceptionPool
+
+
+# === 비전 스크립트 공통 실행 환경 ===
+# 화면이 없는 셀 PC 에서도 같은 스크립트를 돌릴 수 있도록 출력 방식을 한곳에서 관리한다.
+#
+#   python Color_recognition_Fruit.py                    → 기존처럼 창 표시 + 그리기
+#   python Color_recognition_Fruit.py --headless         → 창/그리기 없이 결과를 JSON Lines 로 출력
+#   python Color_recognition_Fruit.py --headless --jsonl out.jsonl --preview-port 8080
+#       → 결과는 파일로, 축소 미리보기는 http://127.0.0.1:8080/ 에서 제한된 주기로 확인
+#         (다른 PC 에서 보려면 --preview-host 0.0.0.0 → http://<셀 PC>:8080/)
+#   python Color_recognition_Fruit.py --source tray.mp4 --unthrottled
+#       → 카메라 대신 녹화 영상(또는 이미지 폴더)을 최대 속도로 재생
+#   python Color_recognition_Fruit.py --headless --workers 4
+#       → 검출을 작업 프로세스 4개에 나눠 처리 (프레임은 공유 메모리로 전달, 결과는 프레임 순서대로)
+#   python Color_recognition_Fruit.py --color-profile cell1_colors.json
+#       → 스크립트의 HSV 표 대신 Color_profile.py 로 만든 색상 프로파일 사용
+#   python Color_recognition_Fruit.py --refresh-frames 0
+#       → 변화 감지 끄기 (기본: 화면이 그대로면 검출하지 않고 직전 결과 사용, 30 프레임마다 한 번은 검출)
+#
+# 환경 변수 VISION_HEADLESS=1 로도 헤드리스 모드를, COLOR_PROFILE=<파일> 로 색상 프로파일을 지정할 수 있다.
+class VisionRuntime:
+    def __init__(self, source_name, argv=None):
+        parser = argparse.ArgumentParser(description=f"{source_name} 비전 스크립트")
+        parser.add_argument("--headless", action="store_true",
+                            default=os.environ.get("VISION_HEADLESS") == "1",
+                            help="창 표시와 그리기를 끄고 결과만 출력")
+        parser.add_argument("--jsonl", default=None,
+                            help="결과를 JSON Lines 로 저장할 파일 (헤드리스 기본값: 표준 출력)")
+        parser.add_argument("--preview-port", type=int, default=0,
+                            help="축소 미리보기 HTTP 포트 (0 = 사용 안 함)")
+        parser.add_argument("--preview-host", default="127.0.0.1",
+                            help="미리보기 서버 주소 (기본: 이 PC 에서만 접속, 0.0.0.0 = 모든 네트워크)")
+        parser.add_argument("--preview-fps", type=float, default=2.0, help="미리보기 최대 갱신 주기")
+        parser.add_argument("--preview-scale", type=float, default=0.25, help="미리보기 축소 비율")
+        parser.add_argument("--source", action="append", default=[],
+                            help="프레임 소스: 카메라 번호, 동영상 파일 또는 이미지 폴더 (여러 번 지정 가능)")
+        parser.add_argument("--unthrottled", action="store_true",
+                            help="녹화 소스를 원래 fps 로 맞추지 않고 최대 속도로 재생")
+        parser.add_argument("--workers", type=int, default=0,
+                            help="검출 작업 프로세스 수 (0 = 메인 스레드에서 검출)")
+        parser.add_argument("--color-profile", default=os.environ.get("COLOR_PROFILE"),
+                            help="색상 프로파일 파일 (없으면 스크립트의 기본 HSV 표)")
+        parser.add_argument("--refresh-frames", type=int, default=30,
+                            help="화면이 그대로여도 N 프레임마다 한 번은 검출 (0 = 변화 감지 없이 매번 검출)")
+        args, _ = parser.parse_known_args(argv)
+
+        self.source_name = source_name
+        self.headless = args.headless
+        self.sources = args.source          # 명령행에서 지정한 프레임 소스 목록
+        self.realtime = not args.unthrottled
+        self.workers = args.workers
+        self.pool = None                    # 검출 작업 프로세스 풀 (detect_frames 에서 처음 쓸 때 생성)
+        self.color_profile = args.color_profile
+        self.refresh_frames = args.refresh_frames
+        self.frame_index = 0
+        self.callbacks = []  # emit() 때마다 호출할 함수 (결과 dict 를 받음)
+
+        # 📝 결과 출력 대상
+        if args.jsonl:
+            self.out = open(args.jsonl, "a", encoding="utf-8")
+        elif self.headless:
+            self.out = sys.stdout
+        else:
+            self.out = None
+
+        # 🖼️ 축소 미리보기 (선택)
+        self.preview = None
+        if args.preview_port:
+            self.preview = PreviewServer(args.preview_port, args.preview_fps, args.preview_scale,
+                                         args.preview_host)
+
+    # 프레임 소스 열기 (--source 가 없으면 default, 보통 0번 카메라)
+    def open_source(self, default=0, index=0):
+        source = self.sources[index] if index < len(self.sources) else default
+        return open_source(source, realtime=self.realtime)
+
+    # 색상 표: 색상 프로파일이 지정되어 있으면 그 표, 아니면 스크립트의 기본 표
+    def colors(self, default):
+        return load_colors(default, self.color_profile)
+
+    # 변화 감지 게이트 (--refresh-frames 설정, 검출 루프마다 하나씩)
+    def change_gate(self):
+        return ChangeGate(refresh_interval=self.refresh_frames)
+
+    # 프레임 읽기 + 검출 → (프레임, 검출 결과) 를 읽은 순서대로 (소스가 끝나면 종료)
+    # factory(*args, **kwargs) 는 "프레임 → 결과" 함수를 돌려주는 모듈 수준 함수 (예: bgr_detector)
+    # --workers N 이면 작업 프로세스 N 개가 프레임을 겹쳐 검출 (가장 오래된 프레임 결과부터 꺼냄)
+    # 직전에 검출한 프레임과 비교해 화면이 그대로면 검출하지 않고 직전 결과를 다시 돌려줌
+    def detect_frames(self, cap, factory, *args, **kwargs):
+        gate = self.change_gate()
+        if self.workers <= 0:
+            detect = factory(*args, **kwargs)
+            result = None
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    return
+                if gate.changed(frame):
+                    result = detect(frame)
+                yield frame, result
+
+        if self.pool is None:
+            self.pool = PerceptionPool(self.workers)
+        stream = self.pool.open_stream(factory, *args, **kwargs)
+        pending = deque()  # [(프레임, Future 또는 None(직전 결과 재사용)), ...] 제출 순서
+        result = None
+        while True:
+            ret, frame = cap.read()
+            if ret:
+                pending.append((frame, self.pool.submit(stream, frame) if gate.changed(frame) else None))
+            while pending and (not ret or len(pending) > self.workers or pending[0][1] is None
+                               or pending[0][1].done()):
+                done_frame, future = pending.popleft()
+                if future is not None:
+                    result = future.result()
+                yield done_frame, result
+            if not ret:
+                return
+
+    # 이번 프레임에 그리기가 필요한지 (창을 띄우거나, 미리보기를 갱신할 차례일 때만)
+    @property
+    def draw(self):
+        return not self.headless or (self.preview is not None and self.preview.due())
+
+    # 구조화된 결과 한 건 출력 (프레임 번호, 시각 자동 추가)
+    def emit(self, record):
+        record = {"source": self.source_name, "frame": self.frame_index, "t": time.time(), **record}
+        if self.out is not None:
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.out.flush()
+        for callback in self.callbacks:
+            callback(record)
+
+    # 결과 영상 출력 (헤드리스면 창 없이 미리보기만)
+    def show(self, window_name, frame):
+        if not self.headless:
+            cv2.imshow(window_name, frame)
+        if self.preview is not None:
+            self.preview.update(frame)
+
+    # 프레임 처리 끝 → 종료 요청('q' 키) 여부 반환
+    def end_frame(self):
+        self.frame_index += 1
+        if self.headless:
+            return False  # 헤드리스에서는 Ctrl+C 로 종료
+        return cv2.waitKey(1) & 0xFF == ord('q')
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+        if self.preview is not None:
+            self.preview.close()
+        if self.out is not None and self.out is not sys.stdout:
+            self.out.close()
+        if not self.headless:
+            cv2.destroyAllWindows()
+
+
+# === 축소 미리보기 HTTP 서버 ===
+# 최신 프레임을 JPEG 한 장으로 제공 (GET / → 최신 미리보기 이미지)
+# 카메라 영상이므로 기본은 이 PC 에서만 접속 (127.0.0.1), 다른 PC 에 보여 주려면 host 를 명시
+class PreviewServer:
+    def __init__(self, port, fps=2.0, scale=0.25, host="127.0.0.1"):
+        self.interval = 1.0 / fps
+        self.scale = scale
+        self.last_update = 0.0
+        self.jpeg = None
+        self.lock = threading.Lock()
+
+        preview = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with preview.lock:
+                    data = preview.jpeg
+                if data is None:
+                    self.send_error(503, "preview not ready")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass  # 요청마다 로그 출력하지 않음
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    # 갱신 주기가 지났는지
+    def due(self):
+        return time.monotonic() - self.last_update >= self.interval
+
+    # 주기가 지났을 때만 축소 + JPEG 인코딩
+    def update(self, frame):
+        if not self.due():
+            return
+        self.last_update = time.monotonic()
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode(".jpg", small, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        if ok:
+            with self.lock:
+                self.jpeg = buf.tobytes()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
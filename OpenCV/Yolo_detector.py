@@ -0,0 +1,271 @@
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+# === 탐지 결과 묶음 (객체별 루프 대신 NumPy 배열로 한 번에 보관) ===
+class Detections:
+    def __init__(self, boxes=None, conf=None, cls=None, predicted=False):
+        self.boxes = np.zeros((0, 4), np.float32) if boxes is None else boxes  # (N, 4) x1, y1, x2, y2
+        self.conf = np.zeros(0, np.float32) if conf is None else conf          # (N,) 신뢰도
+        self.cls = np.zeros(0, np.int32) if cls is None else cls               # (N,) 클래스 번호
+        self.predicted = predicted  # True 면 추론 없이 이전 결과로 예측한 박스
+
+    def __len__(self):
+        return len(self.boxes)
+
+
+# 고정 크기 정사각형으로 레터박스 (비율 유지 + 회색 여백)
+# 반환: (레터박스 이미지, 배율, (왼쪽 여백, 위쪽 여백))
+def letterbox(frame, size=640, color=(114, 114, 114)):
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR) if scale != 1 else frame
+
+    pad_x = (size - new_w) // 2
+    pad_y = (size - new_h) // 2
+    out = cv2.copyMakeBorder(resized, pad_y, size - new_h - pad_y, pad_x, size - new_w - pad_x,
+                             cv2.BORDER_CONSTANT, value=color)
+    return out, scale, (pad_x, pad_y)
+
+
+# 두 박스 묶음 사이 IoU 행렬 (N, M) 을 한 번에 계산
+def box_iou(a, b):
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+# === 카메라 한 대의 추론 이력 (추론 사이 프레임의 박스 예측용) ===
+class _StreamState:
+    def __init__(self):
+        self.frame_count = 0
+        self.last = None          # 마지막 추론 결과 Detections
+        self.last_frame = 0       # 마지막 추론 프레임 번호
+        self.velocity = None      # 박스별 프레임당 이동량 (N, 4)
+
+
+# === YOLO 탐지기 래퍼 ===
+# - 모든 입력을 고정 크기(imgsz)로 레터박스 → 배치 모양이 항상 같음
+# - stride 프레임마다 한 번만 추론, 그 사이 프레임은 직전 두 추론 결과로 박스 위치를 선형 예측
+# - 여러 카메라 프레임을 모아 한 번의 forward 로 추론 (마이크로 배치)
+# - 결과는 r.boxes 를 하나씩 변환하지 않고 NumPy 배열로 한 번에 꺼냄
+# - fixed_batch: 배치 크기가 고정된 모델(내보낸 TorchScript)이면 그 크기로 나누고 모자란 칸은 빈 이미지로 채움
+class YoloDetector:
+    def __init__(self, model, imgsz=640, stride=1, conf=0.25, match_iou=0.3, fixed_batch=None):
+        # model: ultralytics YOLO 객체 또는 모델 파일 경로
+        if isinstance(model, str):
+            from ultralytics import YOLO  # 무거운 라이브러리는 실제로 쓸 때만 불러오기
+            model = YOLO(model)
+        self.model = model
+        self.names = model.names
+        self.imgsz = imgsz
+        self.stride = max(1, stride)
+        self.conf = conf
+        self.match_iou = match_iou
+        self.streams = {}
+        self.fixed_batch = fixed_batch
+        self.pad_image = np.full((imgsz, imgsz, 3), 114, np.uint8) if fixed_batch else None
+
+    # 레터박스 이미지 여러 장을 한 번에 추론 → 원본 좌표로 되돌린 Detections 목록
+    def infer_batch(self, frames):
+        return self.infer_letterboxed(*self.letterbox_batch(frames))
+
+    # 프레임들 → (레터박스 이미지 목록, 원본 좌표 복원 정보 목록)
+    def letterbox_batch(self, frames):
+        inputs, metas = [], []
+        for frame in frames:
+            img, scale, pad = letterbox(frame, self.imgsz)
+            inputs.append(img)
+            metas.append((scale, pad, frame.shape[:2]))
+        return inputs, metas
+
+    # 이미 레터박스한 이미지 목록 추론 (벤치마크에서 레터박스와 추론 시간을 따로 잴 때도 사용)
+    def infer_letterboxed(self, inputs, metas):
+        if self.fixed_batch:
+            # stride 로 이번 프레임에 추론할 카메라가 batch 보다 적을 수 있음 → 빈 이미지로 채우고 결과는 버림
+            results = []
+            for i in range(0, len(inputs), self.fixed_batch):
+                chunk = inputs[i:i + self.fixed_batch]
+                padded = chunk + [self.pad_image] * (self.fixed_batch - len(chunk))
+                results += list(self.model(padded, imgsz=self.imgsz, conf=self.conf, verbose=False))[:len(chunk)]
+        else:
+            results = self.model(inputs, imgsz=self.imgsz, conf=self.conf, verbose=False)
+
+        out = []
+        for r, (scale, (pad_x, pad_y), (h, w)) in zip(results, metas):
+            boxes = r.boxes
+            xyxy = boxes.xyxy.cpu().numpy().astype(np.float32)
+            # 레터박스 좌표 → 원본 프레임 좌표
+            xyxy -= (pad_x, pad_y, pad_x, pad_y)
+            xyxy /= scale
+            np.clip(xyxy, 0, (w, h, w, h), out=xyxy)
+            out.append(Detections(xyxy,
+                                  boxes.conf.cpu().numpy().astype(np.float32),
+                                  boxes.cls.cpu().numpy().astype(np.int32)))
+        return out
+
+    # 카메라 한 대의 프레임 처리 (stride 에 따라 추론 또는 예측)
+    def update(self, frame, stream_id=0):
+        return self.update_many({stream_id: frame})[stream_id]
+
+    # 여러 카메라 프레임 처리: 이번에 추론할 카메라만 모아서 한 번에 forward
+    # frames: {카메라 ID: 프레임} → {카메라 ID: Detections}
+    def update_many(self, frames):
+        due, results = [], {}
+        for stream_id in frames:
+            state = self.streams.setdefault(stream_id, _StreamState())
+            if state.last is None or state.frame_count - state.last_frame >= self.stride:
+                due.append(stream_id)
+            else:
+                results[stream_id] = self._predict(state)
+            state.frame_count += 1
+
+        if due:
+            for stream_id, det in zip(due, self.infer_batch([frames[i] for i in due])):
+                self._store(self.streams[stream_id], det)
+                results[stream_id] = det
+        return results
+
+    # 새 추론 결과 저장 + 직전 결과와 박스를 짝지어 속도(프레임당 이동량) 계산
+    def _store(self, state, det):
+        now = state.frame_count - 1
+        velocity = np.zeros_like(det.boxes)
+
+        prev = state.last
+        if prev is not None and len(prev) and len(det):
+            iou = box_iou(det.boxes, prev.boxes)
+            iou[det.cls[:, None] != prev.cls[None, :]] = 0  # 같은 클래스끼리만 매칭
+            best = iou.argmax(axis=1)
+            matched = iou[np.arange(len(det)), best] >= self.match_iou
+            gap = max(1, now - state.last_frame)
+            velocity[matched] = (det.boxes[matched] - prev.boxes[best[matched]]) / gap
+
+        state.last = det
+        state.last_frame = now
+        state.velocity = velocity
+
+    # 추론하지 않는 프레임: 마지막 결과를 속도만큼 이동시켜 예측
+    def _predict(self, state):
+        det = state.last
+        elapsed = state.frame_count - state.last_frame
+        return Detections(det.boxes + state.velocity * elapsed, det.conf, det.cls, predicted=True)
+
+
+# === 시작 시간 단축 모델 로더 ===
+# 셀을 다시 켤 때 첫 탐지까지 몇 초씩 걸리던 부분(ultralytics·torch import, 모델 로드, 첫 추론 그래프 초기화)을
+# 백그라운드 스레드에서 카메라 열기와 겹쳐서 처리한다.
+# - ultralytics 는 로더 스레드 안에서 처음 쓸 때 import
+# - 로드 후 고정 크기(imgsz) 빈 프레임 batch 장으로 한 번 추론 (워밍업) → 첫 실제 프레임은 바로 탐지
+# - 처음 실행할 때는 원본 가중치(.pt)를 쓰고, 워밍업이 끝난 뒤 같은 스레드에서 레이어 병합(fuse)된 TorchScript 로
+#   내보내 cache_dir 에 저장 → 다음 실행부터는 그 파일을 바로 로드 (가중치 파일이 더 새로우면 다시 내보냄)
+#   ※ 내보낸 모델은 입력 크기(imgsz)와 배치 크기(batch = 한 번에 추론하는 카메라 수)가 고정이므로 파일 이름에 포함
+# - 단계별 소요 시간은 timings 에 기록 (첫 탐지까지 걸린 시간 보고용)
+#
+#   loader = YoloLoader("yolov5su.pt", imgsz=640, batch=len(cameras), stride=2)
+#   ... 카메라 열기 ...
+#   detector = loader.result()     # 로드·워밍업이 아직 안 끝났으면 여기서 대기
+class YoloLoader:
+    def __init__(self, weights, imgsz=640, batch=1, cache_dir=None, **detector_kwargs):
+        self.weights = weights
+        self.imgsz = imgsz
+        self.batch = max(1, batch)
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_cache")
+        self.detector_kwargs = detector_kwargs
+        self.started = time.perf_counter()
+        self.timings = {}                 # 단계 이름 → 소요 시간 (초)
+        self.model_source = None          # "cache" (내보낸 모델) 또는 "weights" (원본 가중치)
+
+        stem = os.path.splitext(os.path.basename(weights))[0]
+        self.cache_path = os.path.join(self.cache_dir, f"{stem}-{imgsz}-b{self.batch}.torchscript")
+
+        # 작업 스레드 하나: 로드·워밍업 → (캐시가 없으면) 내보내기 순서로 실행
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = self.executor.submit(self._load)
+
+    def _mark(self, name, since):
+        now = time.perf_counter()
+        self.timings[name] = now - since
+        return now
+
+    # 캐시 파일이 있고 가중치 파일보다 새로우면 사용
+    def _cache_valid(self):
+        if not os.path.exists(self.cache_path):
+            return False
+        return not os.path.exists(self.weights) or os.path.getmtime(self.cache_path) >= os.path.getmtime(self.weights)
+
+    def _load(self):
+        t = time.perf_counter()
+        from ultralytics import YOLO  # 무거운 라이브러리 (torch 포함) 는 로더 스레드에서 불러오기
+        t = self._mark("import", t)
+
+        model = None
+        if self._cache_valid():
+            try:
+                model = YOLO(self.cache_path, task="detect")
+                self.model_source = "cache"
+            except Exception as e:
+                # 내보내는 도중 종료되어 깨진 파일 등 → 지우고 원본 가중치로
+                print(f"[YOLO] 캐시 모델 로드 실패, 원본 가중치 사용: {e!r}")
+                os.remove(self.cache_path)
+        if model is None:
+            model = YOLO(self.weights)
+            self.model_source = "weights"
+        t = self._mark("load", t)
+
+        # 워밍업: 실제 입력과 같은 모양(고정 크기 레터박스 × 배치)으로 한 번 추론
+        # 내보낸 모델은 배치 크기가 고정이므로 추론할 카메라가 적은 프레임은 batch 장으로 채워서 추론
+        fixed_batch = self.batch if self.model_source == "cache" else None
+        detector = YoloDetector(model, imgsz=self.imgsz, fixed_batch=fixed_batch, **self.detector_kwargs)
+        blank = np.full((self.imgsz, self.imgsz, 3), 114, np.uint8)
+        detector.infer_batch([blank] * self.batch)
+        self._mark("warmup", t)
+
+        if self.model_source == "weights":
+            self.executor.submit(self._export, getattr(model, "ckpt_path", None) or self.weights)
+        return detector
+
+    # 원본 가중치 → 병합(fuse)된 TorchScript 캐시 (다음 실행용, 현재 탐지에는 영향 없음)
+    def _export(self, weights_path):
+        from ultralytics import YOLO
+        t = time.perf_counter()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 내보낸 파일은 가중치 파일 옆에 생기므로 캐시 이름으로 복사한 가중치에서 내보냄
+        staged = os.path.splitext(self.cache_path)[0] + ".pt"
+        try:
+            shutil.copy2(weights_path, staged)
+            YOLO(staged).export(format="torchscript", imgsz=self.imgsz, batch=self.batch)
+            self._mark("export", t)
+        except Exception as e:
+            print(f"[YOLO] 모델 캐시 저장 실패 (다음 실행도 원본 가중치 사용): {e!r}")
+        finally:
+            if os.path.exists(staged):
+                os.remove(staged)
+
+    # 로드·워밍업이 끝난 YoloDetector (끝나지 않았으면 대기, 실패하면 예외)
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    # 첫 탐지 시점에 호출 → 시작부터의 단계별 소요 시간 (초)
+    def startup_report(self, **extra):
+        report = {"model": self.model_source, **{k: round(v, 3) for k, v in self.timings.items()}}
+        report.update({k: round(v, 3) for k, v in extra.items()})
+        report["first_detection"] = round(time.perf_counter() - self.started, 3)
+        return report
+
+    # 내보내기 작업이 남아 있으면 끝날 때까지 기다림 (중간에 끊기면 캐시 파일이 깨짐)
+    def close(self):
+        self.executor.shutdown(wait=True)
+